@@ -14,11 +14,13 @@ from mcp_database.core import (
     ExecuteResult,
     InsertResult,
     IntegrityError,
+    OverloadedError,
     PermissionError,
     QueryError,
     QueryResult,
     TimeoutError,
     UpdateResult,
+    UpsertResult,
 )
 from mcp_database.server import create_server, mcp
 
@@ -28,6 +30,7 @@ __all__ = [
     "DatabaseConfig",
     "InsertResult",
     "UpdateResult",
+    "UpsertResult",
     "DeleteResult",
     "QueryResult",
     "ExecuteResult",
@@ -39,6 +42,7 @@ __all__ = [
     "PermissionError",
     "IntegrityError",
     "TimeoutError",
+    "OverloadedError",
     "AdapterFactory",
     "create_server",
     "mcp",
@@ -1,18 +1,63 @@
 """适配器工厂"""
 
-from mcp_database.adapters.http.supabase import SupabaseAdapter
-from mcp_database.adapters.nosql.mongodb import MongoDBAdapter
-from mcp_database.adapters.nosql.opensearch import OpenSearchAdapter
-from mcp_database.adapters.nosql.redis import RedisAdapter
-from mcp_database.adapters.sql.base import SQLAdapter
+import importlib
+
 from mcp_database.core.adapter import DatabaseAdapter
 from mcp_database.core.exceptions import QueryError
 from mcp_database.core.models import DatabaseConfig
 
+# 适配器类的导入路径（"模块:类名"），仅在创建对应适配器时才导入驱动
+ADAPTER_PATHS: dict[str, str] = {
+    "sql": "mcp_database.adapters.sql.base:SQLAdapter",
+    "mongodb": "mcp_database.adapters.nosql.mongodb:MongoDBAdapter",
+    "redis": "mcp_database.adapters.nosql.redis:RedisAdapter",
+    "opensearch": "mcp_database.adapters.nosql.opensearch:OpenSearchAdapter",
+    "supabase": "mcp_database.adapters.http.supabase:SupabaseAdapter",
+}
+
+# 已导入的适配器类
+_loaded: dict[str, type[DatabaseAdapter]] = {}
+
+
+def load_adapter_class(name: str) -> type[DatabaseAdapter]:
+    """
+    按名称导入适配器类
+
+    Args:
+        name: ADAPTER_PATHS 中的适配器名称
+
+    Returns:
+        适配器类
+
+    Raises:
+        QueryError: 未注册的适配器名称时抛出
+    """
+    adapter_class = _loaded.get(name)
+    if adapter_class is None:
+        path = ADAPTER_PATHS.get(name)
+        if path is None:
+            raise QueryError(f"Unknown adapter: {name}")
+        module_name, _, class_name = path.partition(":")
+        adapter_class = getattr(importlib.import_module(module_name), class_name)
+        _loaded[name] = adapter_class
+    return adapter_class
+
 
 class AdapterFactory:
     """数据库适配器工厂"""
 
+    @staticmethod
+    def register_adapter(name: str, path: str) -> None:
+        """
+        注册适配器导入路径
+
+        Args:
+            name: 适配器名称
+            path: 导入路径，格式为 "模块:类名"
+        """
+        ADAPTER_PATHS[name] = path
+        _loaded.pop(name, None)
+
     @staticmethod
     def create_adapter(config: DatabaseConfig) -> DatabaseAdapter:
         """
@@ -27,45 +72,61 @@ class AdapterFactory:
         Raises:
             QueryError: 不支持的数据库类型时抛出
         """
-        url = config.url.lower()
+        return load_adapter_class(AdapterFactory._resolve_adapter(config.url))(config)
+
+    @staticmethod
+    def _resolve_adapter(url: str) -> str:
+        """
+        根据 URL 确定适配器名称（不导入任何驱动）
+
+        Args:
+            url: 数据库 URL
+
+        Returns:
+            ADAPTER_PATHS 中的适配器名称
+
+        Raises:
+            QueryError: 不支持的数据库类型时抛出
+        """
+        lowered = url.lower()
 
         # PostgreSQL
-        if url.startswith("postgresql://") or url.startswith("postgres://"):
-            return SQLAdapter(config)
+        if lowered.startswith("postgresql://") or lowered.startswith("postgres://"):
+            return "sql"
 
         # MySQL
-        elif url.startswith("mysql://") or url.startswith("mysql+"):
-            return SQLAdapter(config)
+        elif lowered.startswith("mysql://") or lowered.startswith("mysql+"):
+            return "sql"
 
         # SQLite
-        elif url.startswith("sqlite://") or url.startswith("sqlite+"):
-            return SQLAdapter(config)
+        elif lowered.startswith("sqlite://") or lowered.startswith("sqlite+"):
+            return "sql"
 
         # MongoDB
-        elif url.startswith("mongodb://") or url.startswith("mongodb+"):
-            return MongoDBAdapter(config)
+        elif lowered.startswith("mongodb://") or lowered.startswith("mongodb+"):
+            return "mongodb"
 
         # Redis
-        elif url.startswith("redis://") or url.startswith("rediss://"):
-            return RedisAdapter(config)
+        elif lowered.startswith("redis://") or lowered.startswith("rediss://"):
+            return "redis"
 
         # OpenSearch
-        elif url.startswith("http://") or url.startswith("https://"):
+        elif lowered.startswith("http://") or lowered.startswith("https://"):
             # 检查是否是 OpenSearch
-            if ":9200" in url or ":9201" in url:
-                return OpenSearchAdapter(config)
+            if ":9200" in lowered or ":9201" in lowered:
+                return "opensearch"
             # 检查是否是 Supabase REST API
-            elif "supabase.co" in url:
-                return SupabaseAdapter(config)
+            elif "supabase.co" in lowered:
+                return "supabase"
             else:
-                raise QueryError(f"Unsupported database URL: {config.url}")
+                raise QueryError(f"Unsupported database URL: {url}")
 
         # Supabase (PostgreSQL)
-        elif "supabase" in url or url.startswith("postgresql+supabase://"):
-            return SQLAdapter(config)
+        elif "supabase" in lowered or lowered.startswith("postgresql+supabase://"):
+            return "sql"
 
         else:
-            raise QueryError(f"Unsupported database URL: {config.url}")
+            raise QueryError(f"Unsupported database URL: {url}")
 
     @staticmethod
     def get_adapter_type(url: str) -> str | None:
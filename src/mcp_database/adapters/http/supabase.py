@@ -1,16 +1,23 @@
 """Supabase REST API 适配器（异步版）"""
 
+import importlib.util
+import logging
 import os
+import re
+from typing import Any
 
 import httpx
 from httpx import ConnectError, HTTPStatusError, TimeoutException
 
 from mcp_database.core.adapter import DatabaseAdapter
+from mcp_database.core.aggregation import AggregateSpec, finalize_rows, parse_aggregate
 from mcp_database.core.exceptions import (
     ConnectionError,
+    DatabaseError,
     ExceptionTranslator,
     QueryError,
 )
+from mcp_database.core.filters import FilterGroup, FilterPlan, compile_filters, group_filters
 from mcp_database.core.models import (
     AdvancedResult,
     Capability,
@@ -20,8 +27,33 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
 
+logger = logging.getLogger(__name__)
+
+# 批量插入时每次 POST 的默认文档数
+DEFAULT_INSERT_BATCH_SIZE = 500
+
+# httpx 仅在安装 h2 时支持 HTTP/2，安装 brotli 时支持 br 解压
+_HAS_H2 = importlib.util.find_spec("h2") is not None
+_HAS_BROTLI = any(importlib.util.find_spec(name) for name in ("brotli", "brotlicffi"))
+ACCEPT_ENCODING = "gzip, deflate, br" if _HAS_BROTLI else "gzip, deflate"
+
+# PostgREST 支持的计数模式
+COUNT_MODES = ("exact", "planned", "estimated")
+
+# 默认计数模式：planned 使用查询计划的估算行数，避免每次查询额外执行 COUNT(*)
+DEFAULT_COUNT_MODE = "planned"
+
+# PostgREST 支持的聚合函数
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+
+_IDENTIFIER_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+# 逻辑组合对应的 PostgREST 逻辑操作符
+_LOGIC_PREFIXES = {"and": "and", "or": "or", "not": "not.and"}
+
 
 class SupabaseAdapter(DatabaseAdapter):
     """Supabase REST API 适配器（使用 httpx 实现真正的异步）"""
@@ -44,6 +76,49 @@ class SupabaseAdapter(DatabaseAdapter):
         """是否已连接"""
         return self._is_connected
 
+    def _build_client_kwargs(self) -> dict[str, Any]:
+        """
+        构建 httpx.AsyncClient 参数
+
+        连接池上限取 pool_size + max_overflow，保活连接数取 pool_size，
+        超时取 connect_timeout / query_timeout。
+
+        支持的 options：
+            http2: 启用 HTTP/2 多路复用（默认 False，需要安装 h2）
+            keepalive_expiry: 空闲连接保活时间（秒，默认 5）
+
+        Returns:
+            客户端参数字典
+        """
+        options = self.config.options or {}
+
+        http2 = bool(options.get("http2", False))
+        if http2 and not _HAS_H2:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        return {
+            "base_url": self._supabase_url,
+            "headers": {
+                "apikey": self._supabase_key,
+                "Authorization": f"Bearer {self._supabase_key}",
+                "Content-Type": "application/json",
+                "Accept-Encoding": ACCEPT_ENCODING,
+                "Prefer": "return=representation",
+            },
+            "limits": httpx.Limits(
+                max_connections=self.config.pool_size + self.config.max_overflow,
+                max_keepalive_connections=self.config.pool_size,
+                keepalive_expiry=options.get("keepalive_expiry", 5.0),
+            ),
+            "timeout": httpx.Timeout(
+                self.config.query_timeout,
+                connect=self.config.connect_timeout,
+                pool=self.config.connect_timeout,
+            ),
+            "http2": http2,
+        }
+
     async def connect(self) -> None:
         """
         连接到 Supabase 数据库
@@ -56,22 +131,14 @@ class SupabaseAdapter(DatabaseAdapter):
             self._supabase_url = os.getenv("SUPABASE_URL")
             self._supabase_key = os.getenv("SUPABASE_KEY")
 
+            # 缺少配置属于配置错误，不是可重试的连接错误
             if not self._supabase_url or not self._supabase_key:
-                raise ConnectionError(
+                raise DatabaseError(
                     "SUPABASE_URL and SUPABASE_KEY environment variables are required"
                 )
 
             # 创建异步 HTTP 客户端
-            self._client = httpx.AsyncClient(
-                base_url=self._supabase_url,
-                headers={
-                    "apikey": self._supabase_key,
-                    "Authorization": f"Bearer {self._supabase_key}",
-                    "Content-Type": "application/json",
-                    "Prefer": "return=representation",
-                },
-                timeout=30.0,
-            )
+            self._client = httpx.AsyncClient(**self._build_client_kwargs())
 
             # 测试连接
             await self._client.get("/")
@@ -89,13 +156,193 @@ class SupabaseAdapter(DatabaseAdapter):
             self._client = None
         self._is_connected = False
 
-    async def insert(self, table: str, data: dict[str, any]) -> InsertResult:
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        """
+        将过滤值格式化为 PostgREST 字面量
+
+        Args:
+            value: 过滤值
+
+        Returns:
+            格式化后的字符串
+        """
+        if value is None:
+            return "null"
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        return str(value)
+
+    @classmethod
+    def _quote_value(cls, value: Any) -> str:
+        """格式化值，包含保留字符（逗号、括号、双引号）的值使用双引号包裹"""
+        item = cls._format_value(value)
+        if any(ch in item for ch in ',()"'):
+            item = '"{}"'.format(item.replace('"', '\\"'))
+        return item
+
+    @classmethod
+    def _format_list(cls, values: list[Any]) -> str:
+        """格式化 in/not_in 的值列表，包含保留字符的值使用双引号包裹"""
+        return f"({','.join(cls._quote_value(value) for value in values)})"
+
+    @classmethod
+    def _translate_filter(cls, operator: str, value: Any, quote: bool = False) -> str:
+        """
+        将单个操作符转换为 PostgREST 过滤表达式
+
+        Args:
+            operator: 操作符
+            value: 过滤值
+            quote: 是否为包含保留字符的值加引号（用于 or/and 逻辑表达式内部）
+
+        Returns:
+            PostgREST 过滤表达式（如 "gt.18"）
+        """
+        literal = cls._quote_value if quote else cls._format_value
+        if operator in ("gt", "lt", "gte", "lte"):
+            return f"{operator}.{literal(value)}"
+        elif operator == "in":
+            return f"in.{cls._format_list(value)}"
+        elif operator == "not_in":
+            return f"not.in.{cls._format_list(value)}"
+        elif operator == "contains":
+            return f"like.{literal(f'*{value}*')}"
+        elif operator == "startswith":
+            return f"like.{literal(f'{value}*')}"
+        elif operator == "endswith":
+            return f"like.{literal(f'*{value}')}"
+        elif operator == "isnull":
+            return "is.null" if value else "not.is.null"
+        elif operator == "notnull":
+            return "not.is.null" if value else "is.null"
+        return f"eq.{literal(value)}"
+
+    @classmethod
+    def _build_filter_params(cls, filters: dict[str, Any] | None) -> list[tuple[str, str]]:
+        """
+        将过滤器转换为 PostgREST 查询参数
+
+        返回键值对列表，同一字段的多个条件（如范围查询）会生成重复的查询参数。
+        $or / $and / $not 组合转换为 or=(...)、and=(...)、not.and=(...) 逻辑参数。
+
+        Args:
+            filters: 过滤条件
+
+        Returns:
+            查询参数列表
+        """
+        if not filters:
+            return []
+
+        params: list[tuple[str, str]] = []
+        plan = compile_filters(filters)
+        for condition, value in zip(plan.conditions, filters.values()):
+            if isinstance(condition, FilterGroup):
+                params.append(
+                    (_LOGIC_PREFIXES[condition.operator], cls._build_logic(condition, value))
+                )
+            else:
+                params.append((condition.field, cls._translate_filter(condition.operator, value)))
+        return params
+
+    @classmethod
+    def _build_logic(cls, group: FilterGroup, value: Any) -> str:
+        """将逻辑组合转换为 PostgREST 逻辑表达式的括号部分（如 "(age.lt.18,age.gt.65)"）"""
+        sub_filters_list = group_filters(group.key, value)
+        if group.operator == "not":
+            # not.and=(...) 直接对子过滤器的各条件取 AND 后取反
+            return f"({','.join(cls._build_logic_items(group.plans[0], sub_filters_list[0]))})"
+
+        items = []
+        for plan, sub_filters in zip(group.plans, sub_filters_list):
+            expressions = cls._build_logic_items(plan, sub_filters)
+            # 多个条件的子过滤器为 AND 关系
+            items.append(
+                expressions[0] if len(expressions) == 1 else f"and({','.join(expressions)})"
+            )
+        return f"({','.join(items)})"
+
+    @classmethod
+    def _build_logic_items(cls, plan: FilterPlan, filters: dict[str, Any]) -> list[str]:
+        """将子过滤器中的每个条件转换为逻辑表达式内部的形式（如 "age.gt.18"）"""
+        expressions = []
+        for condition, value in zip(plan.conditions, filters.values()):
+            if isinstance(condition, FilterGroup):
+                prefix = _LOGIC_PREFIXES[condition.operator]
+                expressions.append(f"{prefix}{cls._build_logic(condition, value)}")
+            else:
+                expression = cls._translate_filter(condition.operator, value, quote=True)
+                expressions.append(f"{condition.field}.{expression}")
+        return expressions
+
+    @staticmethod
+    def _parse_content_range(response: httpx.Response) -> int | None:
+        """
+        从 Content-Range 响应头中解析记录总数
+
+        Args:
+            response: HTTP 响应（如 "0-24/3573" 或 "*/0"）
+
+        Returns:
+            记录总数，未返回总数（如 "0-24/*"）时返回 None
+        """
+        content_range = response.headers.get("Content-Range", "")
+        _, _, total = content_range.partition("/")
+        return int(total) if total.isdigit() else None
+
+    @staticmethod
+    def _build_order(order_by: list[str]) -> str:
+        """
+        将排序字段转换为 PostgREST order 参数
+
+        Args:
+            order_by: 排序字段列表（如 ["-created_at", "name"]）
+
+        Returns:
+            order 参数（如 "created_at.desc,name.asc"）
+        """
+        return ",".join(
+            f"{field[1:]}.desc" if field.startswith("-") else f"{field}.asc" for field in order_by
+        )
+
+    @staticmethod
+    def _build_insert_request(
+        chunk: list[dict[str, Any]], return_ids: bool
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """
+        构建批量插入请求的查询参数和请求头
+
+        Args:
+            chunk: 本次提交的文档列表
+            return_ids: 是否需要返回插入的 ID
+
+        Returns:
+            (查询参数, 请求头)
+        """
+        params: dict[str, str] = {}
+        prefer = ["return=representation" if return_ids else "return=minimal"]
+        if return_ids:
+            params["select"] = "id"
+
+        # 文档字段不一致时显式指定列，缺失的字段使用列默认值
+        columns = list(dict.fromkeys(key for record in chunk for key in record))
+        if any(len(record) != len(columns) for record in chunk):
+            params["columns"] = ",".join(columns)
+            prefer.append("missing=default")
+
+        return params, {"Prefer": ",".join(prefer)}
+
+    async def insert(self, table: str, data: dict[str, Any] | list[dict[str, Any]]) -> InsertResult:
         """
         插入文档
 
+        批量插入按 insert_batch_size 分块，每块通过一次 POST 提交 JSON 数组。
+        options["return_ids"] 为 False 时使用 return=minimal，不返回 ID。
+
         Args:
             table: 表名
-            data: 文档数据
+            data: 文档数据或文档列表
 
         Returns:
             InsertResult: 插入结果
@@ -105,30 +352,93 @@ class SupabaseAdapter(DatabaseAdapter):
             ConnectionError: 连接错误时抛出
         """
         try:
-            # 批量插入
-            if isinstance(data, list):
-                inserted_ids = []
-                for doc in data:
-                    response = await self._client.post(f"/rest/v1/{table}", json=doc)
-                    response.raise_for_status()
-                    result = response.json()
-                    if result:
-                        inserted_ids.append(result[0].get("id"))
-
-                return InsertResult(
-                    inserted_count=len(inserted_ids), inserted_ids=inserted_ids, success=True
+            records = data if isinstance(data, list) else [data]
+            if not records:
+                return InsertResult(inserted_count=0, inserted_ids=[])
+
+            options = self.config.options or {}
+            batch_size = options.get("insert_batch_size", DEFAULT_INSERT_BATCH_SIZE)
+            return_ids = options.get("return_ids", True)
+
+            inserted_count = 0
+            inserted_ids = []
+            for start in range(0, len(records), batch_size):
+                chunk = records[start : start + batch_size]
+                params, headers = self._build_insert_request(chunk, return_ids)
+                response = await self._client.post(
+                    f"/rest/v1/{table}", json=chunk, params=params, headers=headers
                 )
-
-            # 单个插入
-            else:
-                response = await self._client.post(f"/rest/v1/{table}", json=data)
                 response.raise_for_status()
-                result = response.json()
-                doc_id = result[0].get("id") if result else None
+                inserted_count += len(chunk)
 
-                return InsertResult(
-                    inserted_count=1, inserted_ids=[doc_id] if doc_id else [], success=True
-                )
+                if return_ids:
+                    rows = response.json() or []
+                    inserted_ids.extend(row["id"] for row in rows if row.get("id") is not None)
+
+            return InsertResult(
+                inserted_count=inserted_count, inserted_ids=inserted_ids, success=True
+            )
+
+        except TimeoutException as e:
+            raise ConnectionError(f"Supabase request timed out: {e}")
+        except ConnectError as e:
+            raise ConnectionError(f"Failed to connect to Supabase: {e}")
+        except HTTPStatusError as e:
+            raise QueryError(
+                f"Supabase request failed with status {e.response.status_code}: {e.response.text}"
+            )
+        except Exception as e:
+            translated = ExceptionTranslator.translate(e, "supabase")
+            raise translated
+
+    async def upsert(
+        self,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """
+        插入或更新文档
+
+        字段相同的记录按 insert_batch_size 分块，每块通过一次 POST 提交，使用
+        on_conflict 指定匹配字段并通过 Prefer: resolution=merge-duplicates 合并已有记录。
+
+        Args:
+            table: 表名
+            rows: 文档数据或文档列表
+            key_fields: 用于匹配已有记录的字段（需有唯一约束）
+
+        Returns:
+            UpsertResult: 插入或更新结果
+
+        Raises:
+            QueryError: 参数错误或请求失败时抛出
+            ConnectionError: 连接错误时抛出
+        """
+        records = self._validate_upsert(rows, key_fields)
+        try:
+            options = self.config.options or {}
+            batch_size = options.get("insert_batch_size", DEFAULT_INSERT_BATCH_SIZE)
+
+            # 按字段集合分组：merge-duplicates 会覆盖请求中的所有列，
+            # 不能用 missing=default 补齐缺失字段，否则会把已有记录的值改为列默认值
+            groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+            for record in records:
+                groups.setdefault(tuple(record), []).append(record)
+
+            params = {"on_conflict": ",".join(key_fields)}
+            headers = {"Prefer": "resolution=merge-duplicates,return=minimal"}
+            for group in groups.values():
+                for start in range(0, len(group), batch_size):
+                    response = await self._client.post(
+                        f"/rest/v1/{table}",
+                        json=group[start : start + batch_size],
+                        params=params,
+                        headers=headers,
+                    )
+                    response.raise_for_status()
+
+            return UpsertResult(upserted_count=len(records))
 
         except TimeoutException as e:
             raise ConnectionError(f"Supabase request timed out: {e}")
@@ -142,10 +452,12 @@ class SupabaseAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, "supabase")
             raise translated
 
-    async def delete(self, table: str, filters: dict[str, any]) -> DeleteResult:
+    async def delete(self, table: str, filters: dict[str, Any]) -> DeleteResult:
         """
         删除文档
 
+        使用过滤条件发送一次 DELETE 请求，删除数量从 Content-Range 中解析。
+
         Args:
             table: 表名
             filters: 过滤条件
@@ -157,24 +469,14 @@ class SupabaseAdapter(DatabaseAdapter):
             QueryError: 删除错误时抛出
         """
         try:
-            # 构建查询参数
-            params = {}
-            for field, value in filters.items():
-                params[field] = f"eq.{value}"
-
-            # 获取要删除的记录
-            response = await self._client.get(f"/rest/v1/{table}", params=params)
+            response = await self._client.delete(
+                f"/rest/v1/{table}",
+                params=self._build_filter_params(filters),
+                headers={"Prefer": "return=minimal,count=exact"},
+            )
             response.raise_for_status()
-            records = response.json()
-            deleted_count = len(records) if records else 0
-
-            # 删除记录
-            if deleted_count > 0:
-                for record in records:
-                    params = {"id": f"eq.{record['id']}"}
-                    await self._client.delete(f"/rest/v1/{table}", params=params)
 
-            return DeleteResult(deleted_count=deleted_count)
+            return DeleteResult(deleted_count=self._parse_content_range(response) or 0)
 
         except TimeoutException as e:
             raise ConnectionError(f"Supabase request timed out: {e}")
@@ -189,11 +491,13 @@ class SupabaseAdapter(DatabaseAdapter):
             raise translated
 
     async def update(
-        self, table: str, data: dict[str, any], filters: dict[str, any]
+        self, table: str, data: dict[str, Any], filters: dict[str, Any]
     ) -> UpdateResult:
         """
         更新文档
 
+        使用过滤条件发送一次 PATCH 请求，更新数量从 Content-Range 中解析。
+
         Args:
             table: 表名
             data: 要更新的数据
@@ -206,24 +510,15 @@ class SupabaseAdapter(DatabaseAdapter):
             QueryError: 更新错误时抛出
         """
         try:
-            # 构建查询参数
-            params = {}
-            for field, value in filters.items():
-                params[field] = f"eq.{value}"
-
-            # 获取要更新的记录
-            response = await self._client.get(f"/rest/v1/{table}", params=params)
+            response = await self._client.patch(
+                f"/rest/v1/{table}",
+                json=data,
+                params=self._build_filter_params(filters),
+                headers={"Prefer": "return=minimal,count=exact"},
+            )
             response.raise_for_status()
-            records = response.json()
-            updated_count = len(records) if records else 0
-
-            # 更新记录
-            if updated_count > 0:
-                for record in records:
-                    params = {"id": f"eq.{record['id']}"}
-                    await self._client.patch(f"/rest/v1/{table}", json=data, params=params)
 
-            return UpdateResult(updated_count=updated_count)
+            return UpdateResult(updated_count=self._parse_content_range(response) or 0)
 
         except TimeoutException as e:
             raise ConnectionError(f"Supabase request timed out: {e}")
@@ -238,15 +533,31 @@ class SupabaseAdapter(DatabaseAdapter):
             raise translated
 
     async def query(
-        self, table: str, filters: dict[str, any] | None = None, limit: int | None = None
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
     ) -> QueryResult:
         """
         查询文档
 
+        分页通过 limit/offset 在服务端完成，多取一条记录判断 has_more，不依赖总数。
+        总数通过 Prefer: count=<mode> 从 Content-Range 中获取，count 模式由
+        options["count"] 指定（exact / planned / estimated，默认 planned）。
+        planned 与 estimated 为估算值，只在仍有更多记录时采用（且至少比已返回的多一条），
+        需要精确总数时使用 exact（会额外执行一次 COUNT(*)）。
+
         Args:
             table: 表名
             filters: 过滤条件（可选）
             limit: 返回记录数限制（可选）
+            offset: 跳过的记录数（可选）
+            order_by: 排序字段列表，"-" 前缀表示降序（可选）
+            fields: 返回的字段列表（可选，默认返回全部字段）
 
         Returns:
             QueryResult: 查询结果
@@ -254,52 +565,58 @@ class SupabaseAdapter(DatabaseAdapter):
         Raises:
             QueryError: 查询错误时抛出
         """
+        count_mode = (self.config.options or {}).get("count", DEFAULT_COUNT_MODE)
+        if count_mode not in COUNT_MODES:
+            raise QueryError(
+                f"Invalid count mode: {count_mode}. Must be one of {', '.join(COUNT_MODES)}."
+            )
+
         try:
             # 构建查询参数
-            params = {}
-
-            # 应用过滤器
-            if filters:
-                for field, value in filters.items():
-                    if "__" in field:
-                        # 操作符
-                        field_name, operator = field.split("__", 1)
-                        if operator == "gt":
-                            params[field_name] = f"gt.{value}"
-                        elif operator == "lt":
-                            params[field_name] = f"lt.{value}"
-                        elif operator == "gte":
-                            params[field_name] = f"gte.{value}"
-                        elif operator == "lte":
-                            params[field_name] = f"lte.{value}"
-                        elif operator == "in":
-                            params[field_name] = f"in.({','.join(map(str, value))})"
-                        elif operator == "contains":
-                            params[field_name] = f"like.*{value}*"
-                        else:
-                            params[field_name] = f"eq.{value}"
-                    else:
-                        # 等值查询
-                        params[field] = f"eq.{value}"
-
-            # 应用限制
-            if limit:
-                params["limit"] = limit
+            params = self._build_filter_params(filters)
+
+            if fields:
+                params.append(("select", ",".join(fields)))
+            if order_by:
+                params.append(("order", self._build_order(order_by)))
+
+            # 多取一条：指定 limit 时用于判断 has_more，否则用于判断是否超出最大结果数
+            max_results = self.config.max_query_results
+            params.append(("limit", str((limit if limit is not None else max_results) + 1)))
+            if offset:
+                params.append(("offset", str(offset)))
 
             # 执行查询
-            response = await self._client.get(f"/rest/v1/{table}", params=params)
+            response = await self._client.get(
+                f"/rest/v1/{table}", params=params, headers={"Prefer": f"count={count_mode}"}
+            )
             response.raise_for_status()
-            data = response.json() if response.json() else []
+            data = response.json() or []
+
+            has_more = limit is not None and len(data) > limit
+            if has_more:
+                data = data[:limit]
 
             # 检查结果大小限制
-            max_results = self.config.max_query_results
             if len(data) > max_results:
                 raise QueryError(
                     f"Query result exceeds maximum limit of {max_results} records. "
                     f"Please add more specific filters to reduce the result size."
                 )
 
-            return QueryResult(data=data, count=len(data), has_more=False)
+            returned = (offset or 0) + len(data)
+            total = self._parse_content_range(response)
+            if has_more:
+                # 估算总数可能小于实际记录数，至少比已返回的多一条
+                total = max(total or 0, returned + 1)
+            elif data or total is None:
+                # 没有更多记录时总数即已返回的数量，不采用估算值
+                total = returned
+            else:
+                # offset 超出末尾时总数不超过 offset
+                total = min(total, returned)
+
+            return QueryResult(data=data, count=total, has_more=has_more)
 
         except TimeoutException as e:
             raise ConnectionError(f"Supabase request timed out: {e}")
@@ -329,12 +646,18 @@ class SupabaseAdapter(DatabaseAdapter):
         """
         raise QueryError("Supabase REST API does not support SQL queries")
 
-    async def advanced_query(self, operation: str, params: dict[str, any]) -> AdvancedResult:
+    async def advanced_query(self, operation: str, params: dict[str, Any]) -> AdvancedResult:
         """
         执行高级查询
 
+        支持的操作：
+            rpc: 调用 Postgres 函数，参数 {"function": 函数名, "args": 参数字典}
+            aggregate: PostgREST 聚合查询（需启用 db-aggregates-enabled），参数见
+                parse_aggregate（不支持 count_distinct），having、排序和 limit
+                在返回的分组上执行
+
         Args:
-            operation: 操作类型（如 "aggregation"）
+            operation: 操作类型（"rpc" 或 "aggregate"）
             params: 操作参数
 
         Returns:
@@ -343,7 +666,92 @@ class SupabaseAdapter(DatabaseAdapter):
         Raises:
             QueryError: 查询错误时抛出
         """
-        raise QueryError(f"Unsupported advanced operation: {operation}")
+        if operation == "rpc":
+            function = self._validate_identifier(params.get("function", ""))
+            request = self._client.build_request(
+                "POST", f"/rest/v1/rpc/{function}", json=params.get("args") or {}
+            )
+        elif operation == "aggregate":
+            spec = parse_aggregate(params)
+            query_params = self._build_filter_params(spec.filters)
+            query_params.append(("select", self._build_aggregate_select(spec)))
+            request = self._client.build_request(
+                "GET", f"/rest/v1/{spec.table}", params=query_params
+            )
+        else:
+            raise QueryError(f"Unsupported advanced operation: {operation}")
+
+        try:
+            response = await self._client.send(request)
+            response.raise_for_status()
+            data = response.json() if response.content else None
+            if operation == "aggregate":
+                data = finalize_rows(spec, data or [], self.config.max_query_results)
+
+            return AdvancedResult(operation=operation, data=data)
+
+        except TimeoutException as e:
+            raise ConnectionError(f"Supabase request timed out: {e}")
+        except ConnectError as e:
+            raise ConnectionError(f"Failed to connect to Supabase: {e}")
+        except HTTPStatusError as e:
+            raise QueryError(
+                f"Supabase request failed with status {e.response.status_code}: {e.response.text}"
+            )
+        except Exception as e:
+            translated = ExceptionTranslator.translate(e, "supabase")
+            raise translated
+
+    @staticmethod
+    def _validate_identifier(name: str) -> str:
+        """
+        验证表名、函数名、字段名等标识符
+
+        Args:
+            name: 标识符
+
+        Returns:
+            验证后的标识符
+
+        Raises:
+            QueryError: 标识符不合法时抛出
+        """
+        if not isinstance(name, str) or not _IDENTIFIER_RE.match(name):
+            raise QueryError(f"Invalid identifier: {name}")
+        return name
+
+    @staticmethod
+    def _build_aggregate_select(spec: AggregateSpec) -> str:
+        """
+        构建 PostgREST 聚合查询的 select 参数
+
+        Args:
+            spec: 聚合规格
+
+        Returns:
+            select 参数（如 "category,total:amount.sum(),count()"）
+
+        Raises:
+            QueryError: 聚合函数不受 PostgREST 支持时抛出
+        """
+        columns = list(spec.group_by)
+        for metric in spec.metrics:
+            if metric.func not in AGGREGATE_FUNCTIONS:
+                raise QueryError(
+                    f"Unsupported aggregate function: {metric.func}. "
+                    f"Must be one of {', '.join(AGGREGATE_FUNCTIONS)}."
+                )
+
+            if metric.field is None:
+                expression = "count()"
+            else:
+                expression = f"{metric.field}.{metric.func}()"
+            # 无字段的 count 在 PostgREST 中默认就命名为 count
+            if metric.field is not None or metric.alias != "count":
+                expression = f"{metric.alias}:{expression}"
+            columns.append(expression)
+
+        return ",".join(columns)
 
     def get_capabilities(self) -> Capability:
         """
@@ -355,7 +763,7 @@ class SupabaseAdapter(DatabaseAdapter):
         return Capability(
             basic_crud=True,
             full_text_search=True,
-            aggregation=False,
+            aggregation=True,
             transactions=False,
-            advanced_query=False,
+            advanced_query=True,
         )
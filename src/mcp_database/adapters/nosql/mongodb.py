@@ -1,13 +1,20 @@
 """MongoDB 适配器"""
 
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 from motor.motor_asyncio import (
     AsyncIOMotorClient,
     AsyncIOMotorCollection,
     AsyncIOMotorDatabase,
 )
+from pymongo import ASCENDING, DESCENDING, UpdateOne
 from pymongo.errors import PyMongoError
 
-from mcp_database.core.adapter import DatabaseAdapter
+from mcp_database.core.adapter import WRITE_BATCH_SIZE, DatabaseAdapter
+from mcp_database.core.aggregation import AggregateSpec, fetch_limit, parse_aggregate
 from mcp_database.core.exceptions import (
     ConnectionError,
     ExceptionTranslator,
@@ -23,8 +30,32 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
 
+logger = logging.getLogger(__name__)
+
+
+def _mongo_accumulator(func: str, field: str | None) -> dict[str, Any]:
+    """
+    聚合函数对应的 $group 累加器
+
+    Args:
+        func: 聚合函数
+        field: 字段名（count 可为空）
+
+    Returns:
+        dict[str, Any]: $group 累加器表达式
+    """
+    if func == "count":
+        if field is None:
+            return {"$sum": 1}
+        # 只统计字段非空的文档
+        return {"$sum": {"$cond": [{"$eq": [{"$ifNull": [f"${field}", None]}, None]}, 0, 1]}}
+    if func == "count_distinct":
+        return {"$addToSet": f"${field}"}
+    return {f"${func}": f"${field}"}
+
 
 class MongoDBAdapter(DatabaseAdapter):
     """
@@ -58,21 +89,24 @@ class MongoDBAdapter(DatabaseAdapter):
             return url_parts[3].split("?")[0]
         return "test"
 
-    def _get_collection(self, table: str) -> AsyncIOMotorCollection:
+    def _get_collection(self, table: str | None) -> AsyncIOMotorCollection:
         """
         获取集合
 
         Args:
-            table: 集合名称
+            table: 集合名称（来自 advanced/batch 参数时可能缺失）
 
         Returns:
             AsyncIOMotorCollection: MongoDB 集合
 
         Raises:
             ConnectionError: 未连接时抛出
+            QueryError: 集合名称缺失时抛出
         """
         if not self._connected or self._database is None:
             raise ConnectionError("Not connected to MongoDB")
+        if not isinstance(table, str) or not table:
+            raise QueryError("MongoDB operation requires a collection name")
 
         return self._database[table]
 
@@ -115,7 +149,7 @@ class MongoDBAdapter(DatabaseAdapter):
             self._database = None
             self._connected = False
 
-    async def insert(self, table: str, data: dict[str, any] | list[dict[str, any]]) -> InsertResult:
+    async def insert(self, table: str, data: dict[str, Any] | list[dict[str, Any]]) -> InsertResult:
         """
         插入文档
 
@@ -138,13 +172,13 @@ class MongoDBAdapter(DatabaseAdapter):
 
             # 批量插入
             if isinstance(data, list):
-                result = await collection.insert_many(data)
-                inserted_ids = result.inserted_ids
+                many_result = await collection.insert_many(data)
+                inserted_ids = many_result.inserted_ids
                 inserted_count = len(inserted_ids)
             else:
                 # 单条插入
-                result = await collection.insert_one(data)
-                inserted_ids = [result.inserted_id]
+                one_result = await collection.insert_one(data)
+                inserted_ids = [one_result.inserted_id]
                 inserted_count = 1
 
             return InsertResult(inserted_count=inserted_count, inserted_ids=inserted_ids)
@@ -153,10 +187,110 @@ class MongoDBAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, "mongodb")
             raise translated
 
-    async def delete(self, table: str, filters: dict[str, any]) -> DeleteResult:
+    async def upsert(
+        self,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """
+        插入或更新文档
+
+        每批文档通过一次 bulk_write 提交，每个文档对应一个 upsert=True 的 UpdateOne。
+
+        Args:
+            table: 集合名称
+            rows: 文档字典或列表
+            key_fields: 用于匹配已有文档的字段
+
+        Returns:
+            UpsertResult: 插入或更新结果
+
+        Raises:
+            QueryError: 参数错误或执行失败时抛出
+        """
+        records = self._validate_upsert(rows, key_fields)
+        try:
+            collection = self._get_collection(table)
+
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                operations = self._build_upsert_operations(
+                    records[start : start + WRITE_BATCH_SIZE], key_fields
+                )
+                await collection.bulk_write(operations, ordered=False)
+
+            return UpsertResult(upserted_count=len(records))
+
+        except PyMongoError as e:
+            translated = ExceptionTranslator.translate(e, "mongodb")
+            raise translated
+
+    @staticmethod
+    def _build_upsert_operations(
+        records: list[dict[str, Any]], key_fields: list[str]
+    ) -> list[UpdateOne]:
+        """
+        构建 upsert 批量写操作
+
+        Args:
+            records: 文档列表
+            key_fields: 匹配字段
+
+        Returns:
+            list[UpdateOne]: bulk_write 操作列表
+        """
+        return [
+            UpdateOne({field: record[field] for field in key_fields}, {"$set": record}, upsert=True)
+            for record in records
+        ]
+
+    async def bulk_update(
+        self, table: str, rows: list[dict[str, Any]], key_field: str
+    ) -> UpdateResult:
+        """
+        批量更新文档
+
+        每批文档通过一次 bulk_write 提交，每个文档对应一个按 key_field 定位的 UpdateOne。
+
+        Args:
+            table: 集合名称
+            rows: 数据列表，每条记录包含 key_field 和要更新的字段
+            key_field: 用于定位文档的字段
+
+        Returns:
+            UpdateResult: 更新结果
+
+        Raises:
+            QueryError: 参数错误或执行失败时抛出
+        """
+        records = self._validate_bulk_update(rows, key_field)
+        try:
+            collection = self._get_collection(table)
+
+            updated_count = 0
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                operations = [
+                    UpdateOne(
+                        {key_field: record[key_field]},
+                        {"$set": {k: v for k, v in record.items() if k != key_field}},
+                    )
+                    for record in records[start : start + WRITE_BATCH_SIZE]
+                ]
+                result = await collection.bulk_write(operations, ordered=False)
+                updated_count += result.modified_count
+
+            return UpdateResult(updated_count=updated_count)
+
+        except PyMongoError as e:
+            translated = ExceptionTranslator.translate(e, "mongodb")
+            raise translated
+
+    async def delete(self, table: str, filters: dict[str, Any]) -> DeleteResult:
         """
         删除文档
 
+        设置 options["chunk_size"] 后按 _id 分块删除（见 _run_chunked）。
+
         Args:
             table: 集合名称
             filters: 过滤条件
@@ -173,6 +307,17 @@ class MongoDBAdapter(DatabaseAdapter):
             # 转换过滤器
             mongo_filters = self._filter_translator.translate(filters)
 
+            chunk_size, chunk_delay = self._chunk_options()
+            if chunk_size:
+
+                async def delete_chunk(chunk_filters: dict[str, Any]) -> int:
+                    return (await collection.delete_many(chunk_filters)).deleted_count
+
+                deleted_count = await self._run_chunked(
+                    collection, mongo_filters, chunk_size, chunk_delay, delete_chunk
+                )
+                return DeleteResult(deleted_count=deleted_count)
+
             result = await collection.delete_many(mongo_filters)
             deleted_count = result.deleted_count
 
@@ -182,12 +327,72 @@ class MongoDBAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, "mongodb")
             raise translated
 
+    async def _run_chunked(
+        self,
+        collection: AsyncIOMotorCollection,
+        mongo_filters: dict[str, Any],
+        chunk_size: int,
+        chunk_delay: float,
+        apply: Callable[[dict[str, Any]], Awaitable[int]],
+    ) -> int:
+        """
+        按 _id 分块执行删除或更新
+
+        只打开一个按 _id 排序的游标，依次取出每块匹配文档的 _id，再对这些文档执行
+        一次操作；不用 {"_id": {"$gt": 上一块最大 _id}} 重新查询，因此 _id 类型
+        混杂（ObjectId、字符串、数字等）时也不会漏掉文档。块之间等待 chunk_delay
+        秒，并记录进度日志。
+
+        Args:
+            collection: 集合
+            mongo_filters: 已转换的过滤条件
+            chunk_size: 每块的文档数
+            chunk_delay: 块之间的等待秒数
+            apply: 对一块文档执行操作并返回影响文档数的函数
+
+        Returns:
+            影响的总文档数
+        """
+        total = 0
+        chunk = 0
+        cursor = (
+            collection.find(mongo_filters, {"_id": 1}).sort("_id", ASCENDING).batch_size(chunk_size)
+        )
+        try:
+            while True:
+                ids = [doc["_id"] for doc in await cursor.to_list(chunk_size)]
+                if not ids:
+                    break
+
+                # 重新应用原过滤条件，跳过选出后被并发修改而不再匹配的文档
+                count = await apply({"$and": [mongo_filters, {"_id": {"$in": ids}}]})
+                total += count
+                chunk += 1
+                logger.info(
+                    "Chunk %d on %s affected %d documents (%d total)",
+                    chunk,
+                    collection.name,
+                    count,
+                    total,
+                )
+
+                if len(ids) < chunk_size:
+                    break
+                if chunk_delay:
+                    await asyncio.sleep(chunk_delay)
+        finally:
+            await cursor.close()
+
+        return total
+
     async def update(
-        self, table: str, data: dict[str, any], filters: dict[str, any]
+        self, table: str, data: dict[str, Any], filters: dict[str, Any]
     ) -> UpdateResult:
         """
         更新文档
 
+        设置 options["chunk_size"] 后按 _id 分块更新（见 _run_chunked）。
+
         Args:
             table: 集合名称
             data: 要更新的数据
@@ -205,6 +410,18 @@ class MongoDBAdapter(DatabaseAdapter):
             # 转换过滤器
             mongo_filters = self._filter_translator.translate(filters)
 
+            chunk_size, chunk_delay = self._chunk_options()
+            if chunk_size:
+
+                async def update_chunk(chunk_filters: dict[str, Any]) -> int:
+                    result = await collection.update_many(chunk_filters, {"$set": data})
+                    return result.modified_count
+
+                updated_count = await self._run_chunked(
+                    collection, mongo_filters, chunk_size, chunk_delay, update_chunk
+                )
+                return UpdateResult(updated_count=updated_count)
+
             result = await collection.update_many(mongo_filters, {"$set": data})
             updated_count = result.modified_count
 
@@ -215,7 +432,14 @@ class MongoDBAdapter(DatabaseAdapter):
             raise translated
 
     async def query(
-        self, table: str, filters: dict[str, any] | None = None, limit: int | None = None
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
     ) -> QueryResult:
         """
         查询文档
@@ -224,6 +448,9 @@ class MongoDBAdapter(DatabaseAdapter):
             table: 集合名称
             filters: 过滤条件（可选）
             limit: 返回记录数限制（可选）
+            offset: 跳过的记录数（可选）
+            order_by: 排序字段列表，"-" 前缀表示降序（可选）
+            fields: 返回的字段列表（可选，默认返回全部字段）
 
         Returns:
             QueryResult: 查询结果
@@ -233,6 +460,7 @@ class MongoDBAdapter(DatabaseAdapter):
         """
         try:
             collection = self._get_collection(table)
+            offset = self._validate_offset(offset)
 
             # 转换过滤器
             mongo_filters = self._filter_translator.translate(filters) if filters else {}
@@ -240,22 +468,22 @@ class MongoDBAdapter(DatabaseAdapter):
             # 查询总数
             total_count = await collection.count_documents(mongo_filters)
 
-            # 检查结果大小限制
+            # 查询数据（排序、分页和字段投影在服务端完成），
+            # 未指定 limit 时多取一条，用于判断本页是否超出最大结果数
             max_results = self.config.max_query_results
-            if total_count > max_results:
+            cursor = self._find(
+                collection, mongo_filters, limit or max_results + 1, offset, order_by, fields
+            )
+
+            data = await cursor.to_list(length=None)
+
+            # 结果大小限制作用于本页，总数较大时仍可通过 limit / offset 分页
+            if len(data) > max_results:
                 raise QueryError(
                     f"Query result exceeds maximum limit of {max_results} records. "
-                    f"Please add more specific filters to reduce the result size."
+                    f"Please add more specific filters or use limit/offset to page the results."
                 )
 
-            # 查询数据
-            cursor = collection.find(mongo_filters)
-
-            if limit:
-                cursor = cursor.limit(limit)
-
-            data = await cursor.to_list(length=None)
-
             # 转换 _id 为字符串
             for doc in data:
                 if "_id" in doc:
@@ -264,14 +492,14 @@ class MongoDBAdapter(DatabaseAdapter):
             return QueryResult(
                 data=data,
                 count=total_count,
-                has_more=limit is not None and len(data) == limit and total_count > limit,
+                has_more=offset + len(data) < total_count,
             )
 
         except PyMongoError as e:
             translated = ExceptionTranslator.translate(e, "mongodb")
             raise translated
 
-    async def execute(self, query: str, params: dict[str, any] | None = None) -> ExecuteResult:
+    async def execute(self, query: str, params: dict[str, Any] | None = None) -> ExecuteResult:
         """
         执行自定义查询（MongoDB 不支持原始 SQL）
 
@@ -287,10 +515,13 @@ class MongoDBAdapter(DatabaseAdapter):
         """
         raise QueryError("MongoDB does not support raw SQL queries. Use query() method instead.")
 
-    async def advanced_query(self, operation: str, params: dict[str, any]) -> AdvancedResult:
+    async def advanced_query(self, operation: str, params: dict[str, Any]) -> AdvancedResult:
         """
         执行高级查询（聚合、事务等）
 
+        aggregate 操作传入 pipeline 时直接执行原生聚合管道，否则按声明式聚合规格
+        （参数见 parse_aggregate）编译为 $match / $group / $project / $sort / $limit 管道。
+
         Args:
             operation: 操作类型（如 "aggregate", "transaction"）
             params: 操作参数
@@ -305,12 +536,25 @@ class MongoDBAdapter(DatabaseAdapter):
             if operation == "aggregate":
                 # 聚合查询
                 table = params.get("table")
-                pipeline = params.get("pipeline", [])
+                max_results = None
+                if "pipeline" in params:
+                    pipeline = params["pipeline"]
+                else:
+                    spec = parse_aggregate(params)
+                    table = spec.table
+                    pipeline = self._build_aggregate_pipeline(spec)
+                    max_results = self.config.max_query_results
 
                 collection = self._get_collection(table)
                 cursor = collection.aggregate(pipeline)
                 data = await cursor.to_list(length=None)
 
+                if max_results is not None and len(data) > max_results:
+                    raise QueryError(
+                        f"Aggregate result exceeds maximum limit of {max_results} groups. "
+                        f"Please add more specific filters or fewer group_by fields."
+                    )
+
                 # 转换 _id 为字符串
                 for doc in data:
                     if "_id" in doc:
@@ -324,7 +568,7 @@ class MongoDBAdapter(DatabaseAdapter):
                 operations = params.get("operations", [])
 
                 collection = self._get_collection(table)
-                results = []
+                results: list[dict[str, Any]] = []
 
                 for op in operations:
                     op_type = op["type"]
@@ -334,17 +578,32 @@ class MongoDBAdapter(DatabaseAdapter):
                     mongo_filters = self._filter_translator.translate(op_filters)
 
                     if op_type == "insert":
-                        result = await collection.insert_one(op_data)
-                        results.append({"inserted_id": str(result.inserted_id)})
+                        inserted = await collection.insert_one(op_data)
+                        results.append({"inserted_id": str(inserted.inserted_id)})
                     elif op_type == "update":
-                        result = await collection.update_many(mongo_filters, {"$set": op_data})
-                        results.append({"modified_count": result.modified_count})
+                        updated = await collection.update_many(mongo_filters, {"$set": op_data})
+                        results.append({"modified_count": updated.modified_count})
                     elif op_type == "delete":
-                        result = await collection.delete_many(mongo_filters)
-                        results.append({"deleted_count": result.deleted_count})
+                        deleted = await collection.delete_many(mongo_filters)
+                        results.append({"deleted_count": deleted.deleted_count})
 
                 return AdvancedResult(operation=operation, data={"results": results})
 
+            elif operation == "batch":
+                # 在同一会话事务中执行多个增删改查操作（需要副本集或分片集群）
+                if self._client is None:
+                    raise ConnectionError("Not connected to MongoDB")
+                async with await self._client.start_session() as session:
+                    async with session.start_transaction():
+                        results = [
+                            await self._apply_operation(op, session)
+                            for op in params.get("operations", [])
+                        ]
+
+                return AdvancedResult(
+                    operation=operation, data={"results": results, "committed": True}
+                )
+
             else:
                 raise QueryError(f"Unsupported operation: {operation}")
 
@@ -352,6 +611,144 @@ class MongoDBAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, "mongodb")
             raise translated
 
+    def _build_aggregate_pipeline(self, spec: AggregateSpec) -> list[dict[str, Any]]:
+        """
+        将聚合规格编译为 MongoDB 聚合管道
+
+        Args:
+            spec: 聚合规格
+
+        Returns:
+            list[dict[str, Any]]: 聚合管道
+        """
+        pipeline: list[dict[str, Any]] = []
+        if spec.filters:
+            pipeline.append({"$match": self._filter_translator.translate(spec.filters)})
+
+        group: dict[str, Any] = {
+            "_id": {field: f"${field}" for field in spec.group_by} if spec.group_by else None
+        }
+        project: dict[str, Any] = {"_id": 0}
+        for field in spec.group_by:
+            project[field] = f"$_id.{field}"
+        for metric in spec.metrics:
+            group[metric.alias] = _mongo_accumulator(metric.func, metric.field)
+            # count_distinct 先收集去重集合，再投影为集合大小
+            project[metric.alias] = (
+                {"$size": f"${metric.alias}"} if metric.func == "count_distinct" else 1
+            )
+        pipeline += [{"$group": group}, {"$project": project}]
+
+        if spec.having:
+            pipeline.append({"$match": self._filter_translator.translate(spec.having)})
+        if spec.ordering:
+            sort = {column: DESCENDING if desc else ASCENDING for column, desc in spec.ordering}
+            pipeline.append({"$sort": sort})
+        # 未指定 limit 时多取一条，用于判断分组数是否超出最大结果数
+        pipeline.append({"$limit": fetch_limit(spec, self.config.max_query_results)})
+        return pipeline
+
+    def _find(
+        self,
+        collection: Any,
+        mongo_filters: dict[str, Any],
+        limit: int | None,
+        offset: int,
+        order_by: list[str] | None,
+        fields: list[str] | None,
+        session: Any = None,
+    ) -> Any:
+        """
+        创建带排序、分页和字段投影的查询游标
+
+        Args:
+            collection: 集合
+            mongo_filters: MongoDB 查询条件
+            limit: 返回记录数限制
+            offset: 跳过的记录数
+            order_by: 排序字段列表，"-" 前缀表示降序
+            fields: 返回的字段列表（未包含 _id 时不返回 _id）
+            session: MongoDB 会话（可选）
+
+        Returns:
+            查询游标
+        """
+        projection = None
+        if fields:
+            projection = {field: 1 for field in fields}
+            projection.setdefault("_id", 0)
+
+        cursor = collection.find(mongo_filters, projection, session=session)
+        sort = [
+            (field, DESCENDING if descending else ASCENDING)
+            for field, descending in self._parse_order_by(order_by)
+        ]
+        if sort:
+            cursor = cursor.sort(sort)
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def _apply_operation(self, op: dict[str, Any], session: Any = None) -> dict[str, Any]:
+        """
+        执行单个批量操作
+
+        Args:
+            op: 操作描述，包含 type、table 及 data/filters/limit
+            session: MongoDB 会话（可选，用于事务）
+
+        Returns:
+            操作结果字典
+
+        Raises:
+            QueryError: 操作类型不支持时抛出
+        """
+        op_type = op.get("type")
+        collection = self._get_collection(op.get("table"))
+        filters = op.get("filters") or {}
+        mongo_filters = self._filter_translator.translate(filters) if filters else {}
+
+        if op_type == "insert":
+            data = op.get("data", [])
+            docs = data if isinstance(data, list) else [data]
+            if not docs:
+                return InsertResult(inserted_count=0, inserted_ids=[]).model_dump()
+            inserted = await collection.insert_many(docs, session=session)
+            inserted_ids = [str(inserted_id) for inserted_id in inserted.inserted_ids]
+            return InsertResult(
+                inserted_count=len(inserted_ids), inserted_ids=inserted_ids
+            ).model_dump()
+
+        if op_type == "query":
+            cursor = self._find(
+                collection,
+                mongo_filters,
+                op.get("limit"),
+                self._validate_offset(op.get("offset")),
+                op.get("order_by"),
+                op.get("fields"),
+                session=session,
+            )
+            data = await cursor.to_list(length=None)
+            for doc in data:
+                if "_id" in doc:
+                    doc["_id"] = str(doc["_id"])
+            return QueryResult(data=data, count=len(data)).model_dump()
+
+        if op_type == "update":
+            updated = await collection.update_many(
+                mongo_filters, {"$set": op.get("data", {})}, session=session
+            )
+            return UpdateResult(updated_count=updated.modified_count).model_dump()
+
+        if op_type == "delete":
+            deleted = await collection.delete_many(mongo_filters, session=session)
+            return DeleteResult(deleted_count=deleted.deleted_count).model_dump()
+
+        raise QueryError(f"Unsupported batch operation type: {op_type}")
+
     def get_capabilities(self) -> Capability:
         """
         获取数据库能力
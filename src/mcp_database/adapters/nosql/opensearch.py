@@ -6,8 +6,21 @@ from typing import Any
 from opensearchpy import AsyncOpenSearch
 from opensearchpy.exceptions import OpenSearchException
 
-from mcp_database.core.adapter import DatabaseAdapter
+from mcp_database.core.adapter import WRITE_BATCH_SIZE, DatabaseAdapter
+from mcp_database.core.aggregation import (
+    AggregateSpec,
+    fetch_limit,
+    finalize_rows,
+    parse_aggregate,
+)
 from mcp_database.core.exceptions import ExceptionTranslator, QueryError
+from mcp_database.core.filters import (
+    FilterCondition,
+    FilterGroup,
+    FilterPlan,
+    compile_filters,
+    group_filters,
+)
 from mcp_database.core.models import (
     AdvancedResult,
     Capability,
@@ -17,8 +30,41 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
 
+# 聚合函数对应的 OpenSearch 指标聚合（无字段的 count 直接使用桶的 doc_count，
+# count_distinct 使用近似去重计数 cardinality）
+_METRIC_AGGREGATIONS = {
+    "count": "value_count",
+    "sum": "sum",
+    "avg": "avg",
+    "min": "min",
+    "max": "max",
+    "count_distinct": "cardinality",
+}
+
+
+def _terms_order(spec: AggregateSpec) -> list[dict[str, str]] | None:
+    """
+    可下推到 terms 聚合的排序
+
+    只有单层分组且没有 having 时，terms 按排序取前 size 个桶的结果才与完整结果一致；
+    其他情况返回 None，由客户端排序。
+
+    Args:
+        spec: 聚合规格
+
+    Returns:
+        terms.order 列表，或 None
+    """
+    if len(spec.group_by) != 1 or spec.having:
+        return None
+    keys = {spec.group_by[0]: "_key"}
+    for metric in spec.metrics:
+        keys[metric.alias] = metric.alias if metric.field is not None else "_count"
+    return [{keys[column]: "desc" if desc else "asc"} for column, desc in spec.ordering]
+
 
 class OpenSearchAdapter(DatabaseAdapter):
     """OpenSearch 数据库适配器"""
@@ -39,6 +85,68 @@ class OpenSearchAdapter(DatabaseAdapter):
         """是否已连接"""
         return self._is_connected
 
+    def _get_hosts(self) -> list[str]:
+        """
+        获取集群节点列表
+
+        Returns:
+            节点 URL 列表，未配置 hosts 时仅包含 url
+        """
+        return list(self.config.hosts) or [self.config.url]
+
+    def _build_client_kwargs(self) -> dict[str, Any]:
+        """
+        构建 AsyncOpenSearch 客户端参数
+
+        支持的 options：
+            verify_ssl: 是否验证 SSL 证书（仅用于测试环境）
+            sniff_on_start: 启动时探测集群节点（默认 False）
+            sniff_on_connection_fail: 节点失败时重新探测（多节点时默认 True）
+            sniffer_timeout: 定期探测间隔（秒，默认不定期探测）
+            pool_maxsize: 每个节点的连接池大小（默认 pool_size）
+            http_compress: 启用 HTTP gzip 压缩（默认 True）
+            dead_timeout: 失败节点的下线时间（秒，默认 60）
+            max_retries: 请求失败时切换节点重试的次数（默认 3）
+
+        Returns:
+            客户端参数字典
+        """
+        options = self.config.options or {}
+        hosts = self._get_hosts()
+        multi_node = len(hosts) > 1
+
+        # 检查是否为 HTTPS 连接
+        is_https = hosts[0].startswith("https://")
+
+        # 创建客户端 - 默认启用 SSL 证书验证
+        # 仅在非 HTTPS 或显式禁用时才禁用验证
+        verify_certs = is_https
+
+        # 检查配置中是否显式禁用了 SSL 验证（仅用于测试环境）
+        if "verify_ssl" in options:
+            verify_certs = options["verify_ssl"]
+
+        kwargs: dict[str, Any] = {
+            "hosts": hosts,
+            "verify_certs": verify_certs,
+            "ssl_show_warn": not verify_certs,
+            "ssl_context": ssl.create_default_context() if verify_certs else None,
+            "timeout": self.config.query_timeout,
+            "pool_maxsize": options.get("pool_maxsize", self.config.pool_size),
+            "http_compress": options.get("http_compress", True),
+            # 节点探测：启动时及节点失败时刷新可用节点列表
+            "sniff_on_start": options.get("sniff_on_start", False),
+            "sniff_on_connection_fail": options.get("sniff_on_connection_fail", multi_node),
+            "sniffer_timeout": options.get("sniffer_timeout"),
+            "sniff_timeout": self.config.connect_timeout,
+            # 故障转移：超时或 5xx 时切换到其他节点重试
+            "max_retries": options.get("max_retries", 3),
+            "retry_on_timeout": multi_node,
+            "dead_timeout": options.get("dead_timeout", 60),
+        }
+
+        return kwargs
+
     async def connect(self) -> None:
         """
         连接到 OpenSearch 数据库
@@ -47,27 +155,7 @@ class OpenSearchAdapter(DatabaseAdapter):
             ConnectionError: 连接失败时抛出
         """
         try:
-            # 解析 URL
-            url = self.config.url
-
-            # 检查是否为 HTTPS 连接
-            is_https = url.startswith("https://")
-
-            # 创建客户端 - 默认启用 SSL 证书验证
-            # 仅在非 HTTPS 或显式禁用时才禁用验证
-            verify_certs = is_https
-
-            # 检查配置中是否显式禁用了 SSL 验证（仅用于测试环境）
-            if hasattr(self.config, "options") and self.config.options:
-                if "verify_ssl" in self.config.options:
-                    verify_certs = self.config.options["verify_ssl"]
-
-            self._client = AsyncOpenSearch(
-                hosts=[url],
-                verify_certs=verify_certs,
-                ssl_show_warn=not verify_certs,
-                ssl_context=ssl.create_default_context() if verify_certs else None,
-            )
+            self._client = AsyncOpenSearch(**self._build_client_kwargs())
 
             # 测试连接
             await self._client.ping()
@@ -147,6 +235,126 @@ class OpenSearchAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, "opensearch")
             raise translated
 
+    async def upsert(
+        self,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """
+        插入或更新文档
+
+        文档 ID 由 key_fields 的值拼接而成，每批文档通过一次 bulk 请求提交
+        （update + doc_as_upsert，已有文档按字段合并）。
+
+        Args:
+            table: 索引名
+            rows: 文档字典或列表
+            key_fields: 用于生成文档 ID 的字段
+
+        Returns:
+            UpsertResult: 插入或更新结果
+
+        Raises:
+            QueryError: 参数错误或所有文档都失败时抛出
+        """
+        records = self._validate_upsert(rows, key_fields)
+        try:
+            upserted = 0
+            failed_items = []
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                operations = self._build_upsert_operations(
+                    table, records[start : start + WRITE_BATCH_SIZE], key_fields
+                )
+                response = await self._client.bulk(body=operations)
+
+                # 处理部分成功的情况
+                for item in response.get("items", []):
+                    update_result = item.get("update", {})
+                    if update_result.get("error"):
+                        failed_items.append(update_result)
+                    else:
+                        upserted += 1
+
+            if records and not upserted:
+                raise QueryError(f"All documents failed to upsert: {failed_items}")
+
+            return UpsertResult(upserted_count=upserted, success=not failed_items)
+
+        except OpenSearchException as e:
+            translated = ExceptionTranslator.translate(e, "opensearch")
+            raise translated
+
+    @staticmethod
+    def _build_upsert_operations(
+        table: str, records: list[dict[str, Any]], key_fields: list[str]
+    ) -> list[dict[str, Any]]:
+        """
+        构建 upsert 的 bulk 请求体
+
+        Args:
+            table: 索引名
+            records: 文档列表
+            key_fields: 用于生成文档 ID 的字段
+
+        Returns:
+            list[dict[str, Any]]: bulk 操作列表
+        """
+        operations = []
+        for record in records:
+            doc_id = ":".join(str(record[field]) for field in key_fields)
+            operations.append({"update": {"_index": table, "_id": doc_id}})
+            operations.append({"doc": record, "doc_as_upsert": True})
+        return operations
+
+    async def bulk_update(
+        self, table: str, rows: list[dict[str, Any]], key_field: str
+    ) -> UpdateResult:
+        """
+        批量更新文档
+
+        key_field 的值作为文档 ID，每批文档通过一次 bulk update 请求提交；
+        不存在的文档被忽略。
+
+        Args:
+            table: 索引名
+            rows: 数据列表，每条记录包含 key_field 和要更新的字段
+            key_field: 作为文档 ID 的字段
+
+        Returns:
+            UpdateResult: 更新结果
+
+        Raises:
+            QueryError: 参数错误或所有文档都失败时抛出
+        """
+        records = self._validate_bulk_update(rows, key_field)
+        try:
+            updated_count = 0
+            failed_items = []
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                operations = []
+                for record in records[start : start + WRITE_BATCH_SIZE]:
+                    operations.append({"update": {"_index": table, "_id": str(record[key_field])}})
+                    operations.append({"doc": {k: v for k, v in record.items() if k != key_field}})
+                response = await self._client.bulk(body=operations)
+
+                for item in response.get("items", []):
+                    update_result = item.get("update", {})
+                    error = update_result.get("error")
+                    if not error:
+                        updated_count += 1
+                    elif error.get("type") != "document_missing_exception":
+                        failed_items.append(update_result)
+
+            if failed_items and not updated_count:
+                raise QueryError(f"All documents failed to update: {failed_items}")
+
+            return UpdateResult(updated_count=updated_count, success=not failed_items)
+
+        except OpenSearchException as e:
+            translated = ExceptionTranslator.translate(e, "opensearch")
+            raise translated
+
     async def delete(self, table: str, filters: dict[str, Any]) -> DeleteResult:
         """
         删除文档
@@ -215,7 +423,14 @@ class OpenSearchAdapter(DatabaseAdapter):
             raise translated
 
     async def query(
-        self, table: str, filters: dict[str, Any] | None = None, limit: int | None = None
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
     ) -> QueryResult:
         """
         查询文档
@@ -224,6 +439,9 @@ class OpenSearchAdapter(DatabaseAdapter):
             table: 索引名
             filters: 过滤条件（可选）
             limit: 返回记录数限制（可选）
+            offset: 跳过的记录数（可选）
+            order_by: 排序字段列表，"-" 前缀表示降序（可选）
+            fields: 返回的字段列表（可选，默认返回全部字段）
 
         Returns:
             QueryResult: 查询结果
@@ -236,9 +454,20 @@ class OpenSearchAdapter(DatabaseAdapter):
             query = self._build_query(filters) if filters else {"match_all": {}}
 
             # 执行查询
-            search_body = {"query": query}
-            if limit:
-                search_body["size"] = limit
+            # 未指定 limit 时多取一条，用于判断本页是否超出最大结果数
+            max_results = self.config.max_query_results
+            search_body = {"query": query, "size": limit or max_results + 1}
+            offset = self._validate_offset(offset)
+            if offset:
+                search_body["from"] = offset
+            sort = [
+                {field: {"order": "desc" if descending else "asc"}}
+                for field, descending in self._parse_order_by(order_by)
+            ]
+            if sort:
+                search_body["sort"] = sort
+            if fields:
+                search_body["_source"] = list(fields)
 
             result = await self._client.search(index=table, body=search_body)
 
@@ -247,18 +476,17 @@ class OpenSearchAdapter(DatabaseAdapter):
             data = [hit["_source"] for hit in hits["hits"]]
             total = hits["total"]["value"]
 
-            # 检查结果大小限制
-            max_results = self.config.max_query_results
-            if total > max_results:
+            # 结果大小限制作用于本页，总数较大时仍可通过 limit / offset 分页
+            if len(data) > max_results:
                 raise QueryError(
                     f"Query result exceeds maximum limit of {max_results} records. "
-                    f"Please add more specific filters to reduce the result size."
+                    f"Please add more specific filters or use limit/offset to page the results."
                 )
 
             return QueryResult(
                 data=data,
                 count=total,
-                has_more=limit is not None and len(data) == limit and total > limit,
+                has_more=offset + len(data) < total,
             )
 
         except OpenSearchException as e:
@@ -285,8 +513,14 @@ class OpenSearchAdapter(DatabaseAdapter):
         """
         执行高级查询
 
+        支持的操作：
+            aggregation: 执行原生聚合请求，参数 {"index": 索引, "body": 请求体}
+            aggregate: 声明式聚合（参数见 parse_aggregate），分组编译为嵌套 terms 聚合，
+                指标编译为 sum/avg/min/max/value_count/cardinality 聚合，
+                having、排序和 limit 在展开后的分组上执行
+
         Args:
-            operation: 操作类型（如 "aggregation"）
+            operation: 操作类型（如 "aggregation", "aggregate"）
             params: 操作参数
 
         Returns:
@@ -296,7 +530,25 @@ class OpenSearchAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            if operation == "aggregation":
+            if operation == "aggregate":
+                spec = parse_aggregate(params)
+                result = await self._client.search(
+                    index=spec.table, body=self._build_aggregate_body(spec)
+                )
+                max_results = self.config.max_query_results
+                rows = self._flatten_aggregations(
+                    spec,
+                    result.get("aggregations", {}),
+                    result["hits"]["total"]["value"],
+                    max_results,
+                )
+                return AdvancedResult(
+                    data=finalize_rows(spec, rows, max_results),
+                    operation=operation,
+                    success=True,
+                )
+
+            elif operation == "aggregation":
                 # 聚合查询
                 result = await self._client.search(
                     index=params.get("index", "*"), body=params.get("body", {})
@@ -327,6 +579,89 @@ class OpenSearchAdapter(DatabaseAdapter):
             advanced_query=True,
         )
 
+    def _build_aggregate_body(self, spec: AggregateSpec) -> dict[str, Any]:
+        """
+        将聚合规格编译为 OpenSearch 聚合请求体
+
+        Args:
+            spec: 聚合规格
+
+        Returns:
+            dict[str, Any]: 请求体（不返回文档，只返回聚合结果）
+        """
+        aggs: dict[str, Any] = {
+            metric.alias: {_METRIC_AGGREGATIONS[metric.func]: {"field": metric.field}}
+            for metric in spec.metrics
+            if metric.field is not None
+        }
+        # 每个分组字段嵌套一层 terms 聚合，多取一个桶用于判断是否超出最大结果数；
+        # 单层分组时把排序和 limit 下推到 terms，直接取前 limit 个桶
+        order = _terms_order(spec)
+        if order is None:
+            bucket_size = self.config.max_query_results + 1
+        else:
+            bucket_size = fetch_limit(spec, self.config.max_query_results)
+        for field in reversed(spec.group_by):
+            terms: dict[str, Any] = {"terms": {"field": field, "size": bucket_size}}
+            if order:
+                terms["terms"]["order"] = order
+            if aggs:
+                terms["aggs"] = aggs
+            aggs = {field: terms}
+
+        body: dict[str, Any] = {
+            "size": 0,
+            "track_total_hits": True,
+            "query": self._build_query(spec.filters) if spec.filters else {"match_all": {}},
+        }
+        if aggs:
+            body["aggs"] = aggs
+        return body
+
+    @staticmethod
+    def _flatten_aggregations(
+        spec: AggregateSpec, aggregations: dict[str, Any], total: int, max_results: int
+    ) -> list[dict[str, Any]]:
+        """
+        将嵌套的 terms 聚合结果展开为每个分组一行
+
+        Args:
+            spec: 聚合规格
+            aggregations: 响应中的 aggregations
+            total: 匹配的文档总数（无分组字段时作为 count）
+            max_results: 最大返回分组数
+
+        Returns:
+            list[dict[str, Any]]: 聚合结果
+
+        Raises:
+            QueryError: 排序未下推且 terms 聚合丢弃了部分桶时抛出（结果不完整）
+        """
+        rows: list[dict[str, Any]] = []
+        check_truncated = _terms_order(spec) is None
+
+        def walk(level: dict[str, Any], doc_count: int, row: dict[str, Any], depth: int) -> None:
+            if depth == len(spec.group_by):
+                for metric in spec.metrics:
+                    if metric.field is None:
+                        row[metric.alias] = doc_count
+                    else:
+                        row[metric.alias] = level[metric.alias]["value"]
+                rows.append(row)
+                return
+
+            field = spec.group_by[depth]
+            if check_truncated and level[field].get("sum_other_doc_count", 0) > 0:
+                raise QueryError(
+                    f"Aggregate on {field} has more buckets than the maximum of "
+                    f"{max_results} groups. Please add more specific filters."
+                )
+            for bucket in level[field]["buckets"]:
+                walk(bucket, bucket["doc_count"], {**row, field: bucket["key"]}, depth + 1)
+
+        walk(aggregations, total, {}, 0)
+        return rows
+
     def _build_query(self, filters: dict[str, Any]) -> dict[str, Any]:
         """
         构建查询
@@ -340,29 +675,34 @@ class OpenSearchAdapter(DatabaseAdapter):
         if not filters:
             return {"match_all": {}}
 
-        must_clauses = []
-
-        for field, value in filters.items():
-            if "__" in field:
-                # 操作符
-                field_name, operator = field.split("__", 1)
-                if operator == "gt":
-                    must_clauses.append({"range": {field_name: {"gt": value}}})
-                elif operator == "lt":
-                    must_clauses.append({"range": {field_name: {"lt": value}}})
-                elif operator == "gte":
-                    must_clauses.append({"range": {field_name: {"gte": value}}})
-                elif operator == "lte":
-                    must_clauses.append({"range": {field_name: {"lte": value}}})
-                elif operator == "in":
-                    must_clauses.append({"terms": {field_name: value}})
-                elif operator == "contains":
-                    # 使用 match 查询来实现包含功能
-                    must_clauses.append({"match": {field_name: value}})
-                else:
-                    must_clauses.append({"match": {field_name: value}})
-            else:
-                # 等值查询 - 使用 match 而不是 term，因为 term 需要精确匹配
-                must_clauses.append({"match": {field: value}})
+        return self._build_bool(compile_filters(filters), filters)
 
+    def _build_bool(self, plan: FilterPlan, filters: dict[str, Any]) -> dict[str, Any]:
+        """按编译计划构建 bool 查询（各条件之间为 AND）"""
+        must_clauses = [
+            self._build_clause(condition, value)
+            for condition, value in zip(plan.conditions, filters.values())
+        ]
         return {"bool": {"must": must_clauses}} if must_clauses else {"match_all": {}}
+
+    def _build_clause(self, condition: FilterCondition | FilterGroup, value: Any) -> dict[str, Any]:
+        """构建单个条件的查询子句"""
+        if isinstance(condition, FilterGroup):
+            # 逻辑组合：$or -> should，$not -> must_not，$and -> must
+            clauses = [
+                self._build_bool(plan, sub_filters)
+                for plan, sub_filters in zip(condition.plans, group_filters(condition.key, value))
+            ]
+            if condition.operator == "or":
+                return {"bool": {"should": clauses, "minimum_should_match": 1}}
+            if condition.operator == "not":
+                return {"bool": {"must_not": clauses}}
+            return {"bool": {"must": clauses}}
+
+        field_name, operator = condition.field, condition.operator
+        if operator in ("gt", "lt", "gte", "lte"):
+            return {"range": {field_name: {operator: value}}}
+        elif operator == "in":
+            return {"terms": {field_name: value}}
+        # 等值及 contains 使用 match 查询（term 需要精确匹配）
+        return {"match": {field_name: value}}
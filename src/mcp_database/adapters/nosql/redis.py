@@ -1,12 +1,19 @@
 """Redis 适配器"""
 
 import json
+from collections.abc import AsyncIterator
 from typing import Any
 
 from redis.asyncio import Redis
-from redis.exceptions import RedisError
-
-from mcp_database.core.adapter import DatabaseAdapter
+from redis.exceptions import RedisError, WatchError
+
+from mcp_database.core.adapter import WRITE_BATCH_SIZE, DatabaseAdapter
+from mcp_database.core.aggregation import (
+    HashAggregator,
+    finalize_rows,
+    parse_aggregate,
+    sort_rows,
+)
 from mcp_database.core.exceptions import (
     ConnectionError,
     ExceptionTranslator,
@@ -22,8 +29,15 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
 
+# 扫描表时每次 MGET 读取的键数量
+SCAN_BATCH_SIZE = 500
+
+# 合并写入时被并发修改（WATCH 失败）后的最大重试次数
+MERGE_RETRIES = 5
+
 
 class RedisAdapter(DatabaseAdapter):
     """
@@ -96,6 +110,114 @@ class RedisAdapter(DatabaseAdapter):
         """
         return f"{table}:{record_id}"
 
+    async def _scan_batches(
+        self, table: str, filters: dict[str, Any] | None
+    ) -> AsyncIterator[tuple[list[str], list[dict[str, Any]]]]:
+        """
+        分批读取表中记录并在客户端过滤
+
+        每批用一次 MGET 读取，解码后按列批量求值过滤条件。
+
+        Args:
+            table: 表名
+            filters: 过滤条件（为空时返回全部记录）
+
+        Yields:
+            每批的 (匹配的键列表, 匹配的记录列表)
+        """
+        batch_filter = self._filter_translator.translate_batch(filters) if filters else None
+
+        # 从索引中获取所有键（O(1) 复杂度）
+        keys = list(await self._client.smembers(self._is_index_key(table)))
+
+        for start in range(0, len(keys), SCAN_BATCH_SIZE):
+            chunk = keys[start : start + SCAN_BATCH_SIZE]
+            values = await self._client.mget(chunk)
+            chunk_keys = []
+            records = []
+            for key, data_str in zip(chunk, values):
+                if data_str:
+                    chunk_keys.append(key)
+                    records.append(json.loads(data_str))
+
+            if batch_filter is None:
+                yield chunk_keys, records
+            else:
+                matched = batch_filter(records)
+                yield [chunk_keys[i] for i in matched], [records[i] for i in matched]
+
+    async def _scan(
+        self, table: str, filters: dict[str, Any] | None
+    ) -> tuple[list[str], list[dict[str, Any]]]:
+        """
+        读取表中所有匹配的记录
+
+        Args:
+            table: 表名
+            filters: 过滤条件（为空时返回全部记录）
+
+        Returns:
+            (匹配的键列表, 匹配的记录列表)
+        """
+        matched_keys: list[str] = []
+        matched_records: list[dict[str, Any]] = []
+        async for keys, records in self._scan_batches(table, filters):
+            matched_keys.extend(keys)
+            matched_records.extend(records)
+        return matched_keys, matched_records
+
+    async def _merge_records(
+        self, keys: list[str], records: list[dict[str, Any]], index_key: str | None = None
+    ) -> int:
+        """
+        将记录原子地合并到已有记录中
+
+        使用 WATCH / MULTI 乐观锁：读取已有记录并合并后在一个事务中写回，
+        期间键被其他客户端修改时整批重试，避免并发写入互相覆盖字段。
+
+        Args:
+            keys: 记录键列表
+            records: 与键一一对应的记录
+            index_key: 表索引键；指定时不存在的记录被创建并加入索引，否则被忽略
+
+        Returns:
+            写入的记录数
+
+        Raises:
+            QueryError: 重试 MERGE_RETRIES 次后仍有并发修改时抛出
+        """
+        for _ in range(MERGE_RETRIES):
+            async with self._client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(*keys)
+                    existing = await pipe.mget(keys)
+
+                    merged: dict[str, dict[str, Any]] = {}
+                    for key, data_str in zip(keys, existing):
+                        if data_str:
+                            merged[key] = json.loads(data_str)
+                    written = 0
+                    for key, record in zip(keys, records):
+                        if key in merged:
+                            merged[key] = {**merged[key], **record}
+                        elif index_key is not None:
+                            merged[key] = dict(record)
+                        else:
+                            continue
+                        written += 1
+
+                    pipe.multi()
+                    for key, record in merged.items():
+                        pipe.set(key, self._serialize_data(record))
+                    if index_key is not None:
+                        pipe.sadd(index_key, *keys)
+                    await pipe.execute()
+                    return written
+                except WatchError:
+                    continue
+
+        raise QueryError(f"Records were modified concurrently {MERGE_RETRIES} times, giving up")
+
     async def connect(self) -> None:
         """
         连接到 Redis
@@ -190,6 +312,82 @@ class RedisAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, "redis")
             raise translated
 
+    async def upsert(
+        self,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """
+        插入或更新记录
+
+        记录键由 key_fields 的值拼接而成（key_fields 为 ["id"] 时与 insert 的键一致）。
+        每批在一个 WATCH / MULTI 事务中读取已有记录、合并字段并写入记录和索引，
+        并发写入同一记录时重试而不是互相覆盖（见 _merge_records）。
+
+        Args:
+            table: 表名
+            rows: 数据字典或列表
+            key_fields: 用于生成记录键的字段
+
+        Returns:
+            UpsertResult: 插入或更新结果
+
+        Raises:
+            QueryError: 参数错误或执行失败时抛出
+        """
+        records = self._validate_upsert(rows, key_fields)
+        try:
+            index_key = self._is_index_key(table)
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                chunk = records[start : start + WRITE_BATCH_SIZE]
+                keys = [
+                    self._make_key(table, ":".join(str(record[field]) for field in key_fields))
+                    for record in chunk
+                ]
+                await self._merge_records(keys, chunk, index_key)
+
+            return UpsertResult(upserted_count=len(records))
+
+        except RedisError as e:
+            translated = ExceptionTranslator.translate(e, "redis")
+            raise translated
+
+    async def bulk_update(
+        self, table: str, rows: list[dict[str, Any]], key_field: str
+    ) -> UpdateResult:
+        """
+        批量更新记录
+
+        记录键为 table:<key_field 的值>（key_field 为 "id" 时即 insert 生成的键）。
+        每批在一个 WATCH / MULTI 事务中读取已有记录并写回合并后的记录，
+        并发写入同一记录时重试（见 _merge_records）；不存在的记录被忽略。
+
+        Args:
+            table: 表名
+            rows: 数据列表，每条记录包含 key_field 和要更新的字段
+            key_field: 用于生成记录键的字段
+
+        Returns:
+            UpdateResult: 更新结果
+
+        Raises:
+            QueryError: 参数错误或执行失败时抛出
+        """
+        records = self._validate_bulk_update(rows, key_field)
+        try:
+            updated_count = 0
+            for start in range(0, len(records), WRITE_BATCH_SIZE):
+                chunk = records[start : start + WRITE_BATCH_SIZE]
+                keys = [self._make_key(table, record[key_field]) for record in chunk]
+                updated_count += await self._merge_records(keys, chunk)
+
+            return UpdateResult(updated_count=updated_count)
+
+        except RedisError as e:
+            translated = ExceptionTranslator.translate(e, "redis")
+            raise translated
+
     async def delete(self, table: str, filters: dict[str, Any]) -> DeleteResult:
         """
         删除记录
@@ -205,23 +403,10 @@ class RedisAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            # 转换过滤器为过滤函数
-            filter_func = self._filter_translator.translate(filters)
-
-            # 从索引中获取所有键（O(1) 复杂度）
+            # 过滤出要删除的键
             index_key = self._is_index_key(table)
-            keys = await self._client.smembers(index_key)
-
-            # 过滤并删除
             deleted_count = 0
-            keys_to_delete = []
-
-            for key in keys:
-                data_str = await self._client.get(key)
-                if data_str:
-                    data = json.loads(data_str)
-                    if filter_func(data):
-                        keys_to_delete.append(key)
+            keys_to_delete, _ = await self._scan(table, filters)
 
             # 批量删除
             if keys_to_delete:
@@ -253,24 +438,15 @@ class RedisAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            # 转换过滤器为过滤函数
-            filter_func = self._filter_translator.translate(filters)
-
-            # 从索引中获取所有键（O(1) 复杂度）
-            index_key = self._is_index_key(table)
-            keys = await self._client.smembers(index_key)
+            # 过滤出要更新的记录
+            keys, records = await self._scan(table, filters)
 
-            # 过滤并更新
+            # 更新数据
             updated_count = 0
-            for key in keys:
-                data_str = await self._client.get(key)
-                if data_str:
-                    record = json.loads(data_str)
-                    if filter_func(record):
-                        # 更新数据
-                        record.update(data)
-                        await self._client.set(key, self._serialize_data(record))
-                        updated_count += 1
+            for key, record in zip(keys, records):
+                record.update(data)
+                await self._client.set(key, self._serialize_data(record))
+                updated_count += 1
 
             return UpdateResult(updated_count=updated_count)
 
@@ -279,15 +455,28 @@ class RedisAdapter(DatabaseAdapter):
             raise translated
 
     async def query(
-        self, table: str, filters: dict[str, Any] | None = None, limit: int | None = None
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
     ) -> QueryResult:
         """
         查询记录
 
+        Redis 没有服务端排序，排序在客户端完成：指定 limit 时用堆只取前
+        offset + limit 条，否则对全部结果排序。
+
         Args:
             table: 表名
             filters: 过滤条件（可选）
             limit: 返回记录数限制（可选）
+            offset: 跳过的记录数（可选）
+            order_by: 排序字段列表，"-" 前缀表示降序（可选）
+            fields: 返回的字段列表（可选，默认返回全部字段）
 
         Returns:
             QueryResult: 查询结果
@@ -296,41 +485,35 @@ class RedisAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            # 转换过滤器为过滤函数
-            filter_func = self._filter_translator.translate(filters) if filters else None
+            offset = self._validate_offset(offset)
+            ordering = self._parse_order_by(order_by)
 
-            # 从索引中获取所有键（O(1) 复杂度）
-            index_key = self._is_index_key(table)
-            keys = await self._client.smembers(index_key)
+            # 分批读取并过滤数据
+            _, all_data = await self._scan(table, filters)
 
-            # 获取所有数据
-            all_data = []
-            for key in keys:
-                data_str = await self._client.get(key)
-                if data_str:
-                    record = json.loads(data_str)
-                    # 应用过滤器
-                    if filter_func is None or filter_func(record):
-                        all_data.append(record)
+            # 排序并应用分页
+            end = offset + limit if limit else None
+            data = sort_rows(all_data, ordering, end) if ordering else all_data
+            data = data[offset:end]
 
-            # 检查结果大小限制
+            # 结果大小限制作用于本页，总数较大时仍可通过 limit / offset 分页
             max_results = self.config.max_query_results
-            if len(all_data) > max_results:
+            if len(data) > max_results:
                 raise QueryError(
                     f"Query result exceeds maximum limit of {max_results} records. "
-                    f"Please add more specific filters to reduce the result size."
+                    f"Please add more specific filters or use limit/offset to page the results."
                 )
 
-            # 应用限制
-            if limit:
-                data = all_data[:limit]
-            else:
-                data = all_data
+            # 字段投影
+            if fields:
+                data = [
+                    {field: record[field] for field in fields if field in record} for record in data
+                ]
 
             return QueryResult(
                 data=data,
                 count=len(all_data),
-                has_more=limit is not None and len(data) == limit and len(all_data) > limit,
+                has_more=offset + len(data) < len(all_data),
             )
 
         except RedisError as e:
@@ -355,19 +538,36 @@ class RedisAdapter(DatabaseAdapter):
 
     async def advanced_query(self, operation: str, params: dict[str, Any]) -> AdvancedResult:
         """
-        执行高级查询（Redis 不支持复杂操作）
+        执行高级查询
+
+        支持 aggregate 操作（参数见 parse_aggregate）。Redis 没有服务端聚合，
+        按批扫描记录并流式哈希聚合，内存占用与分组数成正比而与记录数无关。
 
         Args:
-            operation: 操作类型
+            operation: 操作类型（"aggregate"）
             params: 操作参数
 
         Returns:
             AdvancedResult: 高级查询结果
 
         Raises:
-            QueryError: Redis 不支持高级查询
+            QueryError: 不支持的操作或查询错误时抛出
         """
-        raise QueryError("Redis does not support advanced queries. Use basic CRUD methods instead.")
+        if operation != "aggregate":
+            raise QueryError(f"Redis does not support advanced operation: {operation}")
+
+        spec = parse_aggregate(params)
+        try:
+            aggregator = HashAggregator(spec)
+            async for _, records in self._scan_batches(spec.table, spec.filters):
+                aggregator.add(records)
+
+            rows = finalize_rows(spec, aggregator.rows(), self.config.max_query_results)
+            return AdvancedResult(operation=operation, data=rows)
+
+        except RedisError as e:
+            translated = ExceptionTranslator.translate(e, "redis")
+            raise translated
 
     def get_capabilities(self) -> Capability:
         """
@@ -380,7 +580,7 @@ class RedisAdapter(DatabaseAdapter):
             basic_crud=True,
             transactions=False,
             joins=False,
-            aggregation=False,
+            aggregation=True,
             full_text_search=False,
             geospatial=False,
         )
@@ -1,9 +1,15 @@
 """SQL 适配器基类"""
 
+import asyncio
+import logging
 import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import TextClause, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -11,13 +17,14 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from mcp_database.core.adapter import DatabaseAdapter
+from mcp_database.core.adapter import WRITE_BATCH_SIZE, DatabaseAdapter
+from mcp_database.core.aggregation import AggregateSpec, fetch_limit, parse_aggregate
 from mcp_database.core.exceptions import (
     ConnectionError,
     ExceptionTranslator,
     QueryError,
 )
-from mcp_database.core.filters import SQLFilterTranslator
+from mcp_database.core.filters import PARAM_PREFIX, SQLFilterTranslator
 from mcp_database.core.models import (
     AdvancedResult,
     Capability,
@@ -27,8 +34,39 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
 from mcp_database.core.permissions import check_execute_permission
+from mcp_database.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 缓存的 SQL 语句对象数量上限
+STATEMENT_CACHE_SIZE = 512
+
+# 分块删除/更新时默认用于分页的主键列（可通过 options["chunk_key"] 指定）
+DEFAULT_CHUNK_KEY = "id"
+
+# 聚合函数对应的 SQL 模板
+_AGGREGATE_SQL = {
+    "count": "COUNT({})",
+    "sum": "SUM({})",
+    "avg": "AVG({})",
+    "min": "MIN({})",
+    "max": "MAX({})",
+    "count_distinct": "COUNT(DISTINCT {})",
+}
+
+
+@lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+def _statement(sql: str) -> TextClause:
+    """
+    获取 SQL 文本对应的语句对象
+
+    相同形状的过滤器生成相同的 SQL 文本，复用语句对象可省去重复解析绑定参数，
+    SQLAlchemy 也会按语句命中其编译缓存。
+    """
+    return text(sql)
 
 
 class SQLAdapter(DatabaseAdapter):
@@ -87,6 +125,24 @@ class SQLAdapter(DatabaseAdapter):
             raise ValueError(f"Invalid table name: {table}")
         return table
 
+    @staticmethod
+    def _validate_column_name(column: str) -> str:
+        """
+        验证列名（用于列投影和排序），防止 SQL 注入
+
+        Args:
+            column: 列名
+
+        Returns:
+            验证后的列名
+
+        Raises:
+            QueryError: 列名不合法时抛出
+        """
+        if not isinstance(column, str) or not re.match(r"^[a-zA-Z_][a-zA-Z0-9_]*$", column):
+            raise QueryError(f"Invalid column name: {column}")
+        return column
+
     async def connect(self) -> None:
         """
         连接到数据库
@@ -152,6 +208,44 @@ class SQLAdapter(DatabaseAdapter):
 
         return self._session_factory()
 
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        """
+        获取已占用连接的会话，并记录从连接池获取连接的等待时间
+
+        Yields:
+            AsyncSession: 异步会话
+
+        Raises:
+            ConnectionError: 未连接时抛出
+        """
+        async with self._get_session() as session:
+            start = time.perf_counter()
+            with self._span("pool_checkout"):
+                await session.connection()
+            metrics.observe_pool_wait(self._database_type, time.perf_counter() - start)
+            yield session
+
+    def _translate_filters(
+        self, filters: dict[str, Any], prefix: str = PARAM_PREFIX
+    ) -> tuple[str, dict[str, Any]]:
+        """转换过滤条件为 WHERE 子句和参数（追踪阶段 translate_filters）"""
+        with self._span("translate_filters", filter_count=len(filters)):
+            return self._filter_translator.translate(filters, prefix)
+
+    async def _execute(self, session: AsyncSession, stmt: Any, params: Any = None) -> Any:
+        """通过驱动执行语句（追踪阶段 execute）"""
+        with self._span("execute"):
+            return await session.execute(stmt, params)
+
+    def _decode_rows(self, result: Any) -> list[dict[str, Any]]:
+        """将结果行解码为字典（追踪阶段 decode_rows）"""
+        with self._span("decode_rows") as span:
+            rows = [dict(row._mapping) for row in result.fetchall()]
+            if span is not None:
+                span.attributes["row_count"] = len(rows)
+            return rows
+
     def _build_insert_sql(self, table: str, columns: list[str], use_returning: bool = True) -> str:
         """
         构建 INSERT SQL 语句
@@ -201,38 +295,136 @@ class SQLAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            table = self._validate_table_name(table)
+            async with self._session() as session:
+                result = await self._insert(session, table, data)
+                await session.commit()
+                return result
 
-            if isinstance(data, list) and len(data) == 0:
-                return InsertResult(inserted_count=0, inserted_ids=[])
+        except Exception as e:
+            translated = ExceptionTranslator.translate(e, self._database_type)
+            raise translated
 
-            data_list = data if isinstance(data, list) else [data]
-            use_returning = self._database_type == "postgresql"
+    async def _insert(
+        self, session: AsyncSession, table: str, data: dict[str, Any] | list[dict[str, Any]]
+    ) -> InsertResult:
+        """在指定会话中插入数据（不提交）"""
+        table = self._validate_table_name(table)
+
+        if isinstance(data, list) and len(data) == 0:
+            return InsertResult(inserted_count=0, inserted_ids=[])
+
+        data_list = data if isinstance(data, list) else [data]
+        use_returning = self._database_type == "postgresql"
+
+        columns = list(data_list[0].keys())
+        with self._span("build_sql"):
+            sql = self._build_insert_sql(table, columns, use_returning)
+            stmt = _statement(sql)
+
+        inserted_ids = []
+        for row in data_list:
+            result = await self._execute(session, stmt, row)
+            inserted_id = self._extract_inserted_id(result, use_returning)
+            if inserted_id:
+                inserted_ids.append(inserted_id)
+
+        return InsertResult(inserted_count=len(data_list), inserted_ids=inserted_ids)
+
+    async def upsert(
+        self,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """
+        插入或更新数据
 
-            async with self._get_session() as session:
-                columns = list(data_list[0].keys())
-                sql = self._build_insert_sql(table, columns, use_returning)
-                stmt = text(sql)
+        PostgreSQL / SQLite 使用 INSERT ... ON CONFLICT DO UPDATE，MySQL 使用
+        INSERT ... ON DUPLICATE KEY UPDATE。key_fields 需有对应的主键或唯一约束；
+        字段相同的记录按 WRITE_BATCH_SIZE 分批以 executemany 提交。
 
-                inserted_ids = []
-                for row in data_list:
-                    result = await session.execute(stmt, row)
-                    inserted_id = self._extract_inserted_id(result, use_returning)
-                    if inserted_id:
-                        inserted_ids.append(inserted_id)
+        Args:
+            table: 表名
+            rows: 数据字典或列表
+            key_fields: 用于匹配已有记录的字段
 
-                await session.commit()
+        Returns:
+            UpsertResult: 插入或更新结果
 
-                return InsertResult(inserted_count=len(data_list), inserted_ids=inserted_ids)
+        Raises:
+            QueryError: 参数错误或执行失败时抛出
+        """
+        try:
+            async with self._session() as session:
+                result = await self._upsert(session, table, rows, key_fields)
+                await session.commit()
+                return result
 
         except Exception as e:
             translated = ExceptionTranslator.translate(e, self._database_type)
             raise translated
 
+    async def _upsert(
+        self,
+        session: AsyncSession,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """在指定会话中插入或更新数据（不提交）"""
+        table = self._validate_table_name(table)
+        records = self._validate_upsert(rows, key_fields)
+        key_fields = [self._validate_column_name(field) for field in key_fields]
+
+        # 按字段集合分组，同组记录共用一条语句
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for record in records:
+            groups.setdefault(tuple(record), []).append(record)
+
+        for columns, group in groups.items():
+            with self._span("build_sql"):
+                sql = self._build_upsert_sql(table, list(columns), key_fields)
+                stmt = _statement(sql)
+            for start in range(0, len(group), WRITE_BATCH_SIZE):
+                await self._execute(session, stmt, group[start : start + WRITE_BATCH_SIZE])
+
+        return UpsertResult(upserted_count=len(records))
+
+    def _build_upsert_sql(self, table: str, columns: list[str], key_fields: list[str]) -> str:
+        """
+        构建 upsert SQL 语句
+
+        Args:
+            table: 表名（已校验）
+            columns: 列名列表
+            key_fields: 匹配字段（已校验）
+
+        Returns:
+            SQL 语句
+        """
+        columns = [self._validate_column_name(column) for column in columns]
+        sql = self._build_insert_sql(table, columns, use_returning=False)
+        updates = [column for column in columns if column not in key_fields]
+
+        if self._database_type == "mysql":
+            # 没有需要更新的列时赋值为自身，使重复记录保持不变
+            assignments = [f"{column} = VALUES({column})" for column in updates] or [
+                f"{key_fields[0]} = {key_fields[0]}"
+            ]
+            return f"{sql} ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+
+        conflict = f"{sql} ON CONFLICT ({', '.join(key_fields)})"
+        if not updates:
+            return f"{conflict} DO NOTHING"
+        assignments = ", ".join(f"{column} = excluded.{column}" for column in updates)
+        return f"{conflict} DO UPDATE SET {assignments}"
+
     async def delete(self, table: str, filters: dict[str, Any]) -> DeleteResult:
         """
         删除数据
 
+        设置 options["chunk_size"] 后按主键分块删除，每块单独提交（见 _run_chunked）。
+
         Args:
             table: 表名
             filters: 过滤条件
@@ -244,34 +436,124 @@ class SQLAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            # 验证表名
-            table = self._validate_table_name(table)
+            chunk_size, chunk_delay = self._chunk_options()
+            if chunk_size:
 
-            async with self._get_session() as session:
-                # 构建删除语句
-                where_clause, params = self._filter_translator.translate(filters)
-                sql = f"DELETE FROM {table}"
+                async def delete_chunk(session: AsyncSession, chunk_filters: dict[str, Any]) -> int:
+                    result = await self._delete(session, table, chunk_filters)
+                    return result.deleted_count
 
-                if where_clause:
-                    sql += f" WHERE {where_clause}"
+                deleted_count = await self._run_chunked(
+                    table, filters, chunk_size, chunk_delay, delete_chunk
+                )
+                return DeleteResult(deleted_count=deleted_count)
 
-                stmt = text(sql)
-                result = await session.execute(stmt, params)
-                deleted_count = result.rowcount
+            async with self._session() as session:
+                result = await self._delete(session, table, filters)
                 await session.commit()
-
-                return DeleteResult(deleted_count=deleted_count)
+                return result
 
         except Exception as e:
             translated = ExceptionTranslator.translate(e, self._database_type)
             raise translated
 
+    async def _run_chunked(
+        self,
+        table: str,
+        filters: dict[str, Any],
+        chunk_size: int,
+        chunk_delay: float,
+        apply: Callable[[AsyncSession, dict[str, Any]], Awaitable[int]],
+    ) -> int:
+        """
+        按主键分块执行删除或更新
+
+        每块先按主键顺序选出下一批匹配记录的主键（从上一块的最大主键之后开始），
+        再在同一个短事务中对这些主键执行操作并提交，避免长时间持有锁；
+        块之间等待 chunk_delay 秒。每块生成一个 chunk 追踪区间并记录进度日志。
+
+        Args:
+            table: 表名
+            filters: 过滤条件
+            chunk_size: 每块的记录数
+            chunk_delay: 块之间的等待秒数
+            apply: 在会话中对一块记录执行操作并返回影响行数的函数
+
+        Returns:
+            影响的总行数
+        """
+        table = self._validate_table_name(table)
+        options = self.config.options or {}
+        key = self._validate_column_name(options.get("chunk_key", DEFAULT_CHUNK_KEY))
+
+        total = 0
+        last_key = None
+        chunk = 0
+        while True:
+            select_filters = dict(filters or {})
+            if last_key is not None:
+                select_filters = {"$and": [select_filters, {f"{key}__gt": last_key}]}
+
+            with self._span("chunk", chunk=chunk) as span:
+                async with self._session() as session:
+                    where_clause, params = self._translate_filters(select_filters)
+                    sql = f"SELECT {key} FROM {table}"
+                    if where_clause:
+                        sql += f" WHERE {where_clause}"
+                    sql += f" ORDER BY {key} LIMIT {chunk_size}"
+                    result = await self._execute(session, _statement(sql), params)
+                    keys = list(result.scalars().all())
+                    if not keys:
+                        break
+
+                    # 重新应用原过滤条件，跳过选出后被并发修改而不再匹配的记录
+                    chunk_filters = {f"{key}__in": keys}
+                    if filters:
+                        chunk_filters = {"$and": [filters, chunk_filters]}
+                    count = await apply(session, chunk_filters)
+                    await session.commit()
+
+                if span is not None:
+                    span.attributes["row_count"] = count
+
+            total += count
+            last_key = keys[-1]
+            chunk += 1
+            logger.info("Chunk %d on %s affected %d rows (%d total)", chunk, table, count, total)
+
+            if len(keys) < chunk_size:
+                break
+            if chunk_delay:
+                await asyncio.sleep(chunk_delay)
+
+        return total
+
+    async def _delete(
+        self, session: AsyncSession, table: str, filters: dict[str, Any]
+    ) -> DeleteResult:
+        """在指定会话中删除数据（不提交）"""
+        # 验证表名
+        table = self._validate_table_name(table)
+
+        # 构建删除语句
+        where_clause, params = self._translate_filters(filters)
+        with self._span("build_sql"):
+            sql = f"DELETE FROM {table}"
+
+            if where_clause:
+                sql += f" WHERE {where_clause}"
+
+        result = await self._execute(session, _statement(sql), params)
+        return DeleteResult(deleted_count=result.rowcount)
+
     async def update(
         self, table: str, data: dict[str, Any], filters: dict[str, Any]
     ) -> UpdateResult:
         """
         更新数据
 
+        设置 options["chunk_size"] 后按主键分块更新，每块单独提交（见 _run_chunked）。
+
         Args:
             table: 表名
             data: 要更新的数据
@@ -284,34 +566,150 @@ class SQLAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            # 验证表名
-            table = self._validate_table_name(table)
+            chunk_size, chunk_delay = self._chunk_options()
+            if chunk_size:
 
-            async with self._get_session() as session:
-                # 构建更新语句
-                set_clause = ", ".join([f"{col} = :{col}" for col in data.keys()])
-                where_clause, filter_params = self._filter_translator.translate(filters)
-                sql = f"UPDATE {table} SET {set_clause}"
+                async def update_chunk(session: AsyncSession, chunk_filters: dict[str, Any]) -> int:
+                    result = await self._update(session, table, data, chunk_filters)
+                    return result.updated_count
 
-                if where_clause:
-                    sql += f" WHERE {where_clause}"
-
-                # 合并参数
-                all_params = {**data, **filter_params}
+                updated_count = await self._run_chunked(
+                    table, filters, chunk_size, chunk_delay, update_chunk
+                )
+                return UpdateResult(updated_count=updated_count)
 
-                stmt = text(sql)
-                result = await session.execute(stmt, all_params)
-                updated_count = result.rowcount
+            async with self._session() as session:
+                result = await self._update(session, table, data, filters)
                 await session.commit()
+                return result
 
-                return UpdateResult(updated_count=updated_count)
+        except Exception as e:
+            translated = ExceptionTranslator.translate(e, self._database_type)
+            raise translated
+
+    async def _update(
+        self, session: AsyncSession, table: str, data: dict[str, Any], filters: dict[str, Any]
+    ) -> UpdateResult:
+        """在指定会话中更新数据（不提交）"""
+        # 验证表名
+        table = self._validate_table_name(table)
+
+        # 构建更新语句
+        where_clause, filter_params = self._translate_filters(filters)
+        with self._span("build_sql"):
+            # 更新值使用 v0、v1、... 命名，不会与过滤器的 p0、p1、... 参数冲突
+            set_clause = ", ".join(f"{col} = :v{i}" for i, col in enumerate(data))
+            sql = f"UPDATE {table} SET {set_clause}"
+
+            if where_clause:
+                sql += f" WHERE {where_clause}"
+
+        # 合并参数
+        all_params = {f"v{i}": value for i, value in enumerate(data.values())}
+        all_params.update(filter_params)
+
+        result = await self._execute(session, _statement(sql), all_params)
+        return UpdateResult(updated_count=result.rowcount)
+
+    async def bulk_update(
+        self, table: str, rows: list[dict[str, Any]], key_field: str
+    ) -> UpdateResult:
+        """
+        批量更新数据
+
+        每批记录编译为一条 UPDATE ... SET col = CASE key WHEN ... END 语句，
+        不同记录可更新不同的字段和值。
+
+        Args:
+            table: 表名
+            rows: 数据列表，每条记录包含 key_field 和要更新的字段
+            key_field: 用于定位记录的字段
+
+        Returns:
+            UpdateResult: 更新结果
+
+        Raises:
+            QueryError: 参数错误或执行失败时抛出
+        """
+        try:
+            async with self._session() as session:
+                result = await self._bulk_update(session, table, rows, key_field)
+                await session.commit()
+                return result
 
         except Exception as e:
             translated = ExceptionTranslator.translate(e, self._database_type)
             raise translated
 
+    async def _bulk_update(
+        self, session: AsyncSession, table: str, rows: list[dict[str, Any]], key_field: str
+    ) -> UpdateResult:
+        """在指定会话中批量更新数据（不提交）"""
+        table = self._validate_table_name(table)
+        records = self._validate_bulk_update(rows, key_field)
+        key_field = self._validate_column_name(key_field)
+
+        updated_count = 0
+        for start in range(0, len(records), WRITE_BATCH_SIZE):
+            with self._span("build_sql"):
+                sql, params = self._build_bulk_update_sql(
+                    table, key_field, records[start : start + WRITE_BATCH_SIZE]
+                )
+            result = await self._execute(session, _statement(sql), params)
+            updated_count += result.rowcount
+
+        return UpdateResult(updated_count=updated_count)
+
+    def _build_bulk_update_sql(
+        self, table: str, key_field: str, records: list[dict[str, Any]]
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        构建批量更新 SQL 语句
+
+        记录定位值使用 k0、k1、... 命名，更新值使用 v0、v1、... 命名；
+        记录中没有的字段由 ELSE 分支保持原值。
+
+        Args:
+            table: 表名（已校验）
+            key_field: 定位字段（已校验）
+            records: 数据列表
+
+        Returns:
+            (SQL 语句, 参数字典)
+        """
+        params = {f"k{i}": record[key_field] for i, record in enumerate(records)}
+
+        columns = dict.fromkeys(
+            field for record in records for field in record if field != key_field
+        )
+        assignments = []
+        value_count = 0
+        for column in columns:
+            column = self._validate_column_name(column)
+            branches = []
+            for i, record in enumerate(records):
+                if column in record:
+                    name = f"v{len(branches) + value_count}"
+                    params[name] = record[column]
+                    branches.append(f"WHEN :k{i} THEN :{name}")
+            value_count += len(branches)
+            assignments.append(
+                f"{column} = CASE {key_field} {' '.join(branches)} ELSE {column} END"
+            )
+
+        keys = ", ".join(f":k{i}" for i in range(len(records)))
+        sql = f"UPDATE {table} SET {', '.join(assignments)} WHERE {key_field} IN ({keys})"
+        return sql, params
+
     async def query(
-        self, table: str, filters: dict[str, Any] | None = None, limit: int | None = None
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
     ) -> QueryResult:
         """
         查询数据
@@ -320,6 +718,9 @@ class SQLAdapter(DatabaseAdapter):
             table: 表名
             filters: 过滤条件（可选）
             limit: 返回记录数限制（可选）
+            offset: 跳过的记录数（可选）
+            order_by: 排序字段列表，"-" 前缀表示降序（可选）
+            fields: 返回的字段列表（可选，默认返回全部字段）
 
         Returns:
             QueryResult: 查询结果
@@ -328,58 +729,154 @@ class SQLAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            # 验证表名
-            table = self._validate_table_name(table)
-
-            async with self._get_session() as session:
-                # 构建查询语句
-                where_clause = ""
-                params = {}
-                if filters:
-                    where_clause, params = self._filter_translator.translate(filters)
-
-                sql = f"SELECT * FROM {table}"
-
-                if where_clause:
-                    sql += f" WHERE {where_clause}"
-
-                # 先查询总数
-                count_sql = f"SELECT COUNT(*) FROM {table}"
-                if where_clause:
-                    count_sql += f" WHERE {where_clause}"
-
-                count_result = await session.execute(text(count_sql), params)
-                total_count = count_result.scalar() or 0
-
-                # 检查结果大小限制
-                max_results = self.config.max_query_results
-                if total_count > max_results:
-                    raise QueryError(
-                        f"Query result exceeds maximum limit of {max_results} records. "
-                        f"Please add more specific filters to reduce the result size."
-                    )
-
-                # 查询数据
-                if limit is not None:
-                    if not isinstance(limit, int) or limit < 0:
-                        raise QueryError(
-                            f"Invalid limit value: {limit}. Must be a positive integer."
-                        )
-                    sql += f" LIMIT {limit}"
-
-                result = await session.execute(text(sql), params)
-                data = [dict(row._mapping) for row in result.fetchall()]
-
-                return QueryResult(
-                    data=data,
-                    count=total_count,
-                    has_more=limit is not None and len(data) == limit and total_count > limit,
+            async with self._session() as session:
+                return await self._query(
+                    session,
+                    table,
+                    filters,
+                    limit,
+                    offset=offset,
+                    order_by=order_by,
+                    fields=fields,
                 )
 
         except Exception as e:
             translated = ExceptionTranslator.translate(e, self._database_type)
             raise translated
 
+    async def _query(
+        self,
+        session: AsyncSession,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
+    ) -> QueryResult:
+        """在指定会话中查询数据"""
+        # 验证表名、列名和分页参数
+        table = self._validate_table_name(table)
+        columns = ", ".join(self._validate_column_name(f) for f in fields) if fields else "*"
+        ordering = ", ".join(
+            self._validate_column_name(field) + (" DESC" if descending else "")
+            for field, descending in self._parse_order_by(order_by)
+        )
+        offset = self._validate_offset(offset)
+
+        # 构建查询语句
+        where_clause = ""
+        params = {}
+        if filters:
+            where_clause, params = self._translate_filters(filters)
+
+        with self._span("build_sql"):
+            sql = f"SELECT {columns} FROM {table}"
+
+            if where_clause:
+                sql += f" WHERE {where_clause}"
+            if ordering:
+                sql += f" ORDER BY {ordering}"
+
+            # 先查询总数
+            count_sql = f"SELECT COUNT(*) FROM {table}"
+            if where_clause:
+                count_sql += f" WHERE {where_clause}"
+
+        count_result = await self._execute(session, _statement(count_sql), params)
+        total_count = count_result.scalar() or 0
+
+        # 查询数据：未指定 limit 时多取一条，用于判断本页是否超出最大结果数
+        max_results = self.config.max_query_results
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            raise QueryError(f"Invalid limit value: {limit}. Must be a positive integer.")
+        sql += f" LIMIT {limit if limit is not None else max_results + 1}"
+        if offset:
+            sql += f" OFFSET {offset}"
+
+        result = await self._execute(session, _statement(sql), params)
+        data = self._decode_rows(result)
+
+        # 结果大小限制作用于本页，总数较大时仍可通过 limit / offset 分页
+        if len(data) > max_results:
+            raise QueryError(
+                f"Query result exceeds maximum limit of {max_results} records. "
+                f"Please add more specific filters or use limit/offset to page the results."
+            )
+
+        return QueryResult(
+            data=data,
+            count=total_count,
+            has_more=offset + len(data) < total_count,
+        )
+
+    async def _aggregate(self, session: AsyncSession, params: dict[str, Any]) -> list[dict]:
+        """在指定会话中执行分组聚合，返回每个分组一行"""
+        spec = parse_aggregate(params)
+        sql, sql_params = self._build_aggregate_sql(spec)
+
+        result = await self._execute(session, _statement(sql), sql_params)
+        data = self._decode_rows(result)
+        max_results = self.config.max_query_results
+        if len(data) > max_results:
+            raise QueryError(
+                f"Aggregate result exceeds maximum limit of {max_results} groups. "
+                f"Please add more specific filters or fewer group_by fields."
+            )
+        return data
+
+    def _build_aggregate_sql(self, spec: AggregateSpec) -> tuple[str, dict[str, Any]]:
+        """
+        构建分组聚合语句
+
+        Args:
+            spec: 聚合规格
+
+        Returns:
+            (SQL 语句, 参数字典)
+
+        Raises:
+            QueryError: 字段名不合法时抛出
+        """
+        table = self._validate_table_name(spec.table)
+        group_by = [self._validate_column_name(field) for field in spec.group_by]
+
+        where_clause = ""
+        sql_params: dict[str, Any] = {}
+        if spec.filters:
+            where_clause, sql_params = self._translate_filters(spec.filters)
+        having_clause = ""
+        if spec.having:
+            # having 参数使用 h0、h1、... 命名，避免与 WHERE 参数冲突
+            having_clause, having_params = self._translate_filters(spec.having, "h")
+            sql_params.update(having_params)
+
+        with self._span("build_sql"):
+            columns = group_by + [
+                f"{_AGGREGATE_SQL[metric.func].format(metric.field or '*')} AS {metric.alias}"
+                for metric in spec.metrics
+            ]
+            sql = f"SELECT {', '.join(columns)} FROM {table}"
+            if where_clause:
+                sql += f" WHERE {where_clause}"
+            if group_by:
+                sql += f" GROUP BY {', '.join(group_by)}"
+            if having_clause:
+                # 外层查询按输出列名过滤，不必在 HAVING 中重复聚合表达式
+                sql = f"SELECT * FROM ({sql}) AS aggregated WHERE {having_clause}"
+
+            ordering = ", ".join(
+                column + (" DESC" if descending else "") for column, descending in spec.ordering
+            )
+            if ordering:
+                sql += f" ORDER BY {ordering}"
+
+            # 未指定 limit 时多取一行，用于判断分组数是否超出最大结果数
+            sql += f" LIMIT {fetch_limit(spec, self.config.max_query_results)}"
+
+        return sql, sql_params
+
     @check_execute_permission
     async def execute(self, query: str, params: dict[str, Any] | None = None) -> ExecuteResult:
         """
@@ -396,17 +893,17 @@ class SQLAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            async with self._get_session() as session:
+            async with self._session() as session:
                 stmt = text(query)
 
                 if params:
                     stmt = stmt.bindparams(**params)
 
-                result = await session.execute(stmt)
+                result = await self._execute(session, stmt)
 
                 # 判断是否有返回数据
                 if result.returns_rows:
-                    data = [dict(row._mapping) for row in result.fetchall()]
+                    data = self._decode_rows(result)
                 else:
                     data = None
 
@@ -425,8 +922,14 @@ class SQLAdapter(DatabaseAdapter):
         """
         执行高级查询（事务、聚合等）
 
+        支持的操作：
+            transaction: 在同一事务中执行多条原生 SQL
+            batch: 在同一事务中执行多个增删改查操作
+            aggregate: 分组聚合（参数见 parse_aggregate），编译为 GROUP BY 语句，
+                having 通过外层查询过滤聚合结果
+
         Args:
-            operation: 操作类型（如 "transaction", "aggregate"）
+            operation: 操作类型（如 "transaction", "batch", "aggregate"）
             params: 操作参数
 
         Returns:
@@ -436,8 +939,13 @@ class SQLAdapter(DatabaseAdapter):
             QueryError: 查询错误时抛出
         """
         try:
-            async with self._get_session() as session:
-                if operation == "transaction":
+            async with self._session() as session:
+                if operation == "aggregate":
+                    return AdvancedResult(
+                        operation=operation, data=await self._aggregate(session, params)
+                    )
+
+                elif operation == "transaction":
                     # 执行事务
                     queries = params.get("queries", [])
                     results = []
@@ -450,13 +958,11 @@ class SQLAdapter(DatabaseAdapter):
                         if query_params:
                             stmt = stmt.bindparams(**query_params)
 
-                        result = await session.execute(stmt)
+                        result = await self._execute(session, stmt)
                         results.append(
                             {
                                 "rows_affected": result.rowcount,
-                                "data": [dict(row._mapping) for row in result.fetchall()]
-                                if result.returns_rows
-                                else None,
+                                "data": self._decode_rows(result) if result.returns_rows else None,
                             }
                         )
 
@@ -466,6 +972,19 @@ class SQLAdapter(DatabaseAdapter):
                         operation=operation, data={"results": results, "committed": True}
                     )
 
+                elif operation == "batch":
+                    # 在同一事务中执行多个增删改查操作，任一失败则整体回滚
+                    results = [
+                        await self._apply_operation(session, op)
+                        for op in params.get("operations", [])
+                    ]
+
+                    await session.commit()
+
+                    return AdvancedResult(
+                        operation=operation, data={"results": results, "committed": True}
+                    )
+
                 else:
                     raise QueryError(f"Unsupported operation: {operation}")
 
@@ -473,6 +992,44 @@ class SQLAdapter(DatabaseAdapter):
             translated = ExceptionTranslator.translate(e, self._database_type)
             raise translated
 
+    async def _apply_operation(self, session: AsyncSession, op: dict[str, Any]) -> dict[str, Any]:
+        """
+        在指定会话中执行单个批量操作
+
+        Args:
+            session: 数据库会话
+            op: 操作描述，包含 type、table 及 data/filters/limit
+
+        Returns:
+            操作结果字典
+
+        Raises:
+            QueryError: 操作类型不支持时抛出
+        """
+        op_type = op.get("type")
+        table = op.get("table", "")
+
+        if op_type == "insert":
+            result = await self._insert(session, table, op.get("data", []))
+        elif op_type == "query":
+            result = await self._query(
+                session,
+                table,
+                op.get("filters"),
+                op.get("limit"),
+                offset=op.get("offset"),
+                order_by=op.get("order_by"),
+                fields=op.get("fields"),
+            )
+        elif op_type == "update":
+            result = await self._update(session, table, op.get("data", {}), op.get("filters", {}))
+        elif op_type == "delete":
+            result = await self._delete(session, table, op.get("filters", {}))
+        else:
+            raise QueryError(f"Unsupported batch operation type: {op_type}")
+
+        return result.model_dump()
+
     def get_capabilities(self) -> Capability:
         """
         获取数据库能力
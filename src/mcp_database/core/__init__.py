@@ -5,6 +5,7 @@ from mcp_database.core.exceptions import (
     ConnectionError,
     DatabaseError,
     IntegrityError,
+    OverloadedError,
     PermissionError,
     QueryError,
     TimeoutError,
@@ -18,6 +19,7 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
 
 __all__ = [
@@ -28,8 +30,10 @@ __all__ = [
     "PermissionError",
     "IntegrityError",
     "TimeoutError",
+    "OverloadedError",
     "InsertResult",
     "UpdateResult",
+    "UpsertResult",
     "DeleteResult",
     "QueryResult",
     "ExecuteResult",
@@ -3,6 +3,7 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
+from mcp_database.core.exceptions import QueryError
 from mcp_database.core.models import (
     AdvancedResult,
     Capability,
@@ -12,7 +13,25 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
+from mcp_database.core.tracing import TracingHook, start_span, traced
+from mcp_database.utils.metrics import database_type, timed
+
+# 自动记录耗时指标的适配器方法
+INSTRUMENTED_METHODS = (
+    "insert",
+    "delete",
+    "update",
+    "upsert",
+    "bulk_update",
+    "query",
+    "execute",
+    "advanced_query",
+)
+
+# upsert / bulk_update 每批提交的记录数（每批一次往返）
+WRITE_BATCH_SIZE = 500
 
 
 class DatabaseAdapter(ABC):
@@ -20,8 +39,20 @@ class DatabaseAdapter(ABC):
     数据库适配器抽象基类
 
     所有数据库适配器都必须继承此类并实现所有抽象方法。
+    子类实现的数据操作方法会自动包装耗时、行数和错误指标的记录，
+    并在注册了追踪钩子时创建顶层追踪区间。
     """
 
+    # 实例追踪钩子（写时复制，避免实例间共享）
+    _hooks: tuple[TracingHook, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in INSTRUMENTED_METHODS:
+            method = cls.__dict__.get(name)
+            if method is not None and not getattr(method, "__metrics_timed__", False):
+                setattr(cls, name, timed(name)(traced(name)(method)))
+
     def __init__(self, config: DatabaseConfig):
         """
         初始化适配器
@@ -36,6 +67,121 @@ class DatabaseAdapter(ABC):
         """获取数据库配置"""
         return self._config
 
+    @staticmethod
+    def _parse_order_by(order_by: list[str] | None) -> list[tuple[str, bool]]:
+        """
+        解析排序字段
+
+        Args:
+            order_by: 排序字段列表（如 ["-created_at", "name"]）
+
+        Returns:
+            (字段名, 是否降序) 列表
+
+        Raises:
+            QueryError: 排序字段格式错误时抛出
+        """
+        parsed = []
+        for item in order_by or []:
+            if not isinstance(item, str) or not item.lstrip("-"):
+                raise QueryError(f"Invalid order_by field: {item!r}")
+            descending = item.startswith("-")
+            parsed.append((item[1:] if descending else item, descending))
+        return parsed
+
+    @staticmethod
+    def _validate_offset(offset: int | None) -> int:
+        """
+        校验跳过的记录数
+
+        Args:
+            offset: 跳过的记录数
+
+        Returns:
+            跳过的记录数（未指定时为 0）
+
+        Raises:
+            QueryError: 不是非负整数时抛出
+        """
+        if offset is None:
+            return 0
+        if isinstance(offset, bool) or not isinstance(offset, int) or offset < 0:
+            raise QueryError(f"Invalid offset value: {offset}. Must be a non-negative integer.")
+        return offset
+
+    def add_hook(self, hook: TracingHook) -> None:
+        """
+        注册追踪钩子
+
+        钩子在适配器操作及其内部阶段（如过滤器转换、SQL 构建、获取连接、
+        驱动执行、结果解码）开始和结束时收到回调。
+
+        Args:
+            hook: 追踪钩子
+        """
+        self._hooks = (*self._hooks, hook)
+
+    def remove_hook(self, hook: TracingHook) -> None:
+        """
+        移除追踪钩子
+
+        Args:
+            hook: 追踪钩子
+        """
+        self._hooks = tuple(h for h in self._hooks if h is not hook)
+
+    def _span(
+        self,
+        name: str,
+        operation: str | None = None,
+        table: str | None = None,
+        **attributes: Any,
+    ) -> Any:
+        """
+        创建追踪区间，未注册任何钩子时返回无开销的空区间
+
+        Args:
+            name: 区间名称
+            operation: 所属的适配器操作（默认继承父区间）
+            table: 表名（默认继承父区间）
+            attributes: 区间属性
+
+        Returns:
+            可用于 with 语句的区间，进入时返回 SpanContext 或 None
+        """
+        return start_span(
+            list(self._hooks), name, database_type(self), operation, table, **attributes
+        )
+
+    def _chunk_options(self) -> tuple[int | None, float]:
+        """
+        读取分块删除/更新配置
+
+        options["chunk_size"] 为每块的记录数（未设置时不分块），
+        options["chunk_delay"] 为相邻两块之间的等待秒数。
+
+        Returns:
+            (每块记录数或 None, 块间等待秒数)
+
+        Raises:
+            QueryError: 配置不合法时抛出
+        """
+        options = self.config.options or {}
+        chunk_size = options.get("chunk_size")
+        if chunk_size is not None and (
+            isinstance(chunk_size, bool) or not isinstance(chunk_size, int) or chunk_size < 1
+        ):
+            raise QueryError(f"Invalid chunk_size: {chunk_size}. Must be a positive integer.")
+
+        chunk_delay = options.get("chunk_delay", 0)
+        if (
+            isinstance(chunk_delay, bool)
+            or not isinstance(chunk_delay, (int, float))
+            or chunk_delay < 0
+        ):
+            raise QueryError(f"Invalid chunk_delay: {chunk_delay}. Must be a non-negative number.")
+        return chunk_size, float(chunk_delay)
+
     @property
     @abstractmethod
     def is_connected(self) -> bool:
@@ -114,9 +260,119 @@ class DatabaseAdapter(ABC):
         """
         pass
 
+    async def upsert(
+        self,
+        table: str,
+        rows: dict[str, Any] | list[dict[str, Any]],
+        key_fields: list[str],
+    ) -> UpsertResult:
+        """
+        插入或更新数据（按 key_fields 匹配已有记录，存在则更新，否则插入）
+
+        适配器按批提交，每批一次往返。未实现该方法的适配器抛出 QueryError。
+
+        Args:
+            table: 表名
+            rows: 数据字典或列表
+            key_fields: 用于匹配已有记录的字段（SQL 中需有对应的主键或唯一约束）
+
+        Returns:
+            UpsertResult: 插入或更新结果
+
+        Raises:
+            QueryError: 不支持 upsert 或参数错误时抛出
+        """
+        raise QueryError(f"{type(self).__name__} does not support upsert")
+
+    @staticmethod
+    def _validate_upsert(
+        rows: dict[str, Any] | list[dict[str, Any]], key_fields: list[str]
+    ) -> list[dict[str, Any]]:
+        """
+        校验 upsert 参数
+
+        Args:
+            rows: 数据字典或列表
+            key_fields: 匹配字段
+
+        Returns:
+            数据列表
+
+        Raises:
+            QueryError: 未指定匹配字段或记录缺少匹配字段时抛出
+        """
+        if not key_fields or not all(isinstance(field, str) for field in key_fields):
+            raise QueryError("Upsert requires a non-empty list of key_fields")
+
+        records = rows if isinstance(rows, list) else [rows]
+        for record in records:
+            missing = [field for field in key_fields if record.get(field) is None]
+            if missing:
+                raise QueryError(f"Upsert record is missing key fields {missing}: {record}")
+        return records
+
+    async def bulk_update(
+        self, table: str, rows: list[dict[str, Any]], key_field: str
+    ) -> UpdateResult:
+        """
+        批量更新数据（每条记录按 key_field 定位，分别更新为各自的值）
+
+        适配器按批提交，每批一次往返；不存在的记录被忽略。未实现该方法的适配器抛出 QueryError。
+
+        Args:
+            table: 表名
+            rows: 数据列表，每条记录包含 key_field 和要更新的字段
+            key_field: 用于定位记录的字段
+
+        Returns:
+            UpdateResult: 更新结果
+
+        Raises:
+            QueryError: 不支持 bulk_update 或参数错误时抛出
+        """
+        raise QueryError(f"{type(self).__name__} does not support bulk_update")
+
+    @staticmethod
+    def _validate_bulk_update(rows: list[dict[str, Any]], key_field: str) -> list[dict[str, Any]]:
+        """
+        校验 bulk_update 参数
+
+        Args:
+            rows: 数据列表
+            key_field: 定位字段
+
+        Returns:
+            需要更新的记录列表（只包含 key_field 的记录被忽略）
+
+        Raises:
+            QueryError: 未指定定位字段、记录缺少定位字段或定位字段值重复时抛出
+        """
+        if not key_field or not isinstance(key_field, str):
+            raise QueryError("Bulk update requires a key_field")
+
+        records = []
+        seen = set()
+        for record in rows:
+            key = record.get(key_field)
+            if key is None:
+                raise QueryError(f"Bulk update record is missing key field '{key_field}': {record}")
+            if key in seen:
+                raise QueryError(f"Bulk update has duplicate {key_field}: {key!r}")
+            seen.add(key)
+            if len(record) > 1:
+                records.append(record)
+        return records
+
     @abstractmethod
     async def query(
-        self, table: str, filters: dict[str, Any] | None = None, limit: int | None = None
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        limit: int | None = None,
+        *,
+        offset: int | None = None,
+        order_by: list[str] | None = None,
+        fields: list[str] | None = None,
     ) -> QueryResult:
         """
         查询数据
@@ -125,6 +381,9 @@ class DatabaseAdapter(ABC):
             table: 表名
             filters: 过滤条件（可选）
             limit: 返回记录数限制（可选）
+            offset: 跳过的记录数（可选）
+            order_by: 排序字段列表，"-" 前缀表示降序（可选）
+            fields: 返回的字段列表（可选，默认返回全部字段）
 
         Returns:
             QueryResult: 查询结果
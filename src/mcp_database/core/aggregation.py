@@ -0,0 +1,393 @@
+"""跨数据库的声明式聚合规格"""
+
+import heapq
+import json
+import operator
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from mcp_database.core.exceptions import QueryError
+from mcp_database.core.filters import FilterGroup, RedisFilterTranslator, compile_filters
+
+# 支持的聚合函数
+AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max", "count_distinct")
+
+# 字段名和别名只能包含字母、数字和下划线，且必须以字母或下划线开头
+_IDENTIFIER_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+# having 条件在内存中求值时使用的转换器
+_having_translator = RedisFilterTranslator()
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    聚合指标
+
+    field 为 None 时只允许 count（统计分组的记录数）。
+    """
+
+    func: str
+    field: str | None
+    alias: str
+
+
+@dataclass(frozen=True)
+class AggregateSpec:
+    """
+    聚合规格
+
+    having 与 order_by 引用输出列（分组字段或指标别名）。未指定 order_by 时
+    按分组字段升序排列。
+    """
+
+    table: str
+    group_by: tuple[str, ...]
+    metrics: tuple[Metric, ...]
+    filters: dict[str, Any] | None = None
+    having: dict[str, Any] | None = None
+    order_by: tuple[tuple[str, bool], ...] = ()
+    limit: int | None = None
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        """输出列（分组字段在前，指标别名在后）"""
+        return self.group_by + tuple(metric.alias for metric in self.metrics)
+
+    @property
+    def ordering(self) -> tuple[tuple[str, bool], ...]:
+        """实际使用的排序：(输出列, 是否降序)"""
+        return self.order_by or tuple((field, False) for field in self.group_by)
+
+
+def _identifier(name: Any, kind: str) -> str:
+    """校验字段名或别名"""
+    if not isinstance(name, str) or not _IDENTIFIER_RE.match(name):
+        raise QueryError(f"Invalid aggregate {kind}: {name!r}")
+    return name
+
+
+def _parse_metric(metric: Any) -> Metric:
+    """解析单个聚合指标"""
+    if not isinstance(metric, dict):
+        raise QueryError(f"Aggregate metric must be an object, got {metric!r}")
+
+    func = metric.get("func")
+    if func not in AGGREGATE_FUNCTIONS:
+        raise QueryError(
+            f"Unsupported aggregate function: {func}. "
+            f"Must be one of {', '.join(AGGREGATE_FUNCTIONS)}."
+        )
+
+    field = metric.get("field")
+    if field:
+        field = _identifier(field, "field")
+        default_alias = f"{func}_{field}"
+    elif func == "count":
+        field = None
+        default_alias = "count"
+    else:
+        raise QueryError(f"Aggregate function '{func}' requires a field")
+
+    alias = _identifier(metric.get("alias") or default_alias, "alias")
+    return Metric(func=func, field=field, alias=alias)
+
+
+def _having_fields(having: dict[str, Any]) -> set[str]:
+    """收集 having 条件引用的字段（包括逻辑组合中的字段）"""
+    fields = set()
+    plans = [compile_filters(having)]
+    while plans:
+        for condition in plans.pop().conditions:
+            if isinstance(condition, FilterGroup):
+                plans.extend(condition.plans)
+            else:
+                fields.add(condition.field)
+    return fields
+
+
+def parse_aggregate(params: dict[str, Any]) -> AggregateSpec:
+    """
+    解析并校验 aggregate 操作参数
+
+    参数格式：
+        {"table": 表名, "group_by": [分组字段], "metrics": [
+            {"func": "count|sum|avg|min|max|count_distinct", "field": 字段, "alias": 别名}
+        ], "filters": 过滤条件, "having": 输出列上的过滤条件,
+        "order_by": ["-total", "category"], "limit": 返回分组数}
+
+    Args:
+        params: 操作参数
+
+    Returns:
+        AggregateSpec: 聚合规格
+
+    Raises:
+        QueryError: 参数不合法时抛出
+    """
+    table = _identifier(params.get("table"), "table")
+    group_by = tuple(_identifier(field, "group_by field") for field in params.get("group_by") or [])
+
+    raw_metrics = params.get("metrics") or []
+    if not raw_metrics:
+        raise QueryError("Aggregate requires at least one metric")
+    metrics = tuple(_parse_metric(metric) for metric in raw_metrics)
+
+    columns = group_by + tuple(metric.alias for metric in metrics)
+    if len(set(columns)) != len(columns):
+        raise QueryError(f"Aggregate output columns must be unique: {list(columns)}")
+
+    having = params.get("having") or None
+    if having is not None:
+        if not isinstance(having, dict):
+            raise QueryError("Aggregate having must be a filter object")
+        unknown = _having_fields(having) - set(columns)
+        if unknown:
+            raise QueryError(f"Aggregate having references unknown columns: {sorted(unknown)}")
+
+    order_by = []
+    for item in params.get("order_by") or []:
+        if not isinstance(item, str):
+            raise QueryError(f"Invalid aggregate order_by: {item!r}")
+        descending = item.startswith("-")
+        column = item[1:] if descending else item
+        if column not in columns:
+            raise QueryError(f"Aggregate order_by references unknown column: {column!r}")
+        order_by.append((column, descending))
+
+    limit = params.get("limit")
+    if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 1):
+        raise QueryError(f"Invalid aggregate limit: {limit}. Must be a positive integer.")
+
+    return AggregateSpec(
+        table=table,
+        group_by=group_by,
+        metrics=metrics,
+        filters=params.get("filters") or None,
+        having=having,
+        order_by=tuple(order_by),
+        limit=limit,
+    )
+
+
+def _column_key(name: str, descending: bool) -> Callable[[dict[str, Any]], tuple]:
+    """单个字段的排序键，缺少该字段的记录在升序和降序时都排在最后"""
+
+    def key(row: dict[str, Any]) -> tuple:
+        return ((row.get(name) is not None) == descending, row.get(name))
+
+    return key
+
+
+def sort_rows(
+    rows: list[dict[str, Any]], ordering: list[tuple[str, bool]], top: int | None = None
+) -> list[dict[str, Any]]:
+    """
+    在内存中排序记录，缺少排序字段的记录排在最后
+
+    Args:
+        rows: 记录列表
+        ordering: (字段名, 是否降序) 列表
+        top: 只需要的前 N 条（可选）
+
+    Returns:
+        list[dict[str, Any]]: 排序后的记录（指定 top 时最多 top 条）
+
+    Raises:
+        QueryError: 排序字段的值类型无法比较时抛出
+    """
+    directions = {descending for _, descending in ordering}
+    try:
+        if len(directions) == 1:
+            # 方向一致时使用复合键，指定 top 时用堆取前 N 条
+            descending = directions.pop()
+            names = [name for name, _ in ordering]
+
+            def key(row: dict[str, Any]) -> tuple:
+                return tuple(((row.get(n) is not None) == descending, row.get(n)) for n in names)
+
+            if top is None:
+                return sorted(rows, key=key, reverse=descending)
+            select = heapq.nlargest if descending else heapq.nsmallest
+            return select(top, rows, key=key)
+
+        # 方向混合时从最后一个字段开始做多次稳定排序
+        result = list(rows)
+        for name, descending in reversed(ordering):
+            result.sort(key=_column_key(name, descending), reverse=descending)
+        return result if top is None else result[:top]
+    except TypeError as e:
+        raise QueryError(f"Cannot sort by {[name for name, _ in ordering]}: {e}") from e
+
+
+def fetch_limit(spec: AggregateSpec, max_results: int) -> int:
+    """
+    需要从数据库取回的分组数
+
+    limit 超过最大结果数时按最大结果数截取；未指定 limit 时多取一个分组，
+    用于判断分组数是否超出最大结果数。
+
+    Args:
+        spec: 聚合规格
+        max_results: 最大返回分组数
+
+    Returns:
+        int: 取回的分组数上限
+    """
+    return min(spec.limit, max_results) if spec.limit else max_results + 1
+
+
+def finalize_rows(
+    spec: AggregateSpec, rows: list[dict[str, Any]], max_results: int
+) -> list[dict[str, Any]]:
+    """
+    对聚合结果在内存中应用 having、排序和 limit（用于不能下推这些子句的数据库）
+
+    Args:
+        spec: 聚合规格
+        rows: 每个分组一行的聚合结果
+        max_results: 最大返回分组数
+
+    Returns:
+        list[dict[str, Any]]: 最终结果（最多 max_results 个分组）
+
+    Raises:
+        QueryError: 分组数超出最大结果数时抛出
+    """
+    if spec.having:
+        rows = list(filter(_having_translator.translate(spec.having), rows))
+    if spec.limit is None and len(rows) > max_results:
+        raise QueryError(
+            f"Aggregate result exceeds maximum limit of {max_results} groups. "
+            f"Please add more specific filters or fewer group_by fields."
+        )
+    limit = min(spec.limit, max_results) if spec.limit else None
+    ordering = list(spec.ordering)
+    if ordering:
+        return sort_rows(rows, ordering, limit)
+    return rows[:limit] if limit else rows
+
+
+def _hashable(value: Any) -> Any:
+    """将列表、字典等不可哈希的值转换为可哈希的分组键"""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+def _accumulator(metric: Metric) -> tuple[Callable[[], Any], Callable[[Any, Any], Any]]:
+    """返回指标的 (初始状态, 累加函数)，累加函数接收状态和字段值并返回新状态"""
+    func = metric.func
+    if func == "count":
+        if metric.field is None:
+            return int, lambda state, value: state + 1
+        return int, lambda state, value: state + (value is not None)
+    if func in ("sum", "avg"):
+        # 状态为 [非空值个数, 求和]
+        def add(state: list, value: Any) -> list:
+            if value is not None:
+                state[0] += 1
+                state[1] += value
+            return state
+
+        return lambda: [0, 0], add
+    if func in ("min", "max"):
+        better = operator.lt if func == "min" else operator.gt
+
+        def pick(state: Any, value: Any) -> Any:
+            if value is None:
+                return state
+            return value if state is None or better(value, state) else state
+
+        return lambda: None, pick
+
+    def collect(state: set, value: Any) -> set:
+        if value is not None:
+            state.add(_hashable(value))
+        return state
+
+    return set, collect
+
+
+def _result(metric: Metric, state: Any) -> Any:
+    """将累加状态转换为指标值"""
+    if metric.func == "sum":
+        return state[1] if state[0] else None
+    if metric.func == "avg":
+        return state[1] / state[0] if state[0] else None
+    if metric.func == "count_distinct":
+        return len(state)
+    return state
+
+
+class HashAggregator:
+    """
+    流式哈希聚合
+
+    按批接收记录，只为每个分组保留累加状态，不保留原始记录，
+    用于没有服务端聚合能力的数据库（如 Redis）。
+    """
+
+    def __init__(self, spec: AggregateSpec):
+        """
+        初始化聚合器
+
+        Args:
+            spec: 聚合规格
+        """
+        self._spec = spec
+        self._fields = [metric.field for metric in spec.metrics]
+        accumulators = [_accumulator(metric) for metric in spec.metrics]
+        self._initials = [initial for initial, _ in accumulators]
+        self._adders = [add for _, add in accumulators]
+        # 分组键 -> (分组字段原始值, 各指标状态)
+        self._groups: dict[tuple, tuple[tuple, list]] = {}
+
+    def add(self, records: list[dict[str, Any]]) -> None:
+        """
+        累加一批记录
+
+        Args:
+            records: 记录列表
+
+        Raises:
+            QueryError: 字段值类型无法求和或比较时抛出
+        """
+        group_by = self._spec.group_by
+        fields = self._fields
+        adders = self._adders
+        groups = self._groups
+        try:
+            for record in records:
+                values = tuple(record.get(field) for field in group_by)
+                key = tuple(_hashable(value) for value in values)
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = (values, [initial() for initial in self._initials])
+                states = group[1]
+                for i, field in enumerate(fields):
+                    states[i] = adders[i](states[i], record.get(field) if field else None)
+        except TypeError as e:
+            raise QueryError(f"Cannot aggregate values of incompatible types: {e}") from e
+
+    def rows(self) -> list[dict[str, Any]]:
+        """
+        返回每个分组一行的聚合结果
+
+        Returns:
+            list[dict[str, Any]]: 聚合结果（未排序）
+        """
+        spec = self._spec
+        if not self._groups and not spec.group_by:
+            # 没有记录时全表聚合仍返回一行
+            self._groups[()] = ((), [initial() for initial in self._initials])
+
+        rows = []
+        for values, states in self._groups.values():
+            row = dict(zip(spec.group_by, values))
+            for metric, state in zip(spec.metrics, states):
+                row[metric.alias] = _result(metric, state)
+            rows.append(row)
+        return rows
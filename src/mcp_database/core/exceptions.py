@@ -40,6 +40,12 @@ class TimeoutError(DatabaseError):
     pass
 
 
+class OverloadedError(DatabaseError):
+    """过载错误（并发或排队请求超出限制，请求被拒绝）"""
+
+    pass
+
+
 class ExceptionTranslator:
     """异常转换器"""
 
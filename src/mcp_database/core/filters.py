@@ -1,11 +1,35 @@
 """过滤器 DSL 解析器"""
 
 import re
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import compress, count
 from typing import Any
 
 from mcp_database.core.exceptions import QueryError
 
+# 支持的操作符（未知操作符按等值处理）
+OPERATORS = frozenset(
+    {
+        "gt",
+        "lt",
+        "gte",
+        "lte",
+        "contains",
+        "startswith",
+        "endswith",
+        "in",
+        "not_in",
+        "isnull",
+        "notnull",
+    }
+)
+
+# 按过滤器形状缓存的编译计划数量上限
+PLAN_CACHE_SIZE = 256
+
 
 class FilterParser:
     """过滤器解析器基类"""
@@ -29,15 +53,226 @@ class FilterParser:
         return filtered
 
 
+# 逻辑组合键及其操作
+GROUP_OPERATORS = {"$and": "and", "$or": "or", "$not": "not"}
+
+
+@dataclass(frozen=True)
+class FilterCondition:
+    """解析后的单个过滤条件"""
+
+    key: str
+    field: str
+    # 操作符，等值条件为 "eq"
+    operator: str
+
+
+@dataclass(frozen=True)
+class FilterGroup:
+    """
+    逻辑组合条件（$and / $or / $not）
+
+    plans 为各子过滤器的编译计划，$not 只有一个子过滤器。
+    """
+
+    key: str
+    # 逻辑操作：and / or / not
+    operator: str
+    plans: tuple["FilterPlan", ...]
+
+
+@dataclass(frozen=True)
+class FilterPlan:
+    """
+    过滤器编译计划
+
+    只由过滤器的形状（键、操作符及逻辑组合的嵌套结构）决定，与具体值无关，
+    可在形状相同的调用间复用。
+    """
+
+    shape: tuple[Any, ...]
+    conditions: tuple[FilterCondition | FilterGroup, ...]
+
+
+def parse_key(key: str) -> FilterCondition:
+    """
+    解析 field__op 形式的过滤器键
+
+    Args:
+        key: 过滤器键
+
+    Returns:
+        FilterCondition: 过滤条件
+    """
+    if "__" in key:
+        field, operator = key.rsplit("__", 1)
+        return FilterCondition(key, field, operator if operator in OPERATORS else "eq")
+    return FilterCondition(key, key, "eq")
+
+
+def group_filters(key: str, value: Any) -> list[dict[str, Any]]:
+    """
+    获取逻辑组合中的子过滤器列表
+
+    $and / $or 的值为非空的过滤器列表，$not 的值为单个过滤器，子过滤器均不能为空。
+
+    Args:
+        key: 逻辑组合键
+        value: 逻辑组合的值
+
+    Returns:
+        子过滤器列表
+
+    Raises:
+        QueryError: 不支持的组合键或值格式错误时抛出
+    """
+    if key not in GROUP_OPERATORS:
+        raise QueryError(f"Unsupported filter group: {key}. Supported: $and, $or, $not")
+    if key == "$not":
+        if not isinstance(value, dict) or not value:
+            raise QueryError("Filter group '$not' must be a non-empty filter object")
+        return [value]
+    if not isinstance(value, list | tuple) or not value:
+        raise QueryError(f"Filter group '{key}' must be a non-empty list of filter objects")
+    if not all(isinstance(item, dict) and item for item in value):
+        raise QueryError(f"Filter group '{key}' must be a non-empty list of filter objects")
+    return list(value)
+
+
+def _shape_of(filters: dict[str, Any]) -> tuple[Any, ...]:
+    """计算过滤器形状（逻辑组合展开为嵌套元组）"""
+    keys = tuple(filters)
+    if not any(key.startswith("$") for key in keys):
+        return keys
+    return tuple(
+        (key, tuple(_shape_of(sub) for sub in group_filters(key, value)))
+        if key.startswith("$")
+        else key
+        for key, value in filters.items()
+    )
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile_shape(shape: tuple[Any, ...]) -> FilterPlan:
+    """按形状编译过滤器（结果被缓存）"""
+    conditions: list[FilterCondition | FilterGroup] = []
+    for entry in shape:
+        if isinstance(entry, tuple):
+            key, sub_shapes = entry
+            plans = tuple(_compile_shape(sub_shape) for sub_shape in sub_shapes)
+            conditions.append(FilterGroup(key, GROUP_OPERATORS[key], plans))
+        else:
+            conditions.append(parse_key(entry))
+    return FilterPlan(shape, tuple(conditions))
+
+
+def compile_filters(filters: dict[str, Any]) -> FilterPlan:
+    """
+    将过滤器编译为与值无关的计划（按形状缓存）
+
+    Args:
+        filters: 过滤器字典
+
+    Returns:
+        FilterPlan: 编译计划
+
+    Raises:
+        QueryError: 逻辑组合格式错误时抛出
+    """
+    return _compile_shape(_shape_of(filters))
+
+
+class _PlanCache:
+    """各转换器编译产物的 LRU 缓存"""
+
+    def __init__(self, max_entries: int = PLAN_CACHE_SIZE):
+        self._entries: OrderedDict[Any, Any] = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, key: Any, compile_func: Callable[[], Any]) -> Any:
+        """获取缓存的编译产物，不存在时调用 compile_func 编译并缓存"""
+        compiled = self._entries.get(key)
+        if compiled is None:
+            compiled = self._entries[key] = compile_func()
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return compiled
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _bind_nothing(params: dict[str, Any], value: Any) -> None:
+    """不产生参数的条件"""
+
+
+def _bind_value(name: str) -> Callable[[dict[str, Any], Any], None]:
+    """绑定单个参数"""
+
+    def bind(params: dict[str, Any], value: Any) -> None:
+        params[name] = value
+
+    return bind
+
+
+def _bind_pattern(name: str, pattern: str) -> Callable[[dict[str, Any], Any], None]:
+    """绑定 LIKE 模式参数"""
+
+    def bind(params: dict[str, Any], value: Any) -> None:
+        params[name] = pattern.format(value)
+
+    return bind
+
+
+def _bind_many(names: tuple[str, ...]) -> Callable[[dict[str, Any], Any], None]:
+    """绑定 IN 列表参数"""
+
+    def bind(params: dict[str, Any], values: Any) -> None:
+        params.update(zip(names, values))
+
+    return bind
+
+
+# 过滤器参数名前缀：参数按条件在过滤器中出现的顺序命名为 p0、p1、...
+PARAM_PREFIX = "p"
+
+
+def _param_names(prefix: str = PARAM_PREFIX) -> Iterator[str]:
+    """按顺序生成位置参数名（p0、p1、...），只依赖过滤器形状，不依赖字段名"""
+    return (f"{prefix}{index}" for index in count())
+
+
 class SQLFilterTranslator:
-    """SQL 过滤器转换器 - 使用参数化查询防止 SQL 注入"""
+    """
+    SQL 过滤器转换器 - 使用参数化查询防止 SQL 注入
+
+    WHERE 子句与参数绑定函数按形状缓存（IN 列表长度和 isnull 取值会改变 SQL，
+    也计入形状），每次调用只绑定参数值。参数按出现顺序命名为 p0、p1、...，
+    同一字段出现多次也不会重名，相同形状生成的 SQL 文本完全相同，
+    可命中驱动的预编译语句缓存。
+    $or / $and / $not 组合转换为带括号的 OR / AND / NOT 子句。
+    """
+
+    def __init__(self, cache_size: int = PLAN_CACHE_SIZE):
+        """
+        初始化转换器
 
-    def translate(self, filters: dict[str, Any]) -> tuple[str, dict[str, Any]]:
+        Args:
+            cache_size: 编译结果缓存上限
+        """
+        self._cache = _PlanCache(cache_size)
+
+    def translate(
+        self, filters: dict[str, Any], prefix: str = PARAM_PREFIX
+    ) -> tuple[str, dict[str, Any]]:
         """
         将过滤器转换为 SQL WHERE 子句和参数字典
 
         Args:
             filters: 过滤器字典
+            prefix: 参数名前缀（同一语句中有多组过滤条件时用于区分，默认 "p"）
 
         Returns:
             (WHERE 子句, 参数字典)
@@ -48,106 +283,176 @@ class SQLFilterTranslator:
         if not filters:
             return "", {}
 
-        conditions = []
-        params = {}
-
-        for key, value in filters.items():
-            if "__" in key:
-                field, operator = key.rsplit("__", 1)
-                condition, field_params = self._translate_operator(field, operator, value)
-            else:
-                condition, field_params = self._translate_equality(key, value)
-
-            if condition:
-                conditions.append(condition)
-                params.update(field_params)
+        plan = compile_filters(filters)
+        variant = self._plan_variant(plan, filters)
+        where_clause, bind = self._cache.get(
+            (plan.shape, variant, prefix),
+            lambda: self._compile(plan, variant, _param_names(prefix)),
+        )
 
-        where_clause = " AND ".join(conditions) if conditions else ""
+        params: dict[str, Any] = {}
+        bind(params, filters)
         return where_clause, params
 
-    def _translate_equality(self, field: str, value: Any) -> tuple[str, dict[str, Any]]:
-        """转换等值条件 - 使用参数化查询"""
-        if value is None:
-            msg = "Filter '{}' cannot have None value. Use '{}__isnull=True' for null queries."
-            raise QueryError(msg.format(field, field))
-        param_name = f"{field}_eq"
-        return f"{field} = :{param_name}", {param_name: value}
-
-    def _translate_operator(
-        self, field: str, operator: str, value: Any
-    ) -> tuple[str, dict[str, Any]]:
-        """转换操作符 - 使用参数化查询"""
-        param_name = f"{field}_{operator}"
-
-        operator_map = {
-            "gt": lambda: (f"{field} > :{param_name}", {param_name: value}),
-            "lt": lambda: (f"{field} < :{param_name}", {param_name: value}),
-            "gte": lambda: (f"{field} >= :{param_name}", {param_name: value}),
-            "lte": lambda: (f"{field} <= :{param_name}", {param_name: value}),
-            "contains": lambda: (f"{field} LIKE :{param_name}", {param_name: f"%{value}%"}),
-            "startswith": lambda: (f"{field} LIKE :{param_name}", {param_name: f"{value}%"}),
-            "endswith": lambda: (f"{field} LIKE :{param_name}", {param_name: f"%{value}"}),
-            "in": lambda: self._translate_in(field, value),
-            "not_in": lambda: self._translate_not_in(field, value),
-            "isnull": lambda: self._translate_isnull(field, value),
-            "notnull": lambda: self._translate_notnull(field, value),
-        }
-
-        if operator in operator_map:
-            return operator_map[operator]()
-
-        return self._translate_equality(field, value)
-
-    def _translate_in(self, field: str, values: list[Any]) -> tuple[str, dict[str, Any]]:
-        """转换 IN 操作符"""
-        if not values:
-            return "1=0", {}
-
-        placeholders = []
-        params = {}
-        for i, value in enumerate(values):
-            param_name = f"{field}_in_{i}"
-            placeholders.append(f":{param_name}")
-            params[param_name] = value
-
-        return f"{field} IN ({', '.join(placeholders)})", params
-
-    def _translate_not_in(self, field: str, values: list[Any]) -> tuple[str, dict[str, Any]]:
-        """转换 NOT IN 操作符"""
-        if not values:
-            return "1=1", {}
-
-        placeholders = []
-        params = {}
-        for i, value in enumerate(values):
-            param_name = f"{field}_notin_{i}"
-            placeholders.append(f":{param_name}")
-            params[param_name] = value
-
-        return f"{field} NOT IN ({', '.join(placeholders)})", params
-
-    def _translate_isnull(self, field: str, value: Any) -> tuple[str, dict[str, Any]]:
-        """转换 IS NULL 操作符"""
-        if not isinstance(value, bool):
-            raise QueryError(f"Filter '{field}__isnull' must be true or false")
-        if value:
-            return f"{field} IS NULL", {}
-        else:
-            return f"{field} IS NOT NULL", {}
-
-    def _translate_notnull(self, field: str, value: Any) -> tuple[str, dict[str, Any]]:
-        """转换 NOT NULL 操作符（与 isnull 反向）"""
-        if not isinstance(value, bool):
-            raise QueryError(f"Filter '{field}__notnull' must be true or false")
-        if value:
-            return f"{field} IS NOT NULL", {}
+    def _plan_variant(self, plan: FilterPlan, filters: dict[str, Any]) -> tuple[Any, ...]:
+        """计算过滤器中会影响 SQL 文本的取值部分"""
+        return tuple(
+            self._variant(condition, value)
+            for condition, value in zip(plan.conditions, filters.values())
+        )
+
+    def _variant(self, condition: FilterCondition | FilterGroup, value: Any) -> Any:
+        """校验取值，并返回会影响 SQL 文本的部分"""
+        if isinstance(condition, FilterGroup):
+            return tuple(
+                self._plan_variant(plan, sub_filters)
+                for plan, sub_filters in zip(condition.plans, group_filters(condition.key, value))
+            )
+
+        operator = condition.operator
+        if operator == "eq":
+            if value is None:
+                msg = "Filter '{}' cannot have None value. Use '{}__isnull=True' for null queries."
+                raise QueryError(msg.format(condition.field, condition.field))
+            return None
+        if operator in ("in", "not_in"):
+            # None 与空列表相同（IN 匹配不到任何记录，NOT IN 不过滤）
+            if value is None:
+                return 0
+            if not isinstance(value, (list, tuple)):
+                raise QueryError(f"Filter '{condition.field}__{operator}' must be a list")
+            return len(value)
+        if operator in ("isnull", "notnull"):
+            if not isinstance(value, bool):
+                raise QueryError(f"Filter '{condition.field}__{operator}' must be true or false")
+            return value
+        return None
+
+    def _compile(
+        self, plan: FilterPlan, variant: tuple[Any, ...], names: Iterator[str]
+    ) -> tuple[str, Callable[[dict[str, Any], dict[str, Any]], None]]:
+        """编译 WHERE 子句及绑定整个过滤器参数的函数"""
+        clauses = []
+        binders = []
+        for condition, shape in zip(plan.conditions, variant):
+            if isinstance(condition, FilterGroup):
+                clause, bind = self._compile_group(condition, shape, names)
+            else:
+                clause, bind = self._compile_condition(
+                    condition.field, condition.operator, shape, names
+                )
+            clauses.append(clause)
+            binders.append(bind)
+
+        bound = tuple(binders)
+
+        def bind_plan(params: dict[str, Any], filters: dict[str, Any]) -> None:
+            for bind, value in zip(bound, filters.values()):
+                bind(params, value)
+
+        return " AND ".join(clauses), bind_plan
+
+    def _compile_group(
+        self, group: FilterGroup, variants: tuple[Any, ...], names: Iterator[str]
+    ) -> tuple[str, Callable[[dict[str, Any], Any], None]]:
+        """编译 $and / $or / $not 组合"""
+        parts = []
+        binders = []
+        for plan, variant in zip(group.plans, variants):
+            clause, plan_bind = self._compile(plan, variant, names)
+            if len(plan.conditions) > 1 and group.operator != "not":
+                clause = f"({clause})"
+            parts.append(clause)
+            binders.append(plan_bind)
+
+        if group.operator == "not":
+            clause = f"NOT ({parts[0]})"
         else:
-            return f"{field} IS NULL", {}
+            clause = (" OR " if group.operator == "or" else " AND ").join(parts)
+            if len(parts) > 1:
+                clause = f"({clause})"
+
+        bound = tuple(binders)
+        key = group.key
+
+        def bind_group(params: dict[str, Any], value: Any) -> None:
+            for bind_plan, sub_filters in zip(bound, group_filters(key, value)):
+                bind_plan(params, sub_filters)
+
+        return clause, bind_group
+
+    def _compile_condition(
+        self, field: str, operator: str, shape: Any, names: Iterator[str]
+    ) -> tuple[str, Callable[[dict[str, Any], Any], None]]:
+        """编译单个条件"""
+        if operator == "in":
+            return self._compile_in(field, "IN", shape, "1=0", names)
+        if operator == "not_in":
+            return self._compile_in(field, "NOT IN", shape, "1=1", names)
+        if operator in ("isnull", "notnull"):
+            # shape 为布尔取值
+            is_null = shape if operator == "isnull" else not shape
+            return f"{field} IS NULL" if is_null else f"{field} IS NOT NULL", _bind_nothing
+
+        param_name = next(names)
+        if operator in ("gt", "lt", "gte", "lte"):
+            symbol = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}[operator]
+            return f"{field} {symbol} :{param_name}", _bind_value(param_name)
+        if operator in ("contains", "startswith", "endswith"):
+            pattern = {"contains": "%{}%", "startswith": "{}%", "endswith": "%{}"}[operator]
+            return f"{field} LIKE :{param_name}", _bind_pattern(param_name, pattern)
+        return f"{field} = :{param_name}", _bind_value(param_name)
+
+    def _compile_in(
+        self,
+        field: str,
+        keyword: str,
+        length: int,
+        empty_clause: str,
+        names: Iterator[str],
+    ) -> tuple[str, Callable[[dict[str, Any], Any], None]]:
+        """编译 IN / NOT IN 条件"""
+        if length == 0:
+            return empty_clause, _bind_nothing
+
+        params = tuple(next(names) for _ in range(length))
+        placeholders = ", ".join(f":{name}" for name in params)
+        return f"{field} {keyword} ({placeholders})", _bind_many(params)
+
+
+# MongoDB 操作符转换（按操作符预先构建，避免每次调用重建映射）
+_MONGO_OPERATORS: dict[str, Callable[[Any], Any]] = {
+    "eq": lambda value: value,
+    "gt": lambda value: {"$gt": value},
+    "lt": lambda value: {"$lt": value},
+    "gte": lambda value: {"$gte": value},
+    "lte": lambda value: {"$lte": value},
+    "contains": lambda value: {"$regex": str(value), "$options": "i"},
+    "startswith": lambda value: {"$regex": f"^{re.escape(str(value))}", "$options": "i"},
+    "endswith": lambda value: {"$regex": f"{re.escape(str(value))}$", "$options": "i"},
+    "in": lambda value: {"$in": value},
+    "not_in": lambda value: {"$nin": value},
+    "isnull": lambda value: {"$exists": False} if value else {"$exists": True},
+    "notnull": lambda value: {"$exists": True} if value else {"$exists": False},
+}
+
+
+# 逻辑组合对应的 MongoDB 操作符（$not 只能作用于字段，整体取反使用 $nor）
+_MONGO_GROUPS = {"and": "$and", "or": "$or", "not": "$nor"}
 
 
 class MongoFilterTranslator:
     """MongoDB 过滤器转换器"""
 
+    def __init__(self, cache_size: int = PLAN_CACHE_SIZE):
+        """
+        初始化转换器
+
+        Args:
+            cache_size: 编译结果缓存上限
+        """
+        self._cache = _PlanCache(cache_size)
+
     def translate(self, filters: dict[str, Any]) -> dict[str, Any]:
         """
         将过滤器转换为 MongoDB 查询条件
@@ -158,38 +463,130 @@ class MongoFilterTranslator:
         Returns:
             MongoDB 查询条件
         """
-        mongo_filters = {}
-
-        for key, value in filters.items():
-            if "__" in key:
-                field, operator = key.rsplit("__", 1)
-                mongo_filters[field] = self._translate_operator(operator, value)
+        plan = compile_filters(filters)
+        build = self._cache.get(plan.shape, lambda: self._compile(plan))
+        return build(filters)
+
+    def _compile(self, plan: FilterPlan) -> Callable[[dict[str, Any]], dict[str, Any]]:
+        """编译为由过滤器构建 MongoDB 查询条件的函数"""
+        builders: list[tuple[str, Callable[[Any], Any]]] = []
+        for condition in plan.conditions:
+            if isinstance(condition, FilterGroup):
+                builders.append((_MONGO_GROUPS[condition.operator], self._compile_group(condition)))
             else:
-                mongo_filters[key] = value
+                builders.append((condition.field, _MONGO_OPERATORS[condition.operator]))
+        bound = tuple(builders)
+
+        def build(filters: dict[str, Any]) -> dict[str, Any]:
+            return {
+                field: builder(value) for (field, builder), value in zip(bound, filters.values())
+            }
+
+        return build
+
+    def _compile_group(self, group: FilterGroup) -> Callable[[Any], list[dict[str, Any]]]:
+        """编译逻辑组合，生成子条件列表"""
+        builds = tuple(self._compile(plan) for plan in group.plans)
+        key = group.key
+        return lambda value: [
+            build(sub_filters) for build, sub_filters in zip(builds, group_filters(key, value))
+        ]
+
+
+def _compile_check(operator: str, value: Any) -> Callable[[Any], bool]:
+    """
+    将单个条件编译为作用于字段值的专用判断函数
+
+    操作符在编译时分派，字符串形式和 IN 集合预先计算，逐条记录调用时只做比较。
+    """
+    if operator == "gt":
+        return lambda field_value: field_value is not None and field_value > value
+    if operator == "lt":
+        return lambda field_value: field_value is not None and field_value < value
+    if operator == "gte":
+        return lambda field_value: field_value is not None and field_value >= value
+    if operator == "lte":
+        return lambda field_value: field_value is not None and field_value <= value
+
+    if operator == "contains":
+        return lambda field_value: field_value is not None and value in str(field_value)
+    if operator == "startswith":
+        prefix = str(value)
+        return lambda field_value: field_value is not None and str(field_value).startswith(prefix)
+    if operator == "endswith":
+        suffix = str(value)
+        return lambda field_value: field_value is not None and str(field_value).endswith(suffix)
+
+    if operator in ("in", "not_in"):
+        return _compile_membership(value, negate=operator == "not_in")
+
+    if operator in ("isnull", "notnull"):
+        if not isinstance(value, bool):
+            return lambda field_value: False
+        want_null = value if operator == "isnull" else not value
+        if want_null:
+            return lambda field_value: field_value is None
+        return lambda field_value: field_value is not None
+
+    return lambda field_value: field_value == value
+
+
+def _compile_membership(values: Any, negate: bool) -> Callable[[Any], bool]:
+    """编译 IN / NOT IN 判断，可哈希的取值预先构建 frozenset"""
+    try:
+        members = frozenset(values)
+    except TypeError:
+        # 取值不可哈希时退回线性查找
+        listed = list(values)
 
-        return mongo_filters
+        def contains(field_value: Any) -> bool:
+            return field_value in listed
 
-    def _translate_operator(self, operator: str, value: Any) -> dict[str, Any]:
-        """转换操作符"""
-        operator_map = {
-            "gt": {"$gt": value},
-            "lt": {"$lt": value},
-            "gte": {"$gte": value},
-            "lte": {"$lte": value},
-            "contains": {"$regex": str(value), "$options": "i"},
-            "startswith": {"$regex": f"^{re.escape(str(value))}", "$options": "i"},
-            "endswith": {"$regex": f"{re.escape(str(value))}$", "$options": "i"},
-            "in": {"$in": value},
-            "not_in": {"$nin": value},
-            "isnull": {"$exists": False} if value else {"$exists": True},
-            "notnull": {"$exists": True} if value else {"$exists": False},
-        }
+    else:
 
-        return operator_map.get(operator, value)
+        def contains(field_value: Any) -> bool:
+            try:
+                return field_value in members
+            except TypeError:
+                # 字段值不可哈希（如列表）时逐个比较
+                return any(field_value == member for member in members)
+
+    if negate:
+        return lambda field_value: not contains(field_value)
+    return contains
 
 
 class RedisFilterTranslator:
-    """Redis 过滤器转换器"""
+    """
+    Redis 过滤器转换器
+
+    过滤器在转换时编译为 (字段, 判断函数) 列表，逐条记录过滤时只取字段值并调用判断函数；
+    $or / $and / $not 组合编译为作用于整条记录的判断函数。
+    """
+
+    def _compile(
+        self, filters: dict[str, Any]
+    ) -> tuple[list[tuple[str, Callable[[Any], bool]]], list[Callable[[dict[str, Any]], bool]]]:
+        """编译过滤器为 (字段, 判断函数) 列表及逻辑组合判断函数列表"""
+        plan = compile_filters(filters)
+        checks = []
+        predicates = []
+        for condition, value in zip(plan.conditions, filters.values()):
+            if isinstance(condition, FilterGroup):
+                predicates.append(self._compile_group(condition, value))
+            else:
+                checks.append((condition.field, _compile_check(condition.operator, value)))
+        return checks, predicates
+
+    def _compile_group(self, group: FilterGroup, value: Any) -> Callable[[dict[str, Any]], bool]:
+        """编译逻辑组合为记录判断函数"""
+        subs = [self.translate(sub_filters) for sub_filters in group_filters(group.key, value)]
+        if group.operator == "or":
+            return lambda data: any(sub(data) for sub in subs)
+        if group.operator == "not":
+            negated = subs[0]
+            return lambda data: not negated(data)
+        return lambda data: all(sub(data) for sub in subs)
 
     def translate(self, filters: dict[str, Any]) -> Callable[[dict[str, Any]], bool]:
         """
@@ -201,50 +598,52 @@ class RedisFilterTranslator:
         Returns:
             过滤函数
         """
+        checks, predicates = self._compile(filters)
+
+        if len(checks) == 1 and not predicates:
+            field, check = checks[0]
+            return lambda data: check(data.get(field))
 
         def filter_func(data: dict[str, Any]) -> bool:
             """过滤函数"""
-            for key, value in filters.items():
-                if "__" in key:
-                    field, operator = key.rsplit("__", 1)
-                    if not self._check_operator(data, field, operator, value):
-                        return False
-                else:
-                    if data.get(key) != value:
-                        return False
+            get = data.get
+            for field, check in checks:
+                if not check(get(field)):
+                    return False
+            for predicate in predicates:
+                if not predicate(data):
+                    return False
             return True
 
         return filter_func
 
-    def _check_operator(self, data: dict[str, Any], field: str, operator: str, value: Any) -> bool:
-        """检查操作符条件"""
-        field_value = data.get(field)
-
-        if operator == "gt":
-            return field_value is not None and field_value > value
-        elif operator == "lt":
-            return field_value is not None and field_value < value
-        elif operator == "gte":
-            return field_value is not None and field_value >= value
-        elif operator == "lte":
-            return field_value is not None and field_value <= value
-        elif operator == "contains":
-            return field_value is not None and value in str(field_value)
-        elif operator == "startswith":
-            return field_value is not None and str(field_value).startswith(str(value))
-        elif operator == "endswith":
-            return field_value is not None and str(field_value).endswith(str(value))
-        elif operator == "in":
-            return field_value in value
-        elif operator == "not_in":
-            return field_value not in value
-        elif operator == "isnull":
-            if not isinstance(value, bool):
-                return False
-            return field_value is None if value else field_value is not None
-        elif operator == "notnull":
-            if not isinstance(value, bool):
-                return False
-            return field_value is not None if value else field_value is None
+    def translate_batch(
+        self, filters: dict[str, Any]
+    ) -> Callable[[list[dict[str, Any]]], list[int]]:
+        """
+        将过滤器转换为按列批量过滤的函数
 
-        return field_value == value
+        逐个条件对整批记录取出该字段的列并求值，只对仍满足前面条件的记录求值后续条件，
+        适合一次过滤大批已解码的记录。逻辑组合在字段条件之后逐条求值。
+
+        Args:
+            filters: 过滤器字典
+
+        Returns:
+            批量过滤函数：接收记录列表，返回满足条件的记录下标列表
+        """
+        checks, predicates = self._compile(filters)
+
+        def batch_filter(records: list[dict[str, Any]]) -> list[int]:
+            """批量过滤函数"""
+            indices: list[int] = list(range(len(records)))
+            for field, check in checks:
+                if not indices:
+                    break
+                column = [records[i].get(field) for i in indices]
+                indices = list(compress(indices, map(check, column)))
+            for predicate in predicates:
+                indices = [i for i in indices if predicate(records[i])]
+            return indices
+
+        return batch_filter
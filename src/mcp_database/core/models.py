@@ -27,6 +27,13 @@ class DeleteResult(BaseModel):
     success: bool = Field(default=True, description="操作是否成功")
 
 
+class UpsertResult(BaseModel):
+    """插入或更新操作结果"""
+
+    upserted_count: int = Field(..., ge=0, description="写入（插入或更新）的记录数")
+    success: bool = Field(default=True, description="操作是否成功")
+
+
 class QueryResult(BaseModel):
     """查询操作结果"""
 
@@ -67,6 +74,9 @@ class DatabaseConfig(BaseModel):
     """数据库配置"""
 
     url: str = Field(..., description="数据库连接 URL")
+    hosts: list[str] = Field(
+        default_factory=list, description="集群节点 URL 列表（可选，为空时仅使用 url）"
+    )
     pool_size: int = Field(default=5, ge=1, description="连接池大小")
     max_overflow: int = Field(default=10, ge=0, description="最大溢出连接数")
     connect_timeout: int = Field(default=10, ge=1, description="连接超时（秒）")
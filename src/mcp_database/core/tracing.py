@@ -0,0 +1,261 @@
+"""适配器调用与 SQL 生成的追踪钩子"""
+
+import contextvars
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Literal, TypeVar, cast
+
+logger = logging.getLogger(__name__)
+
+# 当前活动的追踪区间（用于建立父子关系）
+_current_span: contextvars.ContextVar["SpanContext | None"] = contextvars.ContextVar(
+    "mcp_database_current_span", default=None
+)
+
+# 对所有适配器生效的全局钩子
+_global_hooks: list["TracingHook"] = []
+
+# 被装饰的异步适配器方法
+AsyncMethod = TypeVar("AsyncMethod", bound=Callable[..., Awaitable[Any]])
+
+
+@dataclass
+class SpanContext:
+    """
+    追踪区间上下文
+
+    name 为区间名称：适配器方法（如 query、insert）或内部阶段
+    （translate_filters、build_sql、pool_checkout、execute、decode_rows）。
+    """
+
+    name: str
+    db_type: str
+    operation: str | None = None
+    table: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    parent: "SpanContext | None" = None
+    start: float = 0.0
+    end: float | None = None
+    error: BaseException | None = None
+    # 钩子的私有数据（如 OpenTelemetry span 对象）
+    data: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float | None:
+        """区间耗时（秒），未结束时为 None"""
+        return None if self.end is None else self.end - self.start
+
+
+class TracingHook:
+    """
+    追踪钩子基类
+
+    子类按需覆盖 before/after/error，钩子抛出的异常只记录日志，不影响数据库操作。
+    """
+
+    def before(self, span: SpanContext) -> None:
+        """区间开始时调用"""
+
+    def after(self, span: SpanContext) -> None:
+        """区间成功结束时调用"""
+
+    def error(self, span: SpanContext, exc: BaseException) -> None:
+        """区间因异常结束时调用"""
+
+
+def register_hook(hook: TracingHook) -> None:
+    """
+    注册对所有适配器生效的全局钩子
+
+    Args:
+        hook: 追踪钩子
+    """
+    _global_hooks.append(hook)
+
+
+def unregister_hook(hook: TracingHook) -> None:
+    """
+    移除全局钩子
+
+    Args:
+        hook: 追踪钩子
+    """
+    if hook in _global_hooks:
+        _global_hooks.remove(hook)
+
+
+class _NullSpan:
+    """未注册钩子时使用的空区间，进入时返回 None"""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> Literal[False]:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """调用钩子的追踪区间"""
+
+    __slots__ = ("_hooks", "_context", "_token")
+
+    def __init__(self, hooks: list[TracingHook], context: SpanContext) -> None:
+        self._hooks = hooks
+        self._context = context
+        self._token: contextvars.Token[SpanContext | None] | None = None
+
+    def _call(self, method: str, *args: Any) -> None:
+        for hook in self._hooks:
+            try:
+                getattr(hook, method)(self._context, *args)
+            except Exception:
+                logger.exception("Tracing hook %r failed in %s()", hook, method)
+
+    def __enter__(self) -> SpanContext:
+        self._context.start = time.perf_counter()
+        self._token = _current_span.set(self._context)
+        self._call("before")
+        return self._context
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> Literal[False]:
+        self._context.end = time.perf_counter()
+        if self._token is not None:
+            _current_span.reset(self._token)
+            self._token = None
+        if exc is None:
+            self._call("after")
+        else:
+            self._context.error = exc
+            self._call("error", exc)
+        return False
+
+
+def start_span(
+    hooks: list[TracingHook],
+    name: str,
+    db_type: str,
+    operation: str | None = None,
+    table: str | None = None,
+    **attributes: Any,
+) -> "_Span | _NullSpan":
+    """
+    创建追踪区间（实例钩子与全局钩子都为空时返回无开销的空区间）
+
+    Args:
+        hooks: 适配器实例的钩子
+        name: 区间名称
+        db_type: 数据库类型
+        operation: 所属的适配器操作（默认继承父区间）
+        table: 表名（默认继承父区间）
+        attributes: 区间属性
+
+    Returns:
+        可用于 with 语句的区间，进入时返回 SpanContext（空区间返回 None）
+    """
+    if not hooks and not _global_hooks:
+        return NULL_SPAN
+
+    parent = _current_span.get()
+    if parent is not None:
+        operation = operation or parent.operation
+        table = table or parent.table
+    context = SpanContext(
+        name=name,
+        db_type=db_type,
+        operation=operation,
+        table=table,
+        attributes=attributes,
+        parent=parent,
+    )
+    return _Span([*_global_hooks, *hooks], context)
+
+
+def traced(operation: str) -> Callable[[AsyncMethod], AsyncMethod]:
+    """
+    为适配器方法创建顶层追踪区间的装饰器
+
+    Args:
+        operation: 操作名称
+
+    Returns:
+        装饰器函数
+    """
+
+    def decorator(func: AsyncMethod) -> AsyncMethod:
+        @wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not getattr(self, "_hooks", ()) and not _global_hooks:
+                return await func(self, *args, **kwargs)
+
+            if operation in ("execute", "advanced_query"):
+                table = None
+            else:
+                table = args[0] if args else kwargs.get("table")
+            with self._span(operation, operation=operation, table=table):
+                return await func(self, *args, **kwargs)
+
+        setattr(wrapper, "__tracing_traced__", True)
+        return cast(AsyncMethod, wrapper)
+
+    return decorator
+
+
+class OpenTelemetryHook(TracingHook):
+    """
+    将追踪区间转发到 OpenTelemetry 的钩子
+
+    opentelemetry-api 为可选依赖，仅在创建该钩子时导入。
+    """
+
+    def __init__(self, tracer: Any = None):
+        """
+        初始化钩子
+
+        Args:
+            tracer: OpenTelemetry Tracer（可选，默认使用全局 TracerProvider 创建）
+
+        Raises:
+            ImportError: 未安装 opentelemetry-api 时抛出
+        """
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetry support requires opentelemetry-api. "
+                "Install it with: pip install opentelemetry-api"
+            ) from e
+
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("mcp_database")
+
+    def before(self, span: SpanContext) -> None:
+        parent = span.parent.data.get("otel_span") if span.parent is not None else None
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        attributes = {"db.system": span.db_type}
+        if span.operation:
+            attributes["db.operation"] = span.operation
+        if span.table:
+            attributes["db.sql.table"] = span.table
+        span.data["otel_span"] = self._tracer.start_span(
+            f"db.{span.name}", context=context, attributes=attributes
+        )
+
+    def after(self, span: SpanContext) -> None:
+        otel_span = span.data.pop("otel_span", None)
+        if otel_span is not None:
+            for key, value in span.attributes.items():
+                otel_span.set_attribute(f"mcp_database.{key}", value)
+            otel_span.end()
+
+    def error(self, span: SpanContext, exc: BaseException) -> None:
+        otel_span = span.data.pop("otel_span", None)
+        if otel_span is not None:
+            otel_span.record_exception(exc)
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(exc)))
+            otel_span.end()
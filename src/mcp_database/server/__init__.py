@@ -1,12 +1,15 @@
 """MCP Database Server - 统一数据库操作 MCP Server"""
 
 import asyncio
-from typing import Any
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, TypeVar
 
 from mcp.server.fastmcp import FastMCP
 
-from mcp_database import AdapterFactory, DatabaseConfig
-from mcp_database.core.exceptions import DatabaseError
+from mcp_database import DatabaseConfig
+from mcp_database.core.exceptions import DatabaseError, OverloadedError, QueryError
 from mcp_database.core.models import (
     AdvancedResult,
     DeleteResult,
@@ -14,93 +17,198 @@ from mcp_database.core.models import (
     InsertResult,
     QueryResult,
     UpdateResult,
+    UpsertResult,
 )
+from mcp_database.server.registry import DEFAULT_DATABASE, AdapterRegistry
+from mcp_database.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
 
 mcp = FastMCP("MCP Database")
 
-_database_url: str = ""
-_adapter: Any = None
+T = TypeVar("T")
+
+# 不修改数据的高级操作（执行后无需使查询缓存失效）
+READ_ONLY_OPERATIONS = ("aggregate", "search")
+
+_registry = AdapterRegistry()
+_warmup_task: asyncio.Task | None = None
 
 
 def set_database_url(url: str) -> None:
-    """设置数据库连接 URL"""
-    global _database_url, _adapter
-    _database_url = url
-    _adapter = None
+    """设置数据库连接 URL（单数据库模式，注册为默认数据库）"""
+    _registry.clear()
+    _registry.register(DEFAULT_DATABASE, DatabaseConfig(url=url))
+
+
+def set_registry(registry: AdapterRegistry) -> None:
+    """设置多数据库注册表"""
+    global _registry
+    _registry = registry
+
+
+def get_registry() -> AdapterRegistry:
+    """获取多数据库注册表"""
+    return _registry
 
 
-def get_adapter() -> Any:
-    """获取数据库适配器单例"""
-    global _adapter
-    if _adapter is None:
-        config = DatabaseConfig(url=_database_url)
-        _adapter = AdapterFactory.create_adapter(config)
-    return _adapter
+def get_adapter(database: str | None = None) -> Any:
+    """获取数据库适配器（按名称懒加载）"""
+    return _registry.get_adapter(database)
 
 
-async def ensure_connected() -> None:
-    """确保数据库已连接"""
-    adapter = get_adapter()
-    if not adapter.is_connected:
-        await adapter.connect()
+async def ensure_connected(database: str | None = None) -> None:
+    """确保数据库已连接（并发调用共享一次连接过程）"""
+    await _registry.ensure_connected(database)
+
+
+def _error_response(e: DatabaseError) -> dict[str, Any]:
+    """将数据库错误转换为工具返回值"""
+    error_type = "overloaded" if isinstance(e, OverloadedError) else "query_error"
+    return {"success": False, "error": {"type": error_type, "message": str(e)}}
+
+
+@contextmanager
+def _invalidating(database: str | None, tables: Iterable[str] | None = None) -> Iterator[None]:
+    """
+    写操作结束后（无论成功与否）使对应表的查询缓存失效并丢弃进行中的合并请求，
+    tables 为 None 时作用于该数据库的所有表
+    """
+    try:
+        yield
+    finally:
+        entry = _registry.resolve(database)
+        for table in tables if tables is not None else (None,):
+            if entry.cache is not None:
+                entry.cache.invalidate(table)
+            if entry.coalescer is not None:
+                entry.coalescer.forget(table)
+
+
+@asynccontextmanager
+async def use_adapter(
+    database: str | None = None, tool: str = "query", table: str | None = None
+) -> AsyncIterator[Any]:
+    """通过准入控制占用数据库并发名额并返回已连接的适配器"""
+    async with _registry.limit(database, tool, table):
+        await ensure_connected(database)
+        yield get_adapter(database)
+
+
+async def _coalesced(
+    database: str | None, table: str, key_parts: tuple, factory: Callable[[], Awaitable[T]]
+) -> T:
+    """合并进行中的相同只读请求（数据库未启用合并时直接执行）"""
+    coalescer = _registry.resolve(database).coalescer
+    if coalescer is None:
+        return await factory()
+    return await coalescer.run(coalescer.make_key(*key_parts), table, factory)
 
 
 @mcp.tool()
-async def insert(table: str, data: dict[str, Any] | list[dict[str, Any]]) -> dict[str, Any]:
+async def insert(
+    table: str, data: dict[str, Any] | list[dict[str, Any]], database: str | None = None
+) -> dict[str, Any]:
     """
     向数据库插入新记录。
 
     Args:
         table: 表/集合/键前缀名
         data: 要插入的数据（对象或数组，支持批量插入）
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
 
     Returns:
         包含 success、inserted_count、inserted_ids 的字典
     """
-    await ensure_connected()
-    adapter = get_adapter()
     try:
-        result: InsertResult = await adapter.insert(table, data)
+        async with use_adapter(database, "insert", table) as adapter:
+            with _invalidating(database, [table]):
+                result: InsertResult = await adapter.insert(table, data)
         return {
             "success": result.success,
             "inserted_count": result.inserted_count,
             "inserted_ids": result.inserted_ids,
         }
     except DatabaseError as e:
-        return {"success": False, "error": {"type": "query_error", "message": str(e)}}
+        return _error_response(e)
 
 
 @mcp.tool()
 async def query(
-    table: str, filters: dict[str, Any] | None = None, limit: int | None = None
+    table: str,
+    filters: dict[str, Any] | None = None,
+    limit: int | None = None,
+    database: str | None = None,
+    offset: int | None = None,
+    order_by: list[str] | None = None,
+    fields: list[str] | None = None,
 ) -> dict[str, Any]:
     """
     从数据库查询数据。
 
     Args:
         table: 表/集合/键前缀名
-        filters: 过滤条件，支持操作符：__gt、__gte、__lt、__lte、__contains、__startswith、__endswith、__in、__not_in、__isnull
+        filters: 过滤条件，支持操作符：__gt、__gte、__lt、__lte、__contains、__startswith、
+            __endswith、__in、__not_in、__isnull；
+            支持逻辑组合 $or / $and（过滤器列表）和 $not（单个过滤器），可嵌套，
+            如 {"$or": [{"age__lt": 18}, {"vip": true}]}
         limit: 返回数量限制，默认100，最大10000
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
+        offset: 跳过的记录数（可选，与 limit 配合分页）
+        order_by: 排序字段列表，"-" 前缀表示降序，如 ["-created_at", "id"]（可选）
+        fields: 只返回的字段列表（可选，默认返回全部字段）
 
     Returns:
         包含 success、data、count、has_more 的字典
     """
-    await ensure_connected()
-    adapter = get_adapter()
     try:
-        result: QueryResult = await adapter.query(table, filters, limit)
-        return {
-            "success": result.success,
-            "data": result.data,
-            "count": result.count,
-            "has_more": result.has_more,
-        }
+        options = _query_options(offset, order_by, fields)
+        cache = _registry.resolve(database).cache
+        if cache is not None and cache.enabled_for(table):
+            key = cache.make_key(table, filters, limit, options)
+            cached = cache.get(key)
+            if cached is not None:
+                return _query_response(cached)
+            version = cache.version(table)
+        else:
+            cache = None
+
+        async def fetch() -> QueryResult:
+            async with use_adapter(database, "query", table) as adapter:
+                result: QueryResult = await adapter.query(table, filters, limit, **options)
+            return result
+
+        result = await _coalesced(database, table, ("query", table, filters, limit, options), fetch)
+
+        if cache is not None:
+            cache.put(key, table, result, version)
+        return _query_response(result)
     except DatabaseError as e:
-        return {"success": False, "error": {"type": "query_error", "message": str(e)}}
+        return _error_response(e)
+
+
+def _query_options(
+    offset: int | None, order_by: list[str] | None, fields: list[str] | None
+) -> dict[str, Any]:
+    """收集已指定的 offset、order_by、fields 查询参数"""
+    options = {"offset": offset, "order_by": order_by, "fields": fields}
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def _query_response(result: QueryResult) -> dict[str, Any]:
+    """将查询结果转换为工具返回值"""
+    return {
+        "success": result.success,
+        "data": result.data,
+        "count": result.count,
+        "has_more": result.has_more,
+    }
 
 
 @mcp.tool()
-async def update(table: str, data: dict[str, Any], filters: dict[str, Any]) -> dict[str, Any]:
+async def update(
+    table: str, data: dict[str, Any], filters: dict[str, Any], database: str | None = None
+) -> dict[str, Any]:
     """
     更新数据库中已存在的记录。
 
@@ -108,48 +216,113 @@ async def update(table: str, data: dict[str, Any], filters: dict[str, Any]) -> d
         table: 表/集合/键前缀名
         data: 要更新的字段和值
         filters: 更新条件（限定更新范围）
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
 
     Returns:
         包含 success、updated_count 的字典
     """
-    await ensure_connected()
-    adapter = get_adapter()
     try:
-        result: UpdateResult = await adapter.update(table, data, filters)
+        async with use_adapter(database, "update", table) as adapter:
+            with _invalidating(database, [table]):
+                result: UpdateResult = await adapter.update(table, data, filters)
         return {
             "success": result.success,
             "updated_count": result.updated_count,
         }
     except DatabaseError as e:
-        return {"success": False, "error": {"type": "query_error", "message": str(e)}}
+        return _error_response(e)
+
+
+@mcp.tool()
+async def upsert(
+    table: str,
+    rows: dict[str, Any] | list[dict[str, Any]],
+    key_fields: list[str],
+    database: str | None = None,
+) -> dict[str, Any]:
+    """
+    插入或更新记录（按 key_fields 匹配，已存在则更新，否则插入）。
+
+    Args:
+        table: 表/集合/键前缀名
+        rows: 要写入的数据（对象或数组）
+        key_fields: 用于匹配已有记录的字段（SQL 数据库需有主键或唯一约束）
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
+
+    Returns:
+        包含 success、upserted_count 的字典
+    """
+    try:
+        async with use_adapter(database, "upsert", table) as adapter:
+            with _invalidating(database, [table]):
+                result: UpsertResult = await adapter.upsert(table, rows, key_fields)
+        return {
+            "success": result.success,
+            "upserted_count": result.upserted_count,
+        }
+    except DatabaseError as e:
+        return _error_response(e)
 
 
 @mcp.tool()
-async def delete(table: str, filters: dict[str, Any]) -> dict[str, Any]:
+async def bulk_update(
+    table: str, rows: list[dict[str, Any]], key_field: str, database: str | None = None
+) -> dict[str, Any]:
+    """
+    批量更新记录，每条记录按 key_field 定位并更新为各自的值。
+
+    Args:
+        table: 表/集合/键前缀名
+        rows: 要更新的记录数组，每条记录包含 key_field 和要更新的字段
+        key_field: 用于定位记录的字段（如主键 id）
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
+
+    Returns:
+        包含 success、updated_count 的字典
+    """
+    try:
+        async with use_adapter(database, "bulk_update", table) as adapter:
+            with _invalidating(database, [table]):
+                result: UpdateResult = await adapter.bulk_update(table, rows, key_field)
+        return {
+            "success": result.success,
+            "updated_count": result.updated_count,
+        }
+    except DatabaseError as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+async def delete(
+    table: str, filters: dict[str, Any], database: str | None = None
+) -> dict[str, Any]:
     """
     从数据库删除记录。
 
     Args:
         table: 表/集合/键前缀名
         filters: 删除条件（限定删除范围）
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
 
     Returns:
         包含 success、deleted_count 的字典
     """
-    await ensure_connected()
-    adapter = get_adapter()
     try:
-        result: DeleteResult = await adapter.delete(table, filters)
+        async with use_adapter(database, "delete", table) as adapter:
+            with _invalidating(database, [table]):
+                result: DeleteResult = await adapter.delete(table, filters)
         return {
             "success": result.success,
             "deleted_count": result.deleted_count,
         }
     except DatabaseError as e:
-        return {"success": False, "error": {"type": "query_error", "message": str(e)}}
+        return _error_response(e)
 
 
 @mcp.tool()
-async def advanced(table: str, operation: str, params: dict[str, Any]) -> dict[str, Any]:
+async def advanced(
+    table: str, operation: str, params: dict[str, Any], database: str | None = None
+) -> dict[str, Any]:
     """
     执行高级操作，如聚合查询、事务等。
 
@@ -157,57 +330,262 @@ async def advanced(table: str, operation: str, params: dict[str, Any]) -> dict[s
         table: 表/集合名
         operation: 操作类型，如 aggregate、transaction
         params: 操作参数
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
 
     Returns:
         包含 success、operation、data 的字典
     """
-    await ensure_connected()
-    adapter = get_adapter()
+
+    async def run() -> AdvancedResult:
+        async with use_adapter(database, "advanced", table) as adapter:
+            result: AdvancedResult = await adapter.advanced_query(operation, params)
+        return result
+
     try:
-        result: AdvancedResult = await adapter.advanced_query(operation, params)
+        if operation in READ_ONLY_OPERATIONS:
+            result = await _coalesced(database, table, ("advanced", table, operation, params), run)
+        else:
+            # 事务等操作可能修改任意表，清空全部缓存
+            with _invalidating(database):
+                result = await run()
         return {
             "success": result.success,
             "operation": result.operation,
             "data": result.data,
         }
     except DatabaseError as e:
-        return {"success": False, "error": {"type": "query_error", "message": str(e)}}
+        return _error_response(e)
 
 
 @mcp.tool()
-async def execute(query: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+async def execute(
+    query: str, params: dict[str, Any] | None = None, database: str | None = None
+) -> dict[str, Any]:
     """
     执行任意原生查询语句。此工具默认禁用，需设置 DANGEROUS_AGREE=true 才会生效。
 
     Args:
         query: 原生 SQL/MongoDB 查询语句
         params: 查询参数（用于参数化查询）
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
 
     Returns:
         包含 success、rows_affected、data 的字典
     """
-    await ensure_connected()
-    adapter = get_adapter()
     try:
-        result: ExecuteResult = await adapter.execute(query, params)
+        async with use_adapter(database, "execute") as adapter:
+            # 原生语句可能修改任意表，清空全部缓存
+            with _invalidating(database):
+                result: ExecuteResult = await adapter.execute(query, params)
         return {
             "success": result.success,
             "rows_affected": result.rows_affected,
             "data": result.data,
         }
     except DatabaseError as e:
-        return {"success": False, "error": {"type": "query_error", "message": str(e)}}
+        return _error_response(e)
+
+
+# batch 工具支持的操作类型
+BATCH_OPERATIONS = ("insert", "query", "update", "delete")
+
+
+def _written_tables(operations: list[dict[str, Any]]) -> set[str]:
+    """批量操作中被写入的表"""
+    return {
+        str(op.get("table", ""))
+        for op in operations
+        if isinstance(op, dict) and op.get("type") != "query"
+    }
+
+
+def _operation_lanes(operations: list[Any]) -> list[list[int]]:
+    """
+    将非原子批量操作分为可以并发执行的队列
+
+    同一张表上有写操作时，该表的所有操作放在一个队列中按提交顺序串行执行；
+    只读的表和不同的表之间并发执行。格式错误的操作各自单独成队列。
+
+    Args:
+        operations: 操作列表
+
+    Returns:
+        list[list[int]]: 每个队列中按顺序执行的操作下标
+    """
+    lanes: list[list[int]] = []
+    by_table: dict[str, list[int]] = {}
+    for index, op in enumerate(operations):
+        if isinstance(op, dict) and isinstance(op.get("table"), str):
+            by_table.setdefault(op["table"], []).append(index)
+        else:
+            lanes.append([index])
+
+    for indexes in by_table.values():
+        if any(operations[index].get("type") != "query" for index in indexes):
+            lanes.append(indexes)
+        else:
+            lanes.extend([index] for index in indexes)
+    return lanes
+
+
+def _validate_operation(op: Any) -> None:
+    """
+    校验单个批量操作
 
+    Args:
+        op: 操作
 
-def create_server(database_url: str) -> FastMCP:
+    Raises:
+        QueryError: 操作格式错误、类型不支持或 update / delete 缺少过滤条件时抛出
+    """
+    if not isinstance(op, dict):
+        raise QueryError(f"Batch operation must be an object, got {op!r}")
+
+    op_type = op.get("type")
+    if op_type not in BATCH_OPERATIONS:
+        raise QueryError(
+            f"Unsupported batch operation type: {op_type}. "
+            f"Supported types: {', '.join(BATCH_OPERATIONS)}"
+        )
+    if not isinstance(op.get("table"), str) or not op["table"]:
+        raise QueryError(f"Batch {op_type} operation requires a table")
+    # 与独立的 update / delete 工具一致，必须提供过滤条件，避免误改整张表
+    if op_type in ("update", "delete") and (
+        not isinstance(op.get("filters"), dict) or not op["filters"]
+    ):
+        raise QueryError(f"Batch {op_type} operation requires filters")
+
+
+async def _run_operation(adapter: Any, op: dict[str, Any]) -> dict[str, Any]:
+    """执行单个批量操作，错误记录在该操作的结果中"""
+    try:
+        _validate_operation(op)
+        op_type = op["type"]
+        table = op["table"]
+        result: InsertResult | QueryResult | UpdateResult | DeleteResult
+        if op_type == "insert":
+            result = await adapter.insert(table, op.get("data", []))
+        elif op_type == "query":
+            options = _query_options(op.get("offset"), op.get("order_by"), op.get("fields"))
+            result = await adapter.query(table, op.get("filters"), op.get("limit"), **options)
+        elif op_type == "update":
+            result = await adapter.update(table, op.get("data", {}), op["filters"])
+        else:
+            result = await adapter.delete(table, op["filters"])
+        return result.model_dump()
+    except DatabaseError as e:
+        return _error_response(e)
+    except Exception as e:
+        # 非数据库错误（如参数类型错误）同样只影响当前操作
+        logger.exception("Batch operation failed: %r", op)
+        return _error_response(QueryError(f"Batch operation failed: {e}"))
+
+
+async def _run_admitted(database: str | None, adapter: Any, op: Any) -> dict[str, Any]:
+    """占用一个准入名额（按操作的表计数）后执行单个非原子批量操作"""
+    table = op.get("table") if isinstance(op, dict) else None
+    try:
+        async with _registry.limit(database, "batch", table if isinstance(table, str) else None):
+            return await _run_operation(adapter, op)
+    except DatabaseError as e:
+        # 排队已满或排队超时只影响当前操作
+        return _error_response(e)
+
+
+@mcp.tool()
+async def batch(
+    operations: list[dict[str, Any]], atomic: bool = False, database: str | None = None
+) -> dict[str, Any]:
+    """
+    在一次调用中批量执行多个增删改查操作。
+
+    非原子模式下不同表的操作按连接池大小限制并发执行，每个操作单独经过准入控制（按表计数），
+    同一张表上有写操作时该表的操作按提交顺序执行，单个操作失败不影响其他操作；
+    原子模式下所有操作在同一事务中按顺序执行（仅 SQL 和 MongoDB 支持），任一失败则整体回滚。
+
+    Args:
+        operations: 操作列表，每项包含 type（insert/query/update/delete）、table，
+            以及 data、filters、limit、offset、order_by、fields 等对应参数
+        atomic: 是否在单个事务中执行所有操作
+        database: 数据库名称（可选，多数据库模式下使用，默认使用默认数据库）
+
+    Returns:
+        包含 success、failed、results 的字典，results 与 operations 一一对应
+    """
+    try:
+        if atomic:
+            # 原子模式在单个事务（单个连接）中执行，只占用一个名额
+            async with use_adapter(database, "batch") as adapter:
+                for op in operations:
+                    _validate_operation(op)
+                with _invalidating(database, _written_tables(operations)):
+                    result: AdvancedResult = await adapter.advanced_query(
+                        "batch", {"operations": operations}
+                    )
+            results = result.data["results"]
+        else:
+            await ensure_connected(database)
+            adapter = get_adapter(database)
+            results = [{} for _ in operations]
+            lanes = iter(_operation_lanes(operations))
+
+            async def worker() -> None:
+                # 各 worker 依次领取队列，每个操作单独经过准入控制
+                for lane in lanes:
+                    for index in lane:
+                        results[index] = await _run_admitted(database, adapter, operations[index])
+
+            workers = min(_registry.resolve(database).config.pool_size, len(operations))
+            with _invalidating(database, _written_tables(operations)):
+                await asyncio.gather(*(worker() for _ in range(workers)))
+
+        failed = sum(1 for item in results if not item.get("success", True))
+        return {"success": failed == 0, "failed": failed, "results": list(results)}
+    except DatabaseError as e:
+        return _error_response(e)
+
+
+@mcp.tool()
+async def metrics() -> dict[str, Any]:
+    """
+    获取服务运行指标。
+
+    Returns:
+        包含 operations（按数据库类型、操作、表的耗时分位数、行数和错误数）、
+        pool_wait（连接池等待时间）和 databases（准入控制、缓存、请求合并统计）的字典
+    """
+    return {"success": True, **get_metrics().snapshot(), "databases": _registry.stats()}
+
+
+def create_server(
+    database_url: str | None = None,
+    *,
+    registry: AdapterRegistry | None = None,
+    warmup: bool = False,
+) -> FastMCP:
     """
     创建 MCP Database Server 实例。
 
     Args:
-        database_url: 数据库连接 URL
+        database_url: 数据库连接 URL（单数据库模式）
+        registry: 多数据库注册表（多数据库模式，与 database_url 二选一）
+        warmup: 是否在后台预先连接所有数据库（需在运行中的事件循环内调用）
 
     Returns:
         配置好的 FastMCP 服务器实例
+
+    Raises:
+        ValueError: 未提供 database_url 或 registry 时抛出
     """
-    set_database_url(database_url)
+    global _warmup_task
+
+    if registry is not None:
+        set_registry(registry)
+    elif database_url:
+        set_database_url(database_url)
+    else:
+        raise ValueError("Either database_url or registry must be provided")
+
+    if warmup:
+        _warmup_task = asyncio.get_running_loop().create_task(_registry.warmup())
     return mcp
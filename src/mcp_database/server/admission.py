@@ -0,0 +1,239 @@
+"""工具调用准入控制"""
+
+import asyncio
+import itertools
+from collections import Counter
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from mcp_database.core.exceptions import OverloadedError
+
+# 工具优先级（数值越小越优先），廉价的 CRUD 操作优先于 advanced/execute
+TOOL_PRIORITIES = {
+    "query": 0,
+    "insert": 0,
+    "update": 0,
+    "upsert": 0,
+    "bulk_update": 0,
+    "delete": 0,
+    "batch": 1,
+    "advanced": 2,
+    "execute": 2,
+}
+
+# 未知工具的默认优先级
+DEFAULT_PRIORITY = 1
+
+
+@dataclass(order=True)
+class _Waiter:
+    """排队等待准入的请求"""
+
+    priority: int
+    seq: int
+    tool: str = field(compare=False)
+    table: str | None = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    """
+    按数据库的工具调用准入控制
+
+    同时限制总并发数、每个工具的并发数和每张表的并发数。超出限制的请求进入有界等待队列，
+    按工具优先级（同优先级先到先得）在名额释放时准入；队列已满或等待超时时立即抛出
+    OverloadedError，使过载时延迟平滑上升，而不是在连接池上大量排队后集中超时。
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int | None = None,
+        max_queue: int | None = 100,
+        queue_timeout: float | None = None,
+        tool_limits: dict[str, int] | None = None,
+        table_limits: dict[str, int] | None = None,
+        default_table_limit: int | None = None,
+    ):
+        """
+        初始化准入控制
+
+        Args:
+            max_concurrent: 总并发上限，为 None 时不限制
+            max_queue: 等待队列长度上限，超出时立即拒绝，为 None 时不限制
+            queue_timeout: 单个请求的最长排队时间（秒），为 None 时一直等待
+            tool_limits: 每个工具的并发上限，如 {"execute": 1, "advanced": 2}
+            table_limits: 指定表的并发上限
+            default_table_limit: 未在 table_limits 中列出的表的并发上限
+        """
+        self._max_concurrent = max_concurrent
+        self._max_queue = max_queue
+        self._queue_timeout = queue_timeout
+        self._tool_limits = dict(tool_limits or {})
+        self._table_limits = dict(table_limits or {})
+        self._default_table_limit = default_table_limit
+        self._active = 0
+        self._active_tools: Counter[str] = Counter()
+        self._active_tables: Counter[str] = Counter()
+        self._waiters: list[_Waiter] = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def max_concurrent(self) -> int | None:
+        """总并发上限"""
+        return self._max_concurrent
+
+    @property
+    def active(self) -> int:
+        """当前执行中的请求数"""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """当前排队中的请求数"""
+        return len(self._waiters)
+
+    def _table_limit(self, table: str | None) -> int | None:
+        """表的并发上限"""
+        if table is None:
+            return None
+        return self._table_limits.get(table, self._default_table_limit)
+
+    def _can_admit(self, tool: str, table: str | None) -> bool:
+        """检查请求是否满足所有并发限制"""
+        if self._max_concurrent is not None and self._active >= self._max_concurrent:
+            return False
+        tool_limit = self._tool_limits.get(tool)
+        if tool_limit is not None and self._active_tools[tool] >= tool_limit:
+            return False
+        if table is not None:
+            table_limit = self._table_limit(table)
+            if table_limit is not None and self._active_tables[table] >= table_limit:
+                return False
+        return True
+
+    def _take(self, tool: str, table: str | None) -> None:
+        """占用名额"""
+        self._active += 1
+        self._active_tools[tool] += 1
+        if table is not None:
+            self._active_tables[table] += 1
+        self.admitted += 1
+
+    def _release(self, tool: str, table: str | None) -> None:
+        """释放名额并唤醒可准入的等待者"""
+        self._active -= 1
+        self._active_tools[tool] -= 1
+        if table is not None:
+            self._active_tables[table] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """按优先级准入满足限制的等待者（被其他限制阻塞的等待者不阻塞后续请求）"""
+        remaining = []
+        for waiter in sorted(self._waiters):
+            if waiter.future.done():
+                continue
+            if self._can_admit(waiter.tool, waiter.table):
+                self._take(waiter.tool, waiter.table)
+                waiter.future.set_result(None)
+            else:
+                remaining.append(waiter)
+        self._waiters = remaining
+
+    async def acquire(self, tool: str, table: str | None = None) -> None:
+        """
+        获取执行名额
+
+        Args:
+            tool: 工具名称
+            table: 表名（可选）
+
+        Raises:
+            OverloadedError: 等待队列已满或排队超时时抛出
+        """
+        if not self._waiters and self._can_admit(tool, table):
+            self._take(tool, table)
+            return
+
+        if self._max_queue is not None and len(self._waiters) >= self._max_queue:
+            self.rejected += 1
+            raise OverloadedError(
+                f"Server overloaded: {len(self._waiters)} requests already queued, "
+                f"rejecting '{tool}'. Please retry later."
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        priority = TOOL_PRIORITIES.get(tool, DEFAULT_PRIORITY)
+        self._waiters.append(_Waiter(priority, next(self._seq), tool, table, future))
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, self._queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise OverloadedError(
+                f"Server overloaded: '{tool}' waited more than {self._queue_timeout}s "
+                f"for admission. Please retry later."
+            ) from None
+        except asyncio.CancelledError:
+            # 取消与准入同时发生时归还名额
+            if future.done() and not future.cancelled():
+                self._release(tool, table)
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                self._waiters = [w for w in self._waiters if w.future is not future]
+
+    @asynccontextmanager
+    async def admit(self, tool: str, table: str | None = None) -> AsyncIterator[None]:
+        """
+        在准入名额内执行
+
+        Args:
+            tool: 工具名称
+            table: 表名（可选）
+
+        Raises:
+            OverloadedError: 等待队列已满或排队超时时抛出
+        """
+        await self.acquire(tool, table)
+        try:
+            yield
+        finally:
+            self._release(tool, table)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        获取准入统计信息
+
+        Returns:
+            包含 active、queued、admitted、rejected 字段的字典
+        """
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], **defaults: Any) -> "AdmissionController":
+        """
+        从配置字典创建准入控制
+
+        配置格式：
+            {"max_concurrent": 15, "max_queue": 100, "queue_timeout": 5,
+             "tool_limits": {"execute": 1}, "table_limits": {"events": 2}}
+
+        Args:
+            data: 配置字典
+            defaults: 配置中未指定的参数默认值
+
+        Returns:
+            AdmissionController: 准入控制
+        """
+        return cls(**{**defaults, **data})
@@ -0,0 +1,224 @@
+"""查询结果缓存"""
+
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from mcp_database.core.models import QueryResult
+
+# 缓存所有表的通配符
+ALL_TABLES = "*"
+
+
+@dataclass
+class _CacheEntry:
+    """缓存条目"""
+
+    table: str
+    result: QueryResult
+    size: int
+    expires_at: float
+
+
+class QueryCache:
+    """
+    进程内查询结果缓存（TTL + LRU）
+
+    以规范化的 (table, filters, limit) 为键缓存 query 结果，只缓存显式启用的表。
+    通过本服务执行的写操作会使对应表的缓存失效；每张表维护一个版本号，
+    查询期间发生写操作时丢弃该查询结果，避免把过期数据写回缓存。
+    """
+
+    def __init__(
+        self,
+        tables: Iterable[str] = (ALL_TABLES,),
+        ttl: float = 30.0,
+        max_entries: int = 1024,
+        max_bytes: int = 16 * 1024 * 1024,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            tables: 启用缓存的表名，"*" 表示所有表
+            ttl: 缓存有效期（秒）
+            max_entries: 最大缓存条目数
+            max_bytes: 缓存结果的内存预算（按 JSON 序列化大小估算，字节）
+        """
+        self._tables = frozenset(tables)
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+        table: str,
+        filters: dict[str, Any] | None,
+        limit: int | None,
+        options: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        生成规范化缓存键（过滤条件按键排序）
+
+        Args:
+            table: 表名
+            filters: 过滤条件
+            limit: 返回数量限制
+            options: 其他查询参数（offset、order_by、fields，可选）
+
+        Returns:
+            缓存键
+        """
+        parts = [table, filters or {}, limit]
+        if options:
+            parts.append(options)
+        return json.dumps(parts, sort_keys=True, default=str)
+
+    def enabled_for(self, table: str) -> bool:
+        """表是否启用缓存"""
+        return ALL_TABLES in self._tables or table in self._tables
+
+    def version(self, table: str) -> tuple[int, int]:
+        """表的当前版本号（全局清空或该表失效时变化）"""
+        return self._epoch, self._versions.get(table, 0)
+
+    def get(self, key: str, now: float | None = None) -> QueryResult | None:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+            now: 当前时间（time.monotonic()，用于测试）
+
+        Returns:
+            缓存的查询结果，未命中或已过期时返回 None
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic() if now is None else now
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.result
+
+    def put(
+        self,
+        key: str,
+        table: str,
+        result: QueryResult,
+        version: tuple[int, int],
+        now: float | None = None,
+    ) -> bool:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            table: 表名
+            result: 查询结果
+            version: 查询开始前读取的表版本号
+            now: 当前时间（time.monotonic()，用于测试）
+
+        Returns:
+            是否写入成功（表已失效或结果超出内存预算时不写入）
+        """
+        if version != self.version(table):
+            return False
+
+        size = len(json.dumps(result.data, default=str))
+        if size > self._max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        now = time.monotonic() if now is None else now
+        self._entries[key] = _CacheEntry(table, result, size, now + self._ttl)
+        self._bytes += size
+
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def invalidate(self, table: str | None = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            table: 表名，为 None 时清空所有缓存
+
+        Returns:
+            被移除的条目数
+        """
+        if table is None:
+            keys = list(self._entries)
+            self._epoch += 1
+        else:
+            keys = [key for key, entry in self._entries.items() if entry.table == table]
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def _remove(self, key: str) -> None:
+        """移除缓存条目"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    @property
+    def hit_rate(self) -> float:
+        """缓存命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            包含 hits、misses、hit_rate、entries、bytes 等字段的字典
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "QueryCache":
+        """
+        从配置字典创建缓存
+
+        配置格式：
+            {"tables": ["users", "products"], "ttl": 30, "max_entries": 1024, "max_bytes": 16777216}
+
+        Args:
+            data: 配置字典
+
+        Returns:
+            QueryCache: 查询缓存
+        """
+        return cls(**data)
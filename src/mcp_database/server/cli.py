@@ -8,6 +8,8 @@ import os
 from mcp.server.stdio import stdio_server
 
 from mcp_database.server import create_server
+from mcp_database.server.registry import AdapterRegistry
+from mcp_database.utils.metrics import start_http_exporter
 
 
 async def main() -> None:
@@ -18,12 +20,37 @@ async def main() -> None:
         default=os.environ.get("DATABASE_URL"),
         help="数据库连接 URL（默认从 DATABASE_URL 环境变量读取）",
     )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=os.environ.get("MCP_DATABASES_FILE"),
+        help="多数据库 JSON 配置文件路径（默认从 MCP_DATABASES_FILE 环境变量读取）",
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        default=os.environ.get("MCP_WARMUP", "").lower() == "true",
+        help="启动时预先连接数据库（默认从 MCP_WARMUP 环境变量读取）",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=int(os.environ["MCP_METRICS_PORT"]) if os.environ.get("MCP_METRICS_PORT") else None,
+        help="Prometheus 指标 HTTP 端口（仅监听本机，默认从 MCP_METRICS_PORT 环境变量读取）",
+    )
     args = parser.parse_args()
 
-    if not args.database_url:
-        parser.error("必须指定 --database-url 或设置 DATABASE_URL 环境变量")
+    registry = AdapterRegistry.from_file(args.config) if args.config else None
+    if registry is None and not args.database_url:
+        registry = AdapterRegistry.from_env()
+
+    if registry is None and not args.database_url:
+        parser.error("必须指定 --database-url、--config 或设置 DATABASE_URL 环境变量")
+
+    if args.metrics_port is not None:
+        start_http_exporter(args.metrics_port)
 
-    server = create_server(args.database_url)
+    server = create_server(args.database_url, registry=registry, warmup=args.warmup)
     async with stdio_server() as (read_stream, write_stream):
         await server.run(read_stream, write_stream)
 
@@ -0,0 +1,96 @@
+"""相同请求合并（single-flight）"""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class RequestCoalescer:
+    """
+    合并进行中的相同只读请求
+
+    同一键的请求在第一个请求完成前到达时，共享第一个请求的数据库往返结果，
+    异常同样传递给所有等待者。共享请求运行在独立任务中，单个调用方被取消
+    不会影响其他等待者。
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, tuple[str, asyncio.Future[Any]]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        生成规范化请求键（字典按键排序）
+
+        Args:
+            parts: 请求的组成部分（操作、表名、参数等）
+
+        Returns:
+            请求键
+        """
+        return json.dumps(parts, sort_keys=True, default=str)
+
+    async def run(self, key: str, table: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行请求，存在相同的进行中请求时等待其结果
+
+        Args:
+            key: 请求键
+            table: 请求涉及的表（用于写操作后丢弃进行中的请求）
+            factory: 创建实际请求的函数
+
+        Returns:
+            请求结果
+        """
+        task: asyncio.Future[T]
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = (table, task)
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.leaders += 1
+        else:
+            task = inflight[1]
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: asyncio.Future[Any]) -> None:
+        """请求完成后移除，并取出异常避免所有等待者都已取消时产生未处理异常警告"""
+        if self._inflight.get(key, (None, None))[1] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def forget(self, table: str | None = None) -> None:
+        """
+        丢弃进行中的请求，之后到达的相同请求会重新访问数据库
+
+        写操作完成后调用，避免写入之后的读请求合并到写入之前发起的请求上。
+        已在等待的调用方仍会收到原请求的结果。
+
+        Args:
+            table: 表名，为 None 时丢弃所有进行中的请求
+        """
+        if table is None:
+            self._inflight.clear()
+            return
+        for key in [k for k, (t, _) in self._inflight.items() if t == table]:
+            del self._inflight[key]
+
+    def stats(self) -> dict[str, Any]:
+        """
+        获取合并统计信息
+
+        Returns:
+            包含 leaders、coalesced、inflight 字段的字典
+        """
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
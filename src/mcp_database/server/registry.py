@@ -0,0 +1,507 @@
+"""多数据库适配器注册表"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from mcp_database.adapters import AdapterFactory
+from mcp_database.core.adapter import DatabaseAdapter
+from mcp_database.core.exceptions import ConnectionError, DatabaseError, QueryError, TimeoutError
+from mcp_database.core.models import DatabaseConfig
+from mcp_database.server.admission import AdmissionController
+from mcp_database.server.cache import QueryCache
+from mcp_database.server.coalescing import RequestCoalescer
+
+logger = logging.getLogger(__name__)
+
+# 未指定名称时使用的数据库名
+DEFAULT_DATABASE = "default"
+
+# 瞬时连接错误的类名（网络不可达、超时等，可以重试）
+# 数据库驱动是可选依赖，因此按类名匹配而不导入驱动
+_TRANSIENT_ERROR_NAMES = frozenset(
+    {
+        "OSError",  # 包括内置 ConnectionError、TimeoutError、socket 错误
+        "ConnectionError",  # redis、opensearch-py
+        "TimeoutError",  # redis
+        "ConnectionTimeout",  # opensearch-py
+        "ConnectionFailure",  # pymongo（AutoReconnect、ServerSelectionTimeoutError）
+        "TransportError",  # httpx（ConnectError、TimeoutException）
+    }
+)
+
+# 认证和配置错误的类名，重试不会成功，直接抛出
+_PERMANENT_ERROR_NAMES = frozenset(
+    {
+        "PermissionError",
+        "AuthenticationError",  # redis（继承自 redis ConnectionError）
+        "AuthenticationException",  # opensearch-py
+        "AuthorizationException",  # opensearch-py
+        "InvalidPasswordError",  # asyncpg
+        "InvalidAuthorizationSpecificationError",  # asyncpg
+        "OperationFailure",  # pymongo（认证失败）
+        "ConfigurationError",  # pymongo
+        "InvalidURI",  # pymongo
+        "ArgumentError",  # sqlalchemy（URL 格式错误）
+    }
+)
+
+
+@dataclass
+class DatabaseEntry:
+    """注册表中的单个数据库"""
+
+    name: str
+    config: DatabaseConfig
+    max_concurrency: int | None = None
+    adapter: DatabaseAdapter | None = None
+    last_used: float = 0.0
+    in_use: int = 0
+    cache: QueryCache | None = None
+    coalescer: RequestCoalescer | None = field(default_factory=RequestCoalescer, repr=False)
+    admission: AdmissionController = field(default_factory=AdmissionController, repr=False)
+    connect_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+
+def _error_chain(error: BaseException) -> list[BaseException]:
+    """异常及其直接原因（__cause__、__context__ 和转换前的 original_error）"""
+    causes = (error.__cause__, error.__context__, getattr(error, "original_error", None))
+    return [cause for cause in causes if isinstance(cause, BaseException) and cause is not error]
+
+
+def _is_transient(error: BaseException) -> bool:
+    """
+    判断连接失败是否为可重试的瞬时错误
+
+    适配器把驱动异常包装为 ConnectionError，因此沿异常链判断：链上任一异常是
+    认证或配置错误时不重试；否则链上存在网络或超时错误时重试。没有原因的
+    ConnectionError / TimeoutError 视为瞬时错误。
+
+    Args:
+        error: 连接失败时抛出的异常
+
+    Returns:
+        是否应该重试
+    """
+    seen: set[int] = set()
+    pending, chain = [error], []
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        chain.append(current)
+        pending.extend(_error_chain(current))
+
+    for current in chain:
+        names = {cls.__name__ for cls in type(current).__mro__}
+        if names & _PERMANENT_ERROR_NAMES:
+            return False
+
+    for current in chain:
+        if isinstance(current, DatabaseError):
+            # 包装异常以原因为准，只有没有原因时才按自身类型判断
+            if not _error_chain(current) and isinstance(current, (ConnectionError, TimeoutError)):
+                return True
+        elif {cls.__name__ for cls in type(current).__mro__} & _TRANSIENT_ERROR_NAMES:
+            return True
+    return False
+
+
+def default_concurrency(config: DatabaseConfig, max_concurrency: int | None = None) -> int:
+    """配置了准入控制时的总并发上限，未指定时不超过连接池容量，避免请求在连接池上排队等待超时"""
+    return max_concurrency or config.pool_size + config.max_overflow
+
+
+class AdapterRegistry:
+    """
+    命名数据库适配器注册表
+
+    适配器在首次使用时创建并连接，空闲超过 idle_timeout 秒后断开释放，
+    每个数据库可通过 max_concurrency 限制并发操作数，或配置准入控制按工具和表
+    进一步限制并在过载时拒绝请求；两者都未配置时不限制并发。
+    同一数据库的并发连接请求只会触发一次 connect()，失败时按抖动退避重试。
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float | None = None,
+        connect_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 5.0,
+    ):
+        """
+        初始化注册表
+
+        Args:
+            idle_timeout: 空闲连接回收时间（秒），为 None 时不回收
+            connect_retries: 连接失败后的重试次数
+            retry_backoff: 重试退避基准时间（秒），每次重试翻倍
+            max_backoff: 单次重试的最大退避时间（秒）
+        """
+        self._entries: dict[str, DatabaseEntry] = {}
+        self._default: str | None = None
+        self._idle_timeout = idle_timeout
+        self._connect_retries = connect_retries
+        self._retry_backoff = retry_backoff
+        self._max_backoff = max_backoff
+        self._last_sweep = time.monotonic()
+
+    @property
+    def names(self) -> list[str]:
+        """已注册的数据库名称"""
+        return list(self._entries)
+
+    @property
+    def default(self) -> str | None:
+        """默认数据库名称"""
+        return self._default
+
+    def register(
+        self,
+        name: str,
+        config: DatabaseConfig,
+        *,
+        max_concurrency: int | None = None,
+        cache: QueryCache | None = None,
+        coalesce: bool = True,
+        admission: AdmissionController | None = None,
+        default: bool = False,
+    ) -> None:
+        """
+        注册数据库
+
+        Args:
+            name: 数据库名称
+            config: 数据库配置
+            max_concurrency: 最大并发操作数（可选，默认不限制）
+            cache: 查询结果缓存（可选）
+            coalesce: 是否合并进行中的相同只读请求
+            admission: 准入控制（可选，默认只按 max_concurrency 限制总并发数）
+            default: 是否设为默认数据库（第一个注册的数据库自动成为默认）
+        """
+        self._entries[name] = DatabaseEntry(
+            name=name,
+            config=config,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            coalescer=RequestCoalescer() if coalesce else None,
+            # 只指定 max_concurrency 时超出的请求一直排队等待，不拒绝
+            admission=admission
+            or AdmissionController(max_concurrent=max_concurrency, max_queue=None),
+        )
+        if default or self._default is None:
+            self._default = name
+
+    def clear(self) -> None:
+        """清空注册表（不断开已有连接）"""
+        self._entries.clear()
+        self._default = None
+
+    def resolve(self, name: str | None = None) -> DatabaseEntry:
+        """
+        查找数据库
+
+        Args:
+            name: 数据库名称，为 None 时使用默认数据库
+
+        Returns:
+            DatabaseEntry: 数据库条目
+
+        Raises:
+            QueryError: 数据库未注册时抛出
+        """
+        key = name if name is not None else self._default
+        if key is None or key not in self._entries:
+            available = ", ".join(self._entries) or "none"
+            raise QueryError(f"Unknown database: {name}. Available databases: {available}")
+        return self._entries[key]
+
+    def get_adapter(self, name: str | None = None) -> DatabaseAdapter:
+        """
+        获取数据库适配器，首次调用时创建
+
+        Args:
+            name: 数据库名称，为 None 时使用默认数据库
+
+        Returns:
+            DatabaseAdapter: 数据库适配器
+        """
+        entry = self.resolve(name)
+        if entry.adapter is None:
+            entry.adapter = AdapterFactory.create_adapter(entry.config)
+        return entry.adapter
+
+    async def ensure_connected(self, name: str | None = None) -> DatabaseAdapter:
+        """
+        获取已连接的数据库适配器
+
+        同一数据库的并发调用共享一次连接过程，避免重复创建连接池。
+
+        Args:
+            name: 数据库名称，为 None 时使用默认数据库
+
+        Returns:
+            DatabaseAdapter: 已连接的数据库适配器
+        """
+        entry = self.resolve(name)
+        adapter = self.get_adapter(name)
+        if adapter.is_connected:
+            return adapter
+
+        async with entry.connect_lock:
+            # 等待锁期间其他调用可能已完成连接或适配器已被回收
+            adapter = self.get_adapter(name)
+            if not adapter.is_connected:
+                await self._connect_with_retry(adapter)
+                # 刚建立的连接从此刻开始计算空闲时间，避免预热的连接在首次清理时被回收
+                entry.last_used = time.monotonic()
+        return adapter
+
+    async def _connect_with_retry(self, adapter: DatabaseAdapter) -> None:
+        """
+        连接数据库，瞬时错误（网络不可达、超时）按抖动指数退避重试
+
+        每次失败后先断开适配器，释放失败过程中创建的连接池。
+        认证失败、配置错误等重试无效的错误直接抛出。
+
+        Args:
+            adapter: 数据库适配器
+
+        Raises:
+            DatabaseError: 非瞬时错误或重试次数耗尽后抛出最后一次的连接错误
+        """
+        for attempt in range(self._connect_retries + 1):
+            try:
+                await adapter.connect()
+                return
+            except Exception as e:
+                await adapter.disconnect()
+                if attempt >= self._connect_retries or not _is_transient(e):
+                    raise
+                delay = random.uniform(0, min(self._max_backoff, self._retry_backoff * 2**attempt))
+                logger.warning(
+                    "Connect to %s failed (attempt %d), retrying in %.2fs",
+                    type(adapter).__name__,
+                    attempt + 1,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def warmup(self, names: list[str] | None = None) -> dict[str, bool]:
+        """
+        预先连接数据库
+
+        连接失败只记录日志，之后的首次使用会重新尝试连接。
+
+        Args:
+            names: 要预热的数据库名称，为 None 时预热全部数据库
+
+        Returns:
+            数据库名称到是否连接成功的映射
+        """
+        targets = names if names is not None else self.names
+        results = await asyncio.gather(
+            *(self.ensure_connected(name) for name in targets), return_exceptions=True
+        )
+
+        status = {}
+        for name, result in zip(targets, results):
+            status[name] = not isinstance(result, BaseException)
+            if isinstance(result, BaseException):
+                logger.warning("Warm-up connect to database '%s' failed: %s", name, result)
+        return status
+
+    @asynccontextmanager
+    async def limit(
+        self, name: str | None = None, tool: str = "query", table: str | None = None
+    ) -> AsyncIterator[DatabaseEntry]:
+        """
+        占用数据库的一个并发名额
+
+        Args:
+            name: 数据库名称，为 None 时使用默认数据库
+            tool: 工具名称（用于按工具限流和排队优先级）
+            table: 表名（可选，用于按表限流）
+
+        Yields:
+            DatabaseEntry: 数据库条目
+
+        Raises:
+            OverloadedError: 等待队列已满或排队超时时抛出
+        """
+        await self.evict_idle()
+        entry = self.resolve(name)
+        async with entry.admission.admit(tool, table):
+            entry.in_use += 1
+            try:
+                yield entry
+            finally:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    async def evict_idle(self, now: float | None = None) -> list[str]:
+        """
+        断开空闲超时的数据库连接
+
+        为避免每次调用都遍历注册表，两次清理之间至少间隔 idle_timeout / 2。
+
+        Args:
+            now: 当前时间（time.monotonic()，用于测试）
+
+        Returns:
+            被回收的数据库名称列表
+        """
+        if self._idle_timeout is None:
+            return []
+
+        now = time.monotonic() if now is None else now
+        if now - self._last_sweep < self._idle_timeout / 2:
+            return []
+        self._last_sweep = now
+
+        evicted = []
+        for entry in self._entries.values():
+            if (
+                entry.adapter is not None
+                and entry.in_use == 0
+                and now - entry.last_used > self._idle_timeout
+            ):
+                adapter, entry.adapter = entry.adapter, None
+                await adapter.disconnect()
+                evicted.append(entry.name)
+        return evicted
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        获取每个数据库的服务端统计信息
+
+        Returns:
+            数据库名称到连接状态、准入控制、查询缓存和请求合并统计的映射
+        """
+        return {
+            entry.name: {
+                "connected": entry.adapter is not None and entry.adapter.is_connected,
+                "in_use": entry.in_use,
+                "admission": entry.admission.stats(),
+                "cache": entry.cache.stats() if entry.cache is not None else None,
+                "coalescing": entry.coalescer.stats() if entry.coalescer is not None else None,
+            }
+            for entry in self._entries.values()
+        }
+
+    async def close_all(self) -> None:
+        """断开所有数据库连接"""
+        for entry in self._entries.values():
+            if entry.adapter is not None:
+                adapter, entry.adapter = entry.adapter, None
+                await adapter.disconnect()
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AdapterRegistry":
+        """
+        从配置字典创建注册表
+
+        配置格式：
+            {
+                "default": "main",
+                "idle_timeout": 300,
+                "connect_retries": 3,
+                "databases": {
+                    "main": {
+                        "url": "postgresql+asyncpg://...",
+                        "max_concurrency": 10,
+                        "cache": {"tables": ["products"], "ttl": 30},
+                        "admission": {"max_queue": 100, "tool_limits": {"execute": 1}}
+                    },
+                    "cache": {"url": "redis://localhost:6379/0"}
+                }
+            }
+
+        Args:
+            data: 配置字典
+
+        Returns:
+            AdapterRegistry: 注册表
+
+        Raises:
+            QueryError: 配置不合法时抛出
+        """
+        databases = data.get("databases")
+        if not isinstance(databases, dict) or not databases:
+            raise QueryError("Database registry config requires a non-empty 'databases' mapping")
+
+        registry = cls(
+            idle_timeout=data.get("idle_timeout"),
+            connect_retries=data.get("connect_retries", 3),
+            retry_backoff=data.get("retry_backoff", 0.5),
+        )
+        for name, options in databases.items():
+            options = dict(options)
+            max_concurrency = options.pop("max_concurrency", None)
+            cache = options.pop("cache", None)
+            coalesce = options.pop("coalesce", True)
+            admission = options.pop("admission", None)
+            config = DatabaseConfig(**options)
+            registry.register(
+                name,
+                config,
+                max_concurrency=max_concurrency,
+                cache=QueryCache.from_dict(cache) if cache is not None else None,
+                coalesce=coalesce,
+                admission=AdmissionController.from_dict(
+                    admission, max_concurrent=default_concurrency(config, max_concurrency)
+                )
+                if admission is not None
+                else None,
+            )
+
+        default = data.get("default")
+        if default is not None:
+            registry.resolve(default)
+            registry._default = default
+
+        return registry
+
+    @classmethod
+    def from_file(cls, path: str) -> "AdapterRegistry":
+        """
+        从 JSON 配置文件创建注册表
+
+        Args:
+            path: 配置文件路径
+
+        Returns:
+            AdapterRegistry: 注册表
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_env(cls) -> "AdapterRegistry | None":
+        """
+        从环境变量创建注册表
+
+        优先级：
+        1. MCP_DATABASES_FILE：JSON 配置文件路径
+        2. MCP_DATABASES：JSON 配置字符串
+
+        Returns:
+            AdapterRegistry: 注册表，未配置时返回 None
+        """
+        path = os.getenv("MCP_DATABASES_FILE")
+        if path:
+            return cls.from_file(path)
+
+        raw = os.getenv("MCP_DATABASES")
+        if raw:
+            return cls.from_dict(json.loads(raw))
+
+        return None
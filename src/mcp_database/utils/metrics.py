@@ -0,0 +1,458 @@
+"""操作耗时与计数指标"""
+
+import contextvars
+import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, TypeVar, cast
+
+# 每个 2 的幂区间划分的子桶位数（16 个子桶，相对误差约 6%）
+_SUB_BUCKET_BITS = 4
+
+# 导出的分位数
+QUANTILES = (0.5, 0.9, 0.99)
+
+# 每种数据库类型最多记录的表标签数，超出的表归入 OTHER_TABLE
+MAX_TABLE_LABELS = 200
+
+# 非法表名与超出上限的表使用的标签
+INVALID_TABLE = "<invalid>"
+OTHER_TABLE = "other"
+
+# 可作为标签的表名（允许 schema.table 形式）
+_TABLE_LABEL_RE = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_.]{0,127}$")
+
+# 被装饰的异步适配器方法
+AsyncMethod = TypeVar("AsyncMethod", bound=Callable[..., Awaitable[Any]])
+
+# 当前是否处于已计时的适配器操作中（避免适配器方法互相调用时重复计时）
+_in_operation: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "mcp_database_in_operation", default=False
+)
+
+
+class Histogram:
+    """
+    对数线性分桶直方图（HDR 风格）
+
+    以微秒为单位记录，每个 2 的幂区间再均分为 16 个子桶，
+    内存占用与记录次数无关，分位数相对误差约 6%。
+    """
+
+    __slots__ = ("_buckets", "count", "sum", "min", "max")
+
+    def __init__(self) -> None:
+        self._buckets: dict[int, int] = defaultdict(int)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    @staticmethod
+    def _bucket(micros: int) -> int:
+        """计算微秒值所在的桶编号（编号随数值单调递增）"""
+        shift = max(micros.bit_length() - _SUB_BUCKET_BITS - 1, 0)
+        return (shift << (_SUB_BUCKET_BITS + 1)) | (micros >> shift)
+
+    @staticmethod
+    def _upper_bound(bucket: int) -> float:
+        """桶的上界（秒）"""
+        shift = bucket >> (_SUB_BUCKET_BITS + 1)
+        mantissa = bucket & ((1 << (_SUB_BUCKET_BITS + 1)) - 1)
+        return (((mantissa + 1) << shift) - 1) / 1_000_000
+
+    def record(self, seconds: float) -> None:
+        """
+        记录一次耗时
+
+        Args:
+            seconds: 耗时（秒）
+        """
+        self._buckets[self._bucket(max(int(seconds * 1_000_000), 1))] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """
+        计算分位数
+
+        Args:
+            q: 分位数（0~1）
+
+        Returns:
+            分位数耗时（秒），无记录时返回 0
+        """
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= target:
+                return min(max(self._upper_bound(bucket), self.min), self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, Any]:
+        """获取统计摘要"""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            **{f"p{int(q * 100)}": self.percentile(q) for q in QUANTILES},
+        }
+
+
+class _OperationStats:
+    """单个 (数据库类型, 操作, 表) 的统计"""
+
+    __slots__ = ("latency", "rows", "errors")
+
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.rows = 0
+        self.errors: dict[str, int] = defaultdict(int)
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    按 (数据库类型, 操作, 表) 记录耗时直方图、返回/影响行数和按异常类型分类的错误数，
+    并按数据库类型记录连接池获取连接的等待时间。
+    表名来自调用方输入，非法表名记为 "<invalid>"，每种数据库类型超过
+    MAX_TABLE_LABELS 个表后其余表记为 "other"，以限制指标序列数量。
+    记录在事件循环中进行，导出可能来自 HTTP 线程，因此用锁保护。
+    """
+
+    def __init__(self, max_table_labels: int = MAX_TABLE_LABELS) -> None:
+        self.enabled = True
+        self.max_table_labels = max_table_labels
+        self._lock = threading.Lock()
+        self._operations: dict[tuple[str, str, str], _OperationStats] = {}
+        self._pool_wait: dict[str, Histogram] = {}
+        self._tables: dict[str, set[str]] = defaultdict(set)
+
+    def _table_label(self, db_type: str, table: str) -> str:
+        """将表名归一化为有界的标签值"""
+        if not table:
+            return ""
+        if not _TABLE_LABEL_RE.match(table):
+            return INVALID_TABLE
+        tables = self._tables[db_type]
+        if table in tables:
+            return table
+        if len(tables) >= self.max_table_labels:
+            return OTHER_TABLE
+        tables.add(table)
+        return table
+
+    def _stats(self, db_type: str, operation: str, table: str) -> _OperationStats:
+        """获取或创建操作统计"""
+        key = (db_type, operation, self._table_label(db_type, table))
+        stats = self._operations.get(key)
+        if stats is None:
+            stats = self._operations[key] = _OperationStats()
+        return stats
+
+    def observe(
+        self,
+        db_type: str,
+        operation: str,
+        table: str,
+        seconds: float,
+        rows: int | None = None,
+    ) -> None:
+        """
+        记录一次成功的操作
+
+        Args:
+            db_type: 数据库类型
+            operation: 操作名称
+            table: 表名
+            seconds: 耗时（秒）
+            rows: 返回或影响的行数（可选）
+        """
+        with self._lock:
+            stats = self._stats(db_type, operation, table)
+            stats.latency.record(seconds)
+            if rows:
+                stats.rows += rows
+
+    def record_error(
+        self, db_type: str, operation: str, table: str, error: str, seconds: float
+    ) -> None:
+        """
+        记录一次失败的操作
+
+        Args:
+            db_type: 数据库类型
+            operation: 操作名称
+            table: 表名
+            error: 异常类名（如 QueryError、IntegrityError）
+            seconds: 耗时（秒）
+        """
+        with self._lock:
+            stats = self._stats(db_type, operation, table)
+            stats.latency.record(seconds)
+            stats.errors[error] += 1
+
+    def observe_pool_wait(self, db_type: str, seconds: float) -> None:
+        """
+        记录一次从连接池获取连接的等待时间
+
+        Args:
+            db_type: 数据库类型
+            seconds: 等待时间（秒）
+        """
+        with self._lock:
+            histogram = self._pool_wait.get(db_type)
+            if histogram is None:
+                histogram = self._pool_wait[db_type] = Histogram()
+            histogram.record(seconds)
+
+    def reset(self) -> None:
+        """清空所有指标"""
+        with self._lock:
+            self._operations.clear()
+            self._pool_wait.clear()
+            self._tables.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        获取所有指标的快照
+
+        Returns:
+            包含 operations（按数据库类型、操作、表）和 pool_wait（按数据库类型）的字典
+        """
+        with self._lock:
+            operations = [
+                {
+                    "db_type": db_type,
+                    "operation": operation,
+                    "table": table,
+                    "latency": stats.latency.snapshot(),
+                    "rows": stats.rows,
+                    "errors": dict(stats.errors),
+                }
+                for (db_type, operation, table), stats in sorted(self._operations.items())
+            ]
+            pool_wait = {
+                db_type: histogram.snapshot()
+                for db_type, histogram in sorted(self._pool_wait.items())
+            }
+        return {"operations": operations, "pool_wait": pool_wait}
+
+    def render_prometheus(self) -> str:
+        """
+        以 Prometheus 文本格式导出指标
+
+        Returns:
+            Prometheus 文本格式的指标
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP mcp_database_operation_duration_seconds Adapter operation latency.",
+            "# TYPE mcp_database_operation_duration_seconds summary",
+        ]
+        for item in snapshot["operations"]:
+            labels = _labels(
+                db_type=item["db_type"], operation=item["operation"], table=item["table"]
+            )
+            lines.extend(
+                _summary("mcp_database_operation_duration_seconds", labels, item["latency"])
+            )
+
+        lines += [
+            "# HELP mcp_database_rows_total Rows returned or affected by adapter operations.",
+            "# TYPE mcp_database_rows_total counter",
+        ]
+        for item in snapshot["operations"]:
+            labels = _labels(
+                db_type=item["db_type"], operation=item["operation"], table=item["table"]
+            )
+            lines.append(f"mcp_database_rows_total{{{labels}}} {item['rows']}")
+
+        lines += [
+            "# HELP mcp_database_errors_total Failed adapter operations by error class.",
+            "# TYPE mcp_database_errors_total counter",
+        ]
+        for item in snapshot["operations"]:
+            for error, count in sorted(item["errors"].items()):
+                labels = _labels(
+                    db_type=item["db_type"],
+                    operation=item["operation"],
+                    table=item["table"],
+                    error=error,
+                )
+                lines.append(f"mcp_database_errors_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP mcp_database_pool_wait_seconds Time spent waiting for a pooled connection.",
+            "# TYPE mcp_database_pool_wait_seconds summary",
+        ]
+        for db_type, latency in snapshot["pool_wait"].items():
+            lines.extend(
+                _summary("mcp_database_pool_wait_seconds", _labels(db_type=db_type), latency)
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    """格式化 Prometheus 标签"""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
+
+
+def _summary(name: str, labels: str, latency: dict[str, Any]) -> list[str]:
+    """格式化 Prometheus summary 指标"""
+    lines = [f'{name}{{{labels},quantile="{q}"}} {latency[f"p{int(q * 100)}"]}' for q in QUANTILES]
+    lines.append(f"{name}_sum{{{labels}}} {latency['sum']}")
+    lines.append(f"{name}_count{{{labels}}} {latency['count']}")
+    return lines
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """获取全局指标注册表"""
+    return metrics
+
+
+def _result_rows(result: Any) -> int | None:
+    """从操作结果中提取返回或影响的行数"""
+    for attr in (
+        "inserted_count",
+        "updated_count",
+        "deleted_count",
+        "upserted_count",
+        "rows_affected",
+    ):
+        value = getattr(result, attr, None)
+        if isinstance(value, int):
+            return value
+    data = getattr(result, "data", None)
+    return len(data) if isinstance(data, list) else None
+
+
+def database_type(adapter: Any) -> str:
+    """适配器的数据库类型标签（SQL 适配器区分方言）"""
+    db_type = getattr(adapter, "_database_type", None)
+    if isinstance(db_type, str):
+        return db_type
+    return type(adapter).__name__.removesuffix("Adapter").lower()
+
+
+def timed(operation: str) -> Callable[[AsyncMethod], AsyncMethod]:
+    """
+    记录适配器方法耗时、行数和错误的装饰器
+
+    被装饰方法的第一个位置参数视为表名（execute/advanced_query 除外）。
+    已在计时中的嵌套调用不重复记录。
+
+    Args:
+        operation: 操作名称
+
+    Returns:
+        装饰器函数
+    """
+
+    def decorator(func: AsyncMethod) -> AsyncMethod:
+        @wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not metrics.enabled or _in_operation.get():
+                return await func(self, *args, **kwargs)
+
+            if operation == "advanced_query":
+                params = args[1] if len(args) > 1 else kwargs.get("params") or {}
+                table = params.get("table", "") if isinstance(params, dict) else ""
+            elif operation == "execute":
+                table = ""
+            else:
+                table = args[0] if args else kwargs.get("table", "")
+            if not isinstance(table, str):
+                table = INVALID_TABLE
+
+            token = _in_operation.set(True)
+            start = time.perf_counter()
+            try:
+                result = await func(self, *args, **kwargs)
+            except Exception as e:
+                metrics.record_error(
+                    database_type(self),
+                    operation,
+                    table,
+                    type(e).__name__,
+                    time.perf_counter() - start,
+                )
+                raise
+            finally:
+                _in_operation.reset(token)
+
+            metrics.observe(
+                database_type(self),
+                operation,
+                table,
+                time.perf_counter() - start,
+                _result_rows(result),
+            )
+            return result
+
+        setattr(wrapper, "__metrics_timed__", True)
+        return cast(AsyncMethod, wrapper)
+
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Prometheus 指标 HTTP 处理器"""
+
+    registry: MetricsRegistry = metrics
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # stdio 模式下 stdout 用于 MCP 协议，不输出访问日志
+        pass
+
+
+def start_http_exporter(
+    port: int, host: str = "127.0.0.1", registry: MetricsRegistry | None = None
+) -> ThreadingHTTPServer:
+    """
+    在后台线程启动 Prometheus 指标 HTTP 服务
+
+    Args:
+        port: 监听端口（0 表示随机端口）
+        host: 监听地址，默认仅本机访问
+        registry: 指标注册表，默认使用全局注册表
+
+    Returns:
+        ThreadingHTTPServer: HTTP 服务，调用 shutdown() 停止
+    """
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry or metrics})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, name="mcp-metrics", daemon=True)
+    thread.start()
+    return server
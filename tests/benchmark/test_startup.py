@@ -0,0 +1,59 @@
+"""启动性能基准测试 - 确保 CLI 冷启动不导入数据库驱动"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# 仅在使用对应后端时才应导入的驱动模块
+DRIVER_MODULES = ("sqlalchemy", "motor", "pymongo", "redis", "opensearchpy")
+
+# 冷启动导入耗时上限（秒），留出足够余量避免在慢速机器上误报
+MAX_IMPORT_SECONDS = 5.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+drivers = [m for m in {drivers!r} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "drivers": drivers}}))
+"""
+
+
+def probe_import(module: str) -> dict:
+    """在新进程中导入模块，返回耗时及已导入的驱动"""
+    code = _PROBE.format(module=module, drivers=DRIVER_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestStartupBenchmark:
+    """冷启动基准测试"""
+
+    @pytest.mark.benchmark
+    @pytest.mark.parametrize("module", ["mcp_database", "mcp_database.server.cli"])
+    def test_no_driver_imports_on_startup(self, module):
+        """测试导入包和 CLI 时不导入任何数据库驱动"""
+        result = probe_import(module)
+
+        assert result["drivers"] == []
+        assert result["elapsed"] < MAX_IMPORT_SECONDS
+
+    @pytest.mark.benchmark
+    def test_only_selected_driver_imported(self):
+        """测试创建适配器时只导入所选后端的驱动"""
+        code = (
+            "import sys\n"
+            "from mcp_database import AdapterFactory, DatabaseConfig\n"
+            "AdapterFactory.create_adapter(DatabaseConfig(url='sqlite+aiosqlite:///:memory:'))\n"
+            f"print([m for m in {DRIVER_MODULES!r} if m in sys.modules])\n"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+
+        assert output.strip() == "['sqlalchemy']"
@@ -87,6 +87,22 @@ class TestDatabaseAdapter:
 
         assert hasattr(DatabaseAdapter, "is_connected")
 
+    def test_validate_bulk_update(self):
+        """测试 bulk_update 参数校验"""
+        from mcp_database.core.adapter import DatabaseAdapter
+        from mcp_database.core.exceptions import QueryError
+
+        rows = [{"id": 1, "name": "a"}, {"id": 2}]
+        assert DatabaseAdapter._validate_bulk_update(rows, "id") == [{"id": 1, "name": "a"}]
+
+        for rows, key_field in [
+            ([{"id": 1, "name": "a"}], ""),
+            ([{"name": "a"}], "id"),
+            ([{"id": 1, "name": "a"}, {"id": 1, "name": "b"}], "id"),
+        ]:
+            with pytest.raises(QueryError):
+                DatabaseAdapter._validate_bulk_update(rows, key_field)
+
 
 class TestConcreteAdapter:
     """测试具体适配器实现"""
@@ -301,3 +301,155 @@ class TestMongoDBAdapter:
         # 验证剩余数据
         remaining = await adapter.query("users")
         assert len(remaining.data) == 1
+
+
+class TestMongoDBAggregatePipeline:
+    """测试聚合规格编译为 MongoDB 聚合管道"""
+
+    def test_build_pipeline(self):
+        """测试 $match / $group / $project / $sort / $limit 管道"""
+        from mcp_database.core.aggregation import parse_aggregate
+
+        adapter = MongoDBAdapter(DatabaseConfig(url=DatabaseTestUtils.MONGODB_URL))
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [
+                    {"func": "count"},
+                    {"func": "count_distinct", "field": "user"},
+                    {"func": "sum", "field": "amount", "alias": "total"},
+                ],
+                "filters": {"status": "paid"},
+                "having": {"total__gt": 10},
+                "order_by": ["-total"],
+                "limit": 5,
+            }
+        )
+
+        assert adapter._build_aggregate_pipeline(spec) == [
+            {"$match": {"status": "paid"}},
+            {
+                "$group": {
+                    "_id": {"category": "$category"},
+                    "count": {"$sum": 1},
+                    "count_distinct_user": {"$addToSet": "$user"},
+                    "total": {"$sum": "$amount"},
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "category": "$_id.category",
+                    "count": 1,
+                    "count_distinct_user": {"$size": "$count_distinct_user"},
+                    "total": 1,
+                }
+            },
+            {"$match": {"total": {"$gt": 10}}},
+            {"$sort": {"total": -1}},
+            {"$limit": 5},
+        ]
+
+
+class TestMongoDBBulkWrites:
+    """测试 upsert / bulk_update 的批量写操作"""
+
+    def test_build_upsert_operations(self):
+        """测试每个文档生成一个按 key_fields 匹配的 UpdateOne"""
+        from pymongo import UpdateOne
+
+        record = {"org": "a", "name": "x", "age": 1}
+        operations = MongoDBAdapter._build_upsert_operations([record], ["org", "name"])
+
+        assert operations == [UpdateOne({"org": "a", "name": "x"}, {"$set": record}, upsert=True)]
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_single_bulk_write(self):
+        """测试批量更新通过一次 bulk_write 提交"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        from pymongo import UpdateOne
+
+        adapter = MongoDBAdapter(DatabaseConfig(url=DatabaseTestUtils.MONGODB_URL))
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock(return_value=MagicMock(modified_count=2))
+        adapter._get_collection = MagicMock(return_value=collection)
+
+        result = await adapter.bulk_update(
+            "users", [{"id": 1, "name": "A"}, {"id": 2, "age": 20}], "id"
+        )
+
+        assert result.updated_count == 2
+        collection.bulk_write.assert_awaited_once_with(
+            [
+                UpdateOne({"id": 1}, {"$set": {"name": "A"}}),
+                UpdateOne({"id": 2}, {"$set": {"age": 20}}),
+            ],
+            ordered=False,
+        )
+
+    @pytest.mark.asyncio
+    async def test_chunked_delete_by_id(self):
+        """测试设置 chunk_size 后按 _id 分块删除"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        adapter = MongoDBAdapter(
+            DatabaseConfig(url=DatabaseTestUtils.MONGODB_URL, options={"chunk_size": 2})
+        )
+        batches = [[{"_id": 1}, {"_id": 2}], [{"_id": 3}]]
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.batch_size.return_value = cursor
+        cursor.to_list = AsyncMock(side_effect=batches)
+        cursor.close = AsyncMock()
+        collection = MagicMock()
+        collection.find.return_value = cursor
+        collection.delete_many = AsyncMock(
+            side_effect=[MagicMock(deleted_count=2), MagicMock(deleted_count=1)]
+        )
+        adapter._get_collection = MagicMock(return_value=collection)
+
+        result = await adapter.delete("users", {"status": "old"})
+
+        assert result.deleted_count == 3
+        collection.find.assert_called_once_with({"status": "old"}, {"_id": 1})
+        collection.delete_many.assert_awaited_with(
+            {"$and": [{"status": "old"}, {"_id": {"$in": [3]}}]}
+        )
+        cursor.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_chunked_update_mixed_id_types(self):
+        """测试 _id 类型混杂时分块更新不漏掉文档"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        from bson import ObjectId
+
+        adapter = MongoDBAdapter(
+            DatabaseConfig(url=DatabaseTestUtils.MONGODB_URL, options={"chunk_size": 2})
+        )
+        oid = ObjectId()
+        # 按 BSON 排序：数字 < 字符串 < ObjectId，$gt 游标会在类型边界处漏掉文档
+        batches = [[{"_id": 7}, {"_id": "abc"}], [{"_id": oid}], []]
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.batch_size.return_value = cursor
+        cursor.to_list = AsyncMock(side_effect=batches)
+        cursor.close = AsyncMock()
+        collection = MagicMock()
+        collection.find.return_value = cursor
+        collection.update_many = AsyncMock(
+            side_effect=[MagicMock(modified_count=2), MagicMock(modified_count=1)]
+        )
+        adapter._get_collection = MagicMock(return_value=collection)
+
+        result = await adapter.update("users", {"status": "new"}, {"status": "old"})
+
+        assert result.updated_count == 3
+        collection.find.assert_called_once()
+        applied = [
+            call.args[0]["$and"][1]["_id"]["$in"] for call in collection.update_many.await_args_list
+        ]
+        assert applied == [[7, "abc"], [oid]]
+        cursor.close.assert_awaited_once()
@@ -429,3 +429,206 @@ class TestOpenSearchAdapter:
 
         # 清理
         await self.clear_opensearch_database(adapter, index_name)
+
+
+class TestOpenSearchClientOptions:
+    """测试 OpenSearch 客户端连接参数（无需真实数据库）"""
+
+    def test_single_url_defaults(self):
+        """测试仅配置 url 时使用单节点"""
+        config = DatabaseConfig(url="http://localhost:9200", pool_size=8)
+        kwargs = OpenSearchAdapter(config)._build_client_kwargs()
+
+        assert kwargs["hosts"] == ["http://localhost:9200"]
+        assert kwargs["pool_maxsize"] == 8
+        assert kwargs["http_compress"] is True
+        assert kwargs["sniff_on_connection_fail"] is False
+        assert kwargs["retry_on_timeout"] is False
+        assert "connection_class" not in kwargs
+
+    def test_multi_node_hosts(self):
+        """测试多节点配置启用故障转移"""
+        config = DatabaseConfig(
+            url="http://node1:9200",
+            hosts=["http://node1:9200", "http://node2:9200", "http://node3:9200"],
+        )
+        kwargs = OpenSearchAdapter(config)._build_client_kwargs()
+
+        assert len(kwargs["hosts"]) == 3
+        assert kwargs["sniff_on_connection_fail"] is True
+        assert kwargs["retry_on_timeout"] is True
+
+    def test_options_override(self):
+        """测试 options 覆盖默认参数"""
+        config = DatabaseConfig(
+            url="https://node1:9200",
+            options={
+                "verify_ssl": False,
+                "sniff_on_start": True,
+                "sniffer_timeout": 60,
+                "pool_maxsize": 32,
+                "http_compress": False,
+            },
+        )
+        kwargs = OpenSearchAdapter(config)._build_client_kwargs()
+
+        assert kwargs["verify_certs"] is False
+        assert kwargs["ssl_context"] is None
+        assert kwargs["sniff_on_start"] is True
+        assert kwargs["sniffer_timeout"] == 60
+        assert kwargs["pool_maxsize"] == 32
+        assert kwargs["http_compress"] is False
+        assert "connection_class" not in kwargs
+
+
+class TestOpenSearchQueryBuilder:
+    """测试 OpenSearch 查询构建"""
+
+    def test_upsert_operations(self):
+        """测试 upsert 使用 key_fields 拼接的文档 ID 和 doc_as_upsert"""
+        operations = OpenSearchAdapter._build_upsert_operations(
+            "users", [{"org": "a", "id": 1, "name": "x"}], ["org", "id"]
+        )
+
+        assert operations == [
+            {"update": {"_index": "users", "_id": "a:1"}},
+            {"doc": {"org": "a", "id": 1, "name": "x"}, "doc_as_upsert": True},
+        ]
+
+    def test_boolean_groups(self):
+        """测试 $or / $not 转换为 bool.should / bool.must_not"""
+        adapter = OpenSearchAdapter(DatabaseConfig(url="http://localhost:9200"))
+
+        query = adapter._build_query(
+            {
+                "active": True,
+                "$or": [{"age__gt": 60}, {"vip": True}],
+                "$not": {"status__in": ["banned"]},
+            }
+        )
+
+        assert query == {
+            "bool": {
+                "must": [
+                    {"match": {"active": True}},
+                    {
+                        "bool": {
+                            "should": [
+                                {"bool": {"must": [{"range": {"age": {"gt": 60}}}]}},
+                                {"bool": {"must": [{"match": {"vip": True}}]}},
+                            ],
+                            "minimum_should_match": 1,
+                        }
+                    },
+                    {
+                        "bool": {
+                            "must_not": [{"bool": {"must": [{"terms": {"status": ["banned"]}}]}}]
+                        }
+                    },
+                ]
+            }
+        }
+
+    @pytest.mark.asyncio
+    async def test_aggregate(self):
+        """测试聚合规格编译为嵌套 terms 聚合并展开结果"""
+        from unittest.mock import AsyncMock
+
+        adapter = OpenSearchAdapter(
+            DatabaseConfig(url="http://localhost:9200", max_query_results=10)
+        )
+        adapter._client = AsyncMock()
+        adapter._client.search.return_value = {
+            "hits": {"total": {"value": 6}},
+            "aggregations": {
+                "city": {
+                    "buckets": [
+                        {"key": "a", "doc_count": 4, "total": {"value": 40.0}},
+                        {"key": "b", "doc_count": 2, "total": {"value": 50.0}},
+                    ]
+                }
+            },
+        }
+
+        result = await adapter.advanced_query(
+            "aggregate",
+            {
+                "table": "orders",
+                "group_by": ["city"],
+                "metrics": [
+                    {"func": "count"},
+                    {"func": "sum", "field": "amount", "alias": "total"},
+                ],
+                "filters": {"status": "paid"},
+                "order_by": ["-total"],
+            },
+        )
+
+        adapter._client.search.assert_awaited_once_with(
+            index="orders",
+            body={
+                "size": 0,
+                "track_total_hits": True,
+                "query": {"bool": {"must": [{"match": {"status": "paid"}}]}},
+                "aggs": {
+                    "city": {
+                        "terms": {"field": "city", "size": 11, "order": [{"total": "desc"}]},
+                        "aggs": {"total": {"sum": {"field": "amount"}}},
+                    }
+                },
+            },
+        )
+        assert result.data == [
+            {"city": "b", "count": 2, "total": 50.0},
+            {"city": "a", "count": 4, "total": 40.0},
+        ]
+
+    def test_aggregate_pushes_order_and_limit_into_terms(self):
+        """测试单层分组把排序和 limit 下推到 terms，limit 不超过最大结果数"""
+        from mcp_database.core.aggregation import parse_aggregate
+
+        adapter = OpenSearchAdapter(
+            DatabaseConfig(url="http://localhost:9200", max_query_results=10)
+        )
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["city"],
+                "metrics": [{"func": "count", "alias": "n"}],
+                "order_by": ["-n", "city"],
+                "limit": 10**9,
+            }
+        )
+
+        terms = adapter._build_aggregate_body(spec)["aggs"]["city"]["terms"]
+
+        assert terms == {
+            "field": "city",
+            "size": 10,
+            "order": [{"_count": "desc"}, {"_key": "asc"}],
+        }
+
+    def test_aggregate_truncated_buckets_rejected(self):
+        """测试多层分组时 terms 丢弃了部分桶则抛出 QueryError"""
+        from mcp_database.core.aggregation import parse_aggregate
+        from mcp_database.core.exceptions import QueryError
+
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["city", "status"],
+                "metrics": [{"func": "count"}],
+                "limit": 5,
+            }
+        )
+        aggregations = {
+            "city": {
+                "sum_other_doc_count": 3,
+                "buckets": [
+                    {"key": "a", "doc_count": 1, "status": {"buckets": []}},
+                ],
+            }
+        }
+
+        with pytest.raises(QueryError):
+            OpenSearchAdapter._flatten_aggregations(spec, aggregations, 4, 10)
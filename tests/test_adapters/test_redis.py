@@ -183,6 +183,63 @@ class TestRedisAdapter:
         result = await adapter.query("users", limit=5)
         assert len(result.data) == 5
 
+    @pytest.mark.asyncio
+    async def test_scan_across_batches(self, adapter, monkeypatch):
+        """测试跨多个 MGET 批次扫描过滤"""
+        from mcp_database.adapters.nosql import redis as redis_module
+
+        await self.clear_redis_database(adapter)
+        monkeypatch.setattr(redis_module, "SCAN_BATCH_SIZE", 3)
+
+        await adapter.insert("users", [{"name": f"User{i}", "age": i} for i in range(10)])
+
+        result = await adapter.query("users", {"age__gte": 5, "age__in": [1, 5, 7, 9]})
+        assert sorted(row["age"] for row in result.data) == [5, 7, 9]
+
+        deleted = await adapter.delete("users", {"age__lt": 4})
+        assert deleted.deleted_count == 4
+
+    @pytest.mark.asyncio
+    async def test_query_with_order_offset_and_fields(self, adapter):
+        """测试客户端排序、分页和字段投影"""
+        await self.clear_redis_database(adapter)
+
+        await adapter.insert("users", [{"name": f"User{i}", "age": i % 4} for i in range(8)])
+
+        result = await adapter.query(
+            "users", limit=3, offset=1, order_by=["-age", "name"], fields=["name"]
+        )
+        assert result.data == [{"name": "User7"}, {"name": "User2"}, {"name": "User6"}]
+        assert result.count == 8
+        assert result.has_more is True
+
+    @pytest.mark.asyncio
+    async def test_aggregate(self, adapter, monkeypatch):
+        """测试跨批次流式哈希聚合"""
+        from mcp_database.adapters.nosql import redis as redis_module
+
+        await self.clear_redis_database(adapter)
+        monkeypatch.setattr(redis_module, "SCAN_BATCH_SIZE", 3)
+
+        await adapter.insert("users", [{"city": f"c{i % 3}", "age": i} for i in range(11)])
+
+        result = await adapter.advanced_query(
+            "aggregate",
+            {
+                "table": "users",
+                "group_by": ["city"],
+                "metrics": [{"func": "count"}, {"func": "sum", "field": "age", "alias": "total"}],
+                "filters": {"age__gte": 1},
+                "having": {"total__gt": 15},
+                "order_by": ["-total"],
+            },
+        )
+
+        assert result.data == [
+            {"city": "c1", "count": 4, "total": 22},
+            {"city": "c0", "count": 3, "total": 18},
+        ]
+
     @pytest.mark.asyncio
     async def test_update_with_filters(self, adapter):
         """测试更新操作"""
@@ -199,6 +256,48 @@ class TestRedisAdapter:
         query_result = await adapter.query("users", {"name": "NewName"})
         assert len(query_result.data) == 1
 
+    @pytest.mark.asyncio
+    async def test_upsert(self, adapter):
+        """测试按 key_fields 插入或合并记录"""
+        await self.clear_redis_database(adapter)
+
+        await adapter.upsert(
+            "users", {"email": "a@example.com", "name": "Old", "age": 1}, ["email"]
+        )
+        result = await adapter.upsert(
+            "users",
+            [{"email": "a@example.com", "name": "New"}, {"email": "b@example.com", "name": "B"}],
+            ["email"],
+        )
+        assert result.upserted_count == 2
+
+        query_result = await adapter.query("users", order_by=["email"])
+        assert query_result.data == [
+            {"email": "a@example.com", "name": "New", "age": 1},
+            {"email": "b@example.com", "name": "B"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_per_row_values(self, adapter):
+        """测试按 id 批量更新不同的值"""
+        await self.clear_redis_database(adapter)
+
+        inserted = await adapter.insert("users", [{"name": "a"}, {"name": "b"}])
+        first, second = inserted.inserted_ids
+
+        result = await adapter.bulk_update(
+            "users",
+            [{"id": first, "name": "A"}, {"id": second, "age": 2}, {"id": 999, "name": "x"}],
+            "id",
+        )
+        assert result.updated_count == 2
+
+        query_result = await adapter.query("users", order_by=["id"])
+        assert query_result.data == [
+            {"name": "A", "id": first},
+            {"name": "b", "id": second, "age": 2},
+        ]
+
     @pytest.mark.asyncio
     async def test_delete_with_filters(self, adapter):
         """测试删除操作"""
@@ -347,3 +446,91 @@ class TestRedisAdapter:
         # 测试布尔值过滤
         result = await adapter.query("users", {"active": True})
         assert len(result.data) == 2
+
+
+class TestRedisMergeRecords:
+    """测试 upsert / bulk_update 的乐观锁合并写入（无需真实数据库）"""
+
+    @staticmethod
+    def make_adapter(pipes):
+        """创建按顺序返回模拟 pipeline 的适配器"""
+        from unittest.mock import MagicMock
+
+        adapter = RedisAdapter(DatabaseConfig(url=DatabaseTestUtils.REDIS_URL))
+        adapter._client = MagicMock()
+        adapter._client.pipeline.side_effect = pipes
+        adapter._connected = True
+        return adapter
+
+    @staticmethod
+    def make_pipe(existing, execute_error=None):
+        """创建模拟事务 pipeline"""
+        from unittest.mock import AsyncMock, MagicMock
+
+        pipe = MagicMock()
+        pipe.__aenter__ = AsyncMock(return_value=pipe)
+        pipe.__aexit__ = AsyncMock(return_value=False)
+        pipe.watch = AsyncMock()
+        pipe.mget = AsyncMock(return_value=existing)
+        pipe.execute = AsyncMock(side_effect=execute_error)
+        return pipe
+
+    @pytest.mark.asyncio
+    async def test_upsert_merges_in_transaction_and_retries(self):
+        """测试 WATCH 的键被并发修改时重新读取并合并"""
+        import json
+
+        from redis.exceptions import WatchError
+
+        stale = self.make_pipe([None], execute_error=WatchError())
+        fresh = self.make_pipe([json.dumps({"email": "a", "name": "Other", "age": 1})])
+        adapter = self.make_adapter([stale, fresh])
+
+        result = await adapter.upsert("users", {"email": "a", "name": "New"}, ["email"])
+
+        assert result.upserted_count == 1
+        fresh.watch.assert_awaited_once_with("users:a")
+        fresh.multi.assert_called_once()
+        key, value = fresh.set.call_args.args
+        assert key == "users:a"
+        assert json.loads(value) == {"email": "a", "name": "New", "age": 1}
+        fresh.sadd.assert_called_once_with("users:_index", "users:a")
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_skips_missing_records(self):
+        """测试批量更新只写回已存在的记录且不修改索引"""
+        import json
+
+        pipe = self.make_pipe([json.dumps({"id": 1, "name": "a"}), None])
+        adapter = self.make_adapter([pipe])
+
+        result = await adapter.bulk_update(
+            "users", [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}], "id"
+        )
+
+        assert result.updated_count == 1
+        assert pipe.set.call_count == 1
+        pipe.sadd.assert_not_called()
+
+
+class TestRedisQueryPaging:
+    """测试查询结果大小限制（无需真实数据库）"""
+
+    @pytest.mark.asyncio
+    async def test_max_results_applies_to_page(self):
+        """测试结果大小限制作用于每页，总数超出时仍可分页"""
+        from unittest.mock import AsyncMock
+
+        from mcp_database.core.exceptions import QueryError
+
+        adapter = RedisAdapter(DatabaseConfig(url=DatabaseTestUtils.REDIS_URL, max_query_results=3))
+        rows = [{"name": f"User{i}", "age": i} for i in range(8)]
+        adapter._scan = AsyncMock(return_value=([], rows))
+
+        result = await adapter.query("users", limit=3, offset=3, order_by=["age"])
+        assert [row["age"] for row in result.data] == [3, 4, 5]
+        assert result.count == 8
+        assert result.has_more is True
+
+        with pytest.raises(QueryError):
+            await adapter.query("users")
@@ -5,6 +5,7 @@ import os
 import pytest
 
 from mcp_database.adapters.sql.base import SQLAdapter
+from mcp_database.core.exceptions import DatabaseError
 from mcp_database.core.models import DatabaseConfig
 from tests.utils import DatabaseTestUtils, TestDataGenerator, wait_for_database_connection
 
@@ -104,6 +105,26 @@ class TestSQLAdapterSQLite:
         result = await adapter.query("users", {"age__gt": 25})
         assert len(result.data) == 2
 
+    @pytest.mark.asyncio
+    async def test_query_with_boolean_groups(self, adapter):
+        """测试 $or / $not 组合过滤查询"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        users = [
+            {"name": "User1", "age": 20},
+            {"name": "User2", "age": 30},
+            {"name": "User3", "age": 40},
+            {"name": "User4", "age": 50},
+        ]
+        await adapter.insert("users", users)
+
+        result = await adapter.query(
+            "users",
+            {"$or": [{"age__lt": 25}, {"age__gte": 40}], "$not": {"name": "User4"}},
+        )
+        assert sorted(row["name"] for row in result.data) == ["User1", "User3"]
+
     @pytest.mark.asyncio
     async def test_query_with_lt_filter(self, adapter):
         """测试小于过滤查询"""
@@ -193,6 +214,61 @@ class TestSQLAdapterSQLite:
         result = await adapter.query("users", limit=5)
         assert len(result.data) == 5
 
+    @pytest.mark.asyncio
+    async def test_query_with_order_offset_and_fields(self, adapter):
+        """测试排序、分页和字段投影"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        users = [{"name": f"User{i}", "age": 20 + i % 3} for i in range(6)]
+        await adapter.insert("users", users)
+
+        result = await adapter.query(
+            "users", limit=2, offset=1, order_by=["-age", "name"], fields=["name", "age"]
+        )
+        assert result.data == [{"name": "User5", "age": 22}, {"name": "User1", "age": 21}]
+        assert result.count == 6
+        assert result.has_more is True
+
+        result = await adapter.query("users", offset=4, order_by=["name"], fields=["name"])
+        assert result.data == [{"name": "User4"}, {"name": "User5"}]
+        assert result.has_more is False
+
+    @pytest.mark.asyncio
+    async def test_query_pages_beyond_max_results(self, adapter):
+        """测试结果大小限制作用于每页，总数超出时仍可分页"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+        await adapter.insert("users", [{"name": f"User{i:02d}", "age": i} for i in range(12)])
+        adapter.config.max_query_results = 5
+
+        result = await adapter.query("users", limit=5, offset=5, order_by=["name"])
+        assert [row["name"] for row in result.data] == [f"User{i:02d}" for i in range(5, 10)]
+        assert result.count == 12
+        assert result.has_more is True
+
+        result = await adapter.query("users", offset=8, order_by=["name"])
+        assert len(result.data) == 4
+        assert result.has_more is False
+
+        with pytest.raises(DatabaseError):
+            await adapter.query("users")
+        with pytest.raises(DatabaseError):
+            await adapter.query("users", limit=6)
+
+    @pytest.mark.asyncio
+    async def test_query_rejects_invalid_order_and_fields(self, adapter):
+        """测试非法排序字段、投影字段和 offset"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        with pytest.raises(DatabaseError):
+            await adapter.query("users", order_by=["-name; DROP TABLE users"])
+        with pytest.raises(DatabaseError):
+            await adapter.query("users", fields=["name", "age) FROM users --"])
+        with pytest.raises(DatabaseError):
+            await adapter.query("users", offset=-1)
+
     @pytest.mark.asyncio
     async def test_update_with_filters(self, adapter):
         """测试更新操作"""
@@ -210,6 +286,95 @@ class TestSQLAdapterSQLite:
         query_result = await adapter.query("users", {"name": "NewName"})
         assert len(query_result.data) == 1
 
+    @pytest.mark.asyncio
+    async def test_update_same_field_in_data_and_filters(self, adapter):
+        """测试更新值与过滤条件使用同一字段时参数互不覆盖"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        await adapter.insert("users", [{"name": f"User{i}", "age": 20 + i} for i in range(5)])
+
+        result = await adapter.update("users", {"age": 99}, {"age__gte": 21, "age__lt": 23})
+        assert result.updated_count == 2
+
+        query_result = await adapter.query("users", {"age": 99}, order_by=["name"])
+        assert [row["name"] for row in query_result.data] == ["User1", "User2"]
+
+    @pytest.mark.asyncio
+    async def test_upsert(self, adapter):
+        """测试按主键插入或更新"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+        await adapter.insert("users", {"id": 1, "name": "Old", "age": 20})
+
+        result = await adapter.upsert(
+            "users",
+            [{"id": 1, "name": "New"}, {"id": 2, "name": "Added", "age": 30}],
+            ["id"],
+        )
+        assert result.upserted_count == 2
+
+        query_result = await adapter.query("users", order_by=["id"], fields=["id", "name", "age"])
+        assert query_result.data == [
+            {"id": 1, "name": "New", "age": 20},
+            {"id": 2, "name": "Added", "age": 30},
+        ]
+
+        with pytest.raises(DatabaseError):
+            await adapter.upsert("users", [{"name": "NoKey"}], ["id"])
+
+    def test_build_upsert_sql(self, adapter):
+        """测试各方言的 upsert 语句"""
+        assert adapter._build_upsert_sql("users", ["id", "name"], ["id"]) == (
+            "INSERT INTO users (id, name) VALUES (:id, :name) "
+            "ON CONFLICT (id) DO UPDATE SET name = excluded.name"
+        )
+        assert adapter._build_upsert_sql("users", ["id"], ["id"]).endswith(
+            "ON CONFLICT (id) DO NOTHING"
+        )
+
+        mysql = SQLAdapter(DatabaseConfig(url="mysql+aiomysql://test@localhost/test"))
+        assert mysql._build_upsert_sql("users", ["id", "name"], ["id"]).endswith(
+            "ON DUPLICATE KEY UPDATE name = VALUES(name)"
+        )
+
+    @pytest.mark.asyncio
+    async def test_bulk_update(self, adapter):
+        """测试每条记录更新为不同的值"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+        await adapter.insert(
+            "users", [{"id": i, "name": f"User{i}", "age": i} for i in range(1, 4)]
+        )
+
+        result = await adapter.bulk_update(
+            "users",
+            [{"id": 1, "name": "A"}, {"id": 2, "name": "B", "age": 20}, {"id": 9, "age": 90}],
+            "id",
+        )
+        assert result.updated_count == 2
+
+        query_result = await adapter.query("users", order_by=["id"], fields=["id", "name", "age"])
+        assert query_result.data == [
+            {"id": 1, "name": "A", "age": 1},
+            {"id": 2, "name": "B", "age": 20},
+            {"id": 3, "name": "User3", "age": 3},
+        ]
+
+    def test_build_bulk_update_sql(self, adapter):
+        """测试批量更新语句只为包含字段的记录生成 CASE 分支"""
+        sql, params = adapter._build_bulk_update_sql(
+            "users", "id", [{"id": 1, "name": "A"}, {"id": 2, "name": "B", "age": 20}]
+        )
+
+        assert sql == (
+            "UPDATE users SET "
+            "name = CASE id WHEN :k0 THEN :v0 WHEN :k1 THEN :v1 ELSE name END, "
+            "age = CASE id WHEN :k1 THEN :v2 ELSE age END "
+            "WHERE id IN (:k0, :k1)"
+        )
+        assert params == {"k0": 1, "k1": 2, "v0": "A", "v1": "B", "v2": 20}
+
     @pytest.mark.asyncio
     async def test_delete_with_filters(self, adapter):
         """测试删除操作"""
@@ -239,6 +404,129 @@ class TestSQLAdapterSQLite:
         )
         assert result.rows_affected == 1
 
+    @pytest.mark.asyncio
+    async def test_batch_operations_in_transaction(self, adapter):
+        """测试在单个事务中执行批量操作"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        result = await adapter.advanced_query(
+            "batch",
+            {
+                "operations": [
+                    {"type": "insert", "table": "users", "data": {"name": "Alice", "age": 30}},
+                    {
+                        "type": "update",
+                        "table": "users",
+                        "data": {"age": 31},
+                        "filters": {"name": "Alice"},
+                    },
+                    {"type": "query", "table": "users", "filters": {"name": "Alice"}},
+                ]
+            },
+        )
+
+        results = result.data["results"]
+        assert result.data["committed"] is True
+        assert results[0]["inserted_count"] == 1
+        assert results[1]["updated_count"] == 1
+        assert results[2]["data"][0]["age"] == 31
+
+    @pytest.mark.asyncio
+    async def test_aggregate_group_by(self, adapter):
+        """测试分组聚合"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+        await adapter.insert(
+            "users",
+            [
+                {"name": "a", "age": 20},
+                {"name": "a", "age": 30},
+                {"name": "b", "age": 40},
+                {"name": "c", "age": 50},
+            ],
+        )
+
+        result = await adapter.advanced_query(
+            "aggregate",
+            {
+                "table": "users",
+                "group_by": ["name"],
+                "metrics": [
+                    {"func": "count"},
+                    {"func": "sum", "field": "age", "alias": "total"},
+                    {"func": "avg", "field": "age"},
+                    {"func": "count_distinct", "field": "age"},
+                ],
+                "filters": {"age__lt": 50},
+            },
+        )
+
+        assert result.data == [
+            {"name": "a", "count": 2, "total": 50, "avg_age": 25.0, "count_distinct_age": 2},
+            {"name": "b", "count": 1, "total": 40, "avg_age": 40.0, "count_distinct_age": 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_aggregate_having_order_and_limit(self, adapter):
+        """测试聚合结果的 having 过滤、排序和 limit"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+        await adapter.insert("users", [{"name": f"n{i % 4}", "age": i} for i in range(12)])
+
+        result = await adapter.advanced_query(
+            "aggregate",
+            {
+                "table": "users",
+                "group_by": ["name"],
+                "metrics": [{"func": "max", "field": "age", "alias": "oldest"}],
+                "filters": {"age__gt": 0},
+                "having": {"oldest__gte": 9},
+                "order_by": ["-oldest"],
+                "limit": 2,
+            },
+        )
+
+        assert result.data == [{"name": "n3", "oldest": 11}, {"name": "n2", "oldest": 10}]
+
+    @pytest.mark.asyncio
+    async def test_aggregate_rejects_invalid_spec(self, adapter):
+        """测试非法聚合函数、字段和别名"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        invalid_specs = [
+            {"metrics": []},
+            {"metrics": [{"func": "median", "field": "age"}]},
+            {"metrics": [{"func": "sum"}]},
+            {"metrics": [{"func": "max", "field": "age); DROP TABLE users; --"}]},
+            {"metrics": [{"func": "count", "alias": "n FROM users --"}]},
+            {"group_by": ["name, (SELECT 1)"], "metrics": [{"func": "count"}]},
+        ]
+        for spec in invalid_specs:
+            with pytest.raises(DatabaseError):
+                await adapter.advanced_query("aggregate", {"table": "users", **spec})
+
+    @pytest.mark.asyncio
+    async def test_batch_operations_rollback_on_error(self, adapter):
+        """测试批量操作失败时整体回滚"""
+        schema = DatabaseTestUtils.get_test_schema()
+        await DatabaseTestUtils.create_test_table(adapter, "users", schema)
+
+        with pytest.raises(DatabaseError):
+            await adapter.advanced_query(
+                "batch",
+                {
+                    "operations": [
+                        {"type": "insert", "table": "users", "data": {"name": "Bob", "age": 20}},
+                        {"type": "insert", "table": "missing_table", "data": {"name": "Bob"}},
+                    ]
+                },
+            )
+
+        query_result = await adapter.query("users", {"name": "Bob"})
+        assert len(query_result.data) == 0
+
     @pytest.mark.asyncio
     async def test_get_capabilities(self, adapter):
         """测试获取能力信息"""
@@ -252,6 +540,59 @@ class TestSQLAdapterSQLite:
         assert adapter.is_connected is True
 
 
+class TestSQLAdapterChunkedWrites:
+    """测试 SQLAdapter 分块删除与更新"""
+
+    @pytest.fixture
+    async def adapter(self):
+        """创建每块 3 条记录的 SQLite 适配器并准备 10 条数据"""
+        config = DatabaseConfig(url=DatabaseTestUtils.SQLITE_URL, options={"chunk_size": 3})
+        adapter = SQLAdapter(config)
+        await adapter.connect()
+        await DatabaseTestUtils.create_test_table(
+            adapter, "users", DatabaseTestUtils.get_test_schema()
+        )
+        await adapter.insert("users", [{"id": i, "name": f"User{i}", "age": i} for i in range(10)])
+        yield adapter
+        await adapter.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_chunked_update_and_delete(self, adapter):
+        """测试分块执行并累计影响行数，每块生成一个 chunk 区间"""
+        from mcp_database.core.tracing import TracingHook
+
+        class ChunkHook(TracingHook):
+            def __init__(self):
+                self.row_counts = []
+
+            def after(self, span):
+                if span.name == "chunk":
+                    self.row_counts.append(span.attributes["row_count"])
+
+        hook = ChunkHook()
+        adapter.add_hook(hook)
+
+        result = await adapter.update("users", {"age": 0}, {"age__gte": 2})
+        assert result.updated_count == 8
+        assert hook.row_counts == [3, 3, 2]
+
+        result = await adapter.delete("users", {"age": 0})
+        assert result.deleted_count == 9
+
+        query_result = await adapter.query("users", order_by=["id"])
+        assert [row["id"] for row in query_result.data] == [1]
+
+    @pytest.mark.asyncio
+    async def test_invalid_chunk_options(self):
+        """测试非法的分块配置"""
+        adapter = SQLAdapter(
+            DatabaseConfig(url=DatabaseTestUtils.SQLITE_URL, options={"chunk_delay": -1})
+        )
+
+        with pytest.raises(DatabaseError):
+            await adapter.delete("users", {"id": 1})
+
+
 @pytest.mark.skipif(os.getenv("CI") == "true", reason="Skip PostgreSQL tests in CI environment")
 class TestSQLAdapterPostgreSQL:
     """测试 SQLAdapter - PostgreSQL"""
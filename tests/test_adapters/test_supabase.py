@@ -1,10 +1,14 @@
 """测试 Supabase 适配器 - 使用真实数据库"""
 
+import json
 import os
 
+import httpx
 import pytest
 
 from mcp_database.adapters.factory import AdapterFactory
+from mcp_database.adapters.http.supabase import SupabaseAdapter
+from mcp_database.core.exceptions import QueryError
 from mcp_database.core.models import DatabaseConfig
 from tests.utils import wait_for_database_connection
 
@@ -112,3 +116,398 @@ class TestSupabaseAdapter:
                 pytest.skip("Table 'users' does not exist in Supabase database")
             else:
                 raise
+
+
+def make_mock_adapter(handler, **options) -> SupabaseAdapter:
+    """创建使用 httpx.MockTransport 的 Supabase 适配器"""
+    config = DatabaseConfig(url="https://project.supabase.co", options=options)
+    adapter = SupabaseAdapter(config)
+    adapter._client = httpx.AsyncClient(
+        base_url="https://project.supabase.co", transport=httpx.MockTransport(handler)
+    )
+    adapter._is_connected = True
+    return adapter
+
+
+class TestSupabaseAdapterRequests:
+    """测试 Supabase 适配器生成的 HTTP 请求（无需真实数据库）"""
+
+    @pytest.mark.asyncio
+    async def test_batch_insert_single_post(self):
+        """测试批量插入在一次 POST 中提交"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            body = json.loads(request.content)
+            return httpx.Response(201, json=[{"id": i} for i in range(len(body))])
+
+        adapter = make_mock_adapter(handler)
+        rows = [{"name": f"user{i}"} for i in range(1000)]
+        result = await adapter.insert("users", rows)
+
+        assert len(requests) == 2
+        assert requests[0].headers["Prefer"] == "return=representation"
+        assert requests[0].url.params["select"] == "id"
+        assert result.inserted_count == 1000
+        assert len(result.inserted_ids) == 1000
+
+    @pytest.mark.asyncio
+    async def test_batch_insert_return_minimal(self):
+        """测试不需要 ID 时使用 return=minimal"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(201)
+
+        adapter = make_mock_adapter(handler, return_ids=False, insert_batch_size=100)
+        result = await adapter.insert("users", [{"name": f"user{i}"} for i in range(250)])
+
+        assert len(requests) == 3
+        assert requests[0].headers["Prefer"] == "return=minimal"
+        assert "select" not in requests[0].url.params
+        assert result.inserted_count == 250
+        assert result.inserted_ids == []
+
+    @pytest.mark.asyncio
+    async def test_batch_insert_heterogeneous_columns(self):
+        """测试字段不一致的文档指定 columns 参数"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(201, json=[{"id": 1}, {"id": 2}])
+
+        adapter = make_mock_adapter(handler)
+        await adapter.insert("users", [{"name": "a"}, {"name": "b", "age": 3}])
+
+        assert requests[0].url.params["columns"] == "name,age"
+        assert "missing=default" in requests[0].headers["Prefer"]
+
+    @pytest.mark.asyncio
+    async def test_upsert_merge_duplicates(self):
+        """测试 upsert 按块 POST 并合并重复记录"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(201)
+
+        adapter = make_mock_adapter(handler, insert_batch_size=100)
+        rows = [{"org": "a", "name": f"user{i}"} for i in range(150)]
+        result = await adapter.upsert("users", rows, ["org", "name"])
+
+        assert len(requests) == 2
+        assert requests[0].url.params["on_conflict"] == "org,name"
+        assert requests[0].headers["Prefer"] == "resolution=merge-duplicates,return=minimal"
+        assert result.upserted_count == 150
+
+        with pytest.raises(QueryError):
+            await adapter.upsert("users", [{"name": "x"}], ["org"])
+
+    @pytest.mark.asyncio
+    async def test_upsert_mixed_keys_split_by_columns(self):
+        """测试字段不一致的记录分组提交，不使用 missing=default 覆盖已有值"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(201)
+
+        adapter = make_mock_adapter(handler)
+        rows = [
+            {"id": 1, "name": "a", "age": 3},
+            {"id": 2, "age": 5},
+            {"id": 3, "name": "c", "age": 1},
+        ]
+        result = await adapter.upsert("users", rows, ["id"])
+
+        assert result.upserted_count == 3
+        assert [json.loads(request.content) for request in requests] == [
+            [rows[0], rows[2]],
+            [rows[1]],
+        ]
+        for request in requests:
+            assert "columns" not in request.url.params
+            assert "missing=default" not in request.headers["Prefer"]
+
+    @pytest.mark.asyncio
+    async def test_update_single_filtered_patch(self):
+        """测试更新使用一次带过滤条件的 PATCH"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(204, headers={"Content-Range": "0-41/42"})
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.update(
+            "users", {"active": False}, {"age__gte": 18, "age__lt": 30, "name": "x"}
+        )
+
+        assert len(requests) == 1
+        assert requests[0].method == "PATCH"
+        assert requests[0].url.params.get_list("age") == ["gte.18", "lt.30"]
+        assert requests[0].url.params["name"] == "eq.x"
+        assert requests[0].headers["Prefer"] == "return=minimal,count=exact"
+        assert json.loads(requests[0].content) == {"active": False}
+        assert result.updated_count == 42
+
+    @pytest.mark.asyncio
+    async def test_delete_single_filtered_delete(self):
+        """测试删除使用一次带过滤条件的 DELETE"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(204, headers={"Content-Range": "*/3"})
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.delete("users", {"id__in": [1, 2, 3], "deleted_at__isnull": True})
+
+        assert len(requests) == 1
+        assert requests[0].method == "DELETE"
+        assert requests[0].url.params["id"] == "in.(1,2,3)"
+        assert requests[0].url.params["deleted_at"] == "is.null"
+        assert result.deleted_count == 3
+
+    def test_filter_params_quote_reserved_characters(self):
+        """测试 in 列表中包含保留字符的值被引号包裹"""
+        params = SupabaseAdapter._build_filter_params({"name__in": ["a,b", "c"], "ok": True})
+        assert params == [("name", 'in.("a,b",c)'), ("ok", "eq.true")]
+
+    def test_filter_params_boolean_groups(self):
+        """测试 $or / $and / $not 转换为 PostgREST 逻辑参数"""
+        params = SupabaseAdapter._build_filter_params(
+            {
+                "active": True,
+                "$or": [{"age__lt": 18}, {"age__gte": 65, "name__contains": "a,b"}],
+                "$not": {"$and": [{"role": "admin"}, {"deleted_at__isnull": False}]},
+            }
+        )
+        assert params == [
+            ("active", "eq.true"),
+            ("or", '(age.lt.18,and(age.gte.65,name.like."*a,b*"))'),
+            ("not.and", "(and(role.eq.admin,deleted_at.not.is.null))"),
+        ]
+
+    def test_client_kwargs_from_config(self):
+        """测试客户端连接池和超时参数来自 DatabaseConfig"""
+        config = DatabaseConfig(
+            url="https://project.supabase.co",
+            pool_size=4,
+            max_overflow=6,
+            connect_timeout=3,
+            query_timeout=15,
+            options={"keepalive_expiry": 30},
+        )
+        kwargs = SupabaseAdapter(config)._build_client_kwargs()
+
+        assert kwargs["limits"].max_connections == 10
+        assert kwargs["limits"].max_keepalive_connections == 4
+        assert kwargs["limits"].keepalive_expiry == 30
+        assert kwargs["timeout"].connect == 3
+        assert kwargs["timeout"].read == 15
+        assert "gzip" in kwargs["headers"]["Accept-Encoding"]
+        assert kwargs["http2"] is False
+
+    def test_client_kwargs_http2_opt_in(self, monkeypatch):
+        """测试 HTTP/2 需要显式开启且依赖 h2"""
+        from mcp_database.adapters.http import supabase
+
+        config = DatabaseConfig(url="https://project.supabase.co", options={"http2": True})
+
+        monkeypatch.setattr(supabase, "_HAS_H2", True)
+        assert SupabaseAdapter(config)._build_client_kwargs()["http2"] is True
+
+        monkeypatch.setattr(supabase, "_HAS_H2", False)
+        assert SupabaseAdapter(config)._build_client_kwargs()["http2"] is False
+
+    @pytest.mark.asyncio
+    async def test_query_server_side_pagination(self):
+        """测试分页、排序和字段投影在服务端完成"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            rows = [{"id": i, "name": f"user{i}"} for i in range(20, 31)]
+            return httpx.Response(206, json=rows, headers={"Content-Range": "20-30/3573"})
+
+        adapter = make_mock_adapter(handler, count="exact")
+        result = await adapter.query(
+            "users",
+            {"active": True},
+            limit=10,
+            offset=20,
+            order_by=["-created_at", "name"],
+            fields=["id", "name"],
+        )
+
+        params = requests[0].url.params
+        assert params["limit"] == "11"
+        assert params["offset"] == "20"
+        assert params["order"] == "created_at.desc,name.asc"
+        assert params["select"] == "id,name"
+        assert requests[0].headers["Prefer"] == "count=exact"
+        assert len(result.data) == 10
+        assert result.count == 3573
+        assert result.has_more is True
+
+    @pytest.mark.asyncio
+    async def test_query_without_count_header(self):
+        """测试缺少总数时使用返回的记录数"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json=[{"id": 1}, {"id": 2}])
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.query("users")
+
+        assert result.count == 2
+        assert result.has_more is False
+
+    @pytest.mark.asyncio
+    async def test_query_default_count_mode_planned(self):
+        """测试默认使用 planned 计数，估算值小于返回数量时取返回数量"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            rows = [{"id": i} for i in range(5)]
+            return httpx.Response(200, json=rows, headers={"Content-Range": "0-4/3"})
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.query("users")
+
+        assert requests[0].headers["Prefer"] == "count=planned"
+        assert result.count == 5
+        assert result.has_more is False
+
+    @pytest.mark.asyncio
+    async def test_query_has_more_independent_of_estimate(self):
+        """测试 has_more 由多取的一条记录判断，不受估算总数影响"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            rows = [{"id": 1}, {"id": 2}]
+            return httpx.Response(200, json=rows, headers={"Content-Range": "0-1/3573"})
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.query("users", limit=10)
+
+        assert len(result.data) == 2
+        assert result.has_more is False
+        assert result.count == 2
+
+    @pytest.mark.asyncio
+    async def test_query_invalid_count_mode(self):
+        """测试无效的计数模式"""
+        adapter = make_mock_adapter(lambda request: httpx.Response(200, json=[]), count="bogus")
+        with pytest.raises(QueryError):
+            await adapter.query("users")
+
+    @pytest.mark.asyncio
+    async def test_advanced_rpc(self):
+        """测试 rpc 调用 Postgres 函数"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=[{"total": 42}])
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.advanced_query(
+            "rpc", {"function": "order_totals", "args": {"since": "2024-01-01"}}
+        )
+
+        assert requests[0].method == "POST"
+        assert requests[0].url.path == "/rest/v1/rpc/order_totals"
+        assert json.loads(requests[0].content) == {"since": "2024-01-01"}
+        assert result.operation == "rpc"
+        assert result.data == [{"total": 42}]
+
+    @pytest.mark.asyncio
+    async def test_advanced_aggregate(self):
+        """测试聚合查询使用 PostgREST 聚合函数"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=[{"category": "a", "total": 10, "count": 2}])
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.advanced_query(
+            "aggregate",
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [
+                    {"func": "sum", "field": "amount", "alias": "total"},
+                    {"func": "count"},
+                ],
+                "filters": {"amount__gt": 0},
+            },
+        )
+
+        params = requests[0].url.params
+        assert requests[0].url.path == "/rest/v1/orders"
+        assert params["select"] == "category,total:amount.sum(),count()"
+        assert params["amount"] == "gt.0"
+        assert result.data == [{"category": "a", "total": 10, "count": 2}]
+
+    @pytest.mark.asyncio
+    async def test_advanced_aggregate_having_and_order(self):
+        """测试 having、排序和 limit 作用于返回的分组"""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(
+                200,
+                json=[
+                    {"category": "a", "sum_amount": 10},
+                    {"category": "b", "sum_amount": 30},
+                    {"category": "c", "sum_amount": 20},
+                ],
+            )
+
+        adapter = make_mock_adapter(handler)
+        result = await adapter.advanced_query(
+            "aggregate",
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [{"func": "sum", "field": "amount"}],
+                "having": {"sum_amount__gte": 20},
+                "order_by": ["-sum_amount"],
+            },
+        )
+
+        assert requests[0].url.params["select"] == "category,sum_amount:amount.sum()"
+        assert result.data == [
+            {"category": "b", "sum_amount": 30},
+            {"category": "c", "sum_amount": 20},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_advanced_aggregate_rejects_invalid_spec(self):
+        """测试聚合参数校验"""
+        adapter = make_mock_adapter(lambda request: httpx.Response(200, json=[]))
+
+        with pytest.raises(QueryError):
+            await adapter.advanced_query(
+                "aggregate", {"table": "orders", "metrics": [{"func": "median", "field": "x"}]}
+            )
+        with pytest.raises(QueryError):
+            await adapter.advanced_query(
+                "aggregate", {"table": "orders", "metrics": [{"func": "sum", "field": "a;drop"}]}
+            )
+        with pytest.raises(QueryError):
+            await adapter.advanced_query(
+                "aggregate",
+                {"table": "orders", "metrics": [{"func": "count_distinct", "field": "user"}]},
+            )
+        with pytest.raises(QueryError):
+            await adapter.advanced_query("rpc", {"function": "../admin"})
+        with pytest.raises(QueryError):
+            await adapter.advanced_query("unknown", {})
@@ -0,0 +1,141 @@
+"""测试工具调用准入控制"""
+
+import asyncio
+
+import pytest
+
+from mcp_database.core.exceptions import OverloadedError
+from mcp_database.server.admission import AdmissionController
+
+
+async def hold(
+    controller: AdmissionController, tool: str, table: str | None, release: asyncio.Event
+):
+    """占用一个名额直到 release 被设置"""
+    async with controller.admit(tool, table):
+        await release.wait()
+
+
+class TestAdmissionController:
+    """测试 AdmissionController"""
+
+    @pytest.mark.asyncio
+    async def test_max_concurrent(self):
+        """测试总并发上限"""
+        controller = AdmissionController(max_concurrent=2)
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            async with controller.admit("query", "users"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(work() for _ in range(10)))
+
+        assert peak == 2
+        assert controller.stats()["admitted"] == 10
+
+    @pytest.mark.asyncio
+    async def test_tool_and_table_limits(self):
+        """测试按工具和按表限流，被阻塞的请求不影响其他表"""
+        controller = AdmissionController(tool_limits={"execute": 1}, table_limits={"events": 1})
+        release = asyncio.Event()
+
+        holders = [
+            asyncio.ensure_future(hold(controller, "execute", None, release)),
+            asyncio.ensure_future(hold(controller, "query", "events", release)),
+        ]
+        await asyncio.sleep(0)
+        assert controller.active == 2
+
+        blocked_tool = asyncio.ensure_future(hold(controller, "execute", None, release))
+        blocked_table = asyncio.ensure_future(hold(controller, "query", "events", release))
+        await asyncio.sleep(0)
+        assert controller.queued == 2
+
+        # 其他表的查询不受阻塞
+        await asyncio.wait_for(controller.acquire("query", "users"), timeout=1)
+        controller._release("query", "users")
+
+        release.set()
+        await asyncio.gather(*holders, blocked_tool, blocked_table)
+        assert controller.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_full_fails_fast(self):
+        """测试等待队列已满时立即拒绝"""
+        controller = AdmissionController(max_concurrent=1, max_queue=1)
+        release = asyncio.Event()
+
+        holder = asyncio.ensure_future(hold(controller, "query", None, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(hold(controller, "query", None, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedError, match="already queued"):
+            await controller.acquire("query")
+        assert controller.stats()["rejected"] == 1
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        """测试排队超时后拒绝并移出队列"""
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.01)
+        release = asyncio.Event()
+
+        holder = asyncio.ensure_future(hold(controller, "query", None, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedError, match="waited more than"):
+            await controller.acquire("query")
+        assert controller.queued == 0
+
+        release.set()
+        await holder
+
+    @pytest.mark.asyncio
+    async def test_cheap_operations_have_priority(self):
+        """测试名额释放时优先准入廉价操作"""
+        controller = AdmissionController(max_concurrent=1)
+        release = asyncio.Event()
+        order = []
+
+        async def work(tool):
+            async with controller.admit(tool):
+                order.append(tool)
+
+        holder = asyncio.ensure_future(hold(controller, "query", None, release))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.ensure_future(work(tool)) for tool in ("execute", "advanced", "query", "insert")
+        ]
+        await asyncio.sleep(0)
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+
+        assert order == ["query", "insert", "execute", "advanced"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_removed(self):
+        """测试取消排队中的请求"""
+        controller = AdmissionController(max_concurrent=1)
+        release = asyncio.Event()
+
+        holder = asyncio.ensure_future(hold(controller, "query", None, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(controller.acquire("query"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+        assert controller.queued == 0
+        release.set()
+        await holder
+        assert controller.active == 0
@@ -0,0 +1,215 @@
+"""测试声明式聚合规格"""
+
+import pytest
+
+from mcp_database.core.aggregation import (
+    HashAggregator,
+    Metric,
+    fetch_limit,
+    finalize_rows,
+    parse_aggregate,
+    sort_rows,
+)
+from mcp_database.core.exceptions import QueryError
+
+
+class TestParseAggregate:
+    """测试聚合参数解析"""
+
+    def test_defaults(self):
+        """测试默认别名和默认排序"""
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [{"func": "count"}, {"func": "sum", "field": "amount"}],
+            }
+        )
+
+        assert spec.metrics == (
+            Metric("count", None, "count"),
+            Metric("sum", "amount", "sum_amount"),
+        )
+        assert spec.columns == ("category", "count", "sum_amount")
+        assert spec.ordering == (("category", False),)
+        assert spec.limit is None
+
+    def test_order_having_and_limit(self):
+        """测试 having、order_by 和 limit 引用输出列"""
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [{"func": "avg", "field": "amount", "alias": "mean"}],
+                "having": {"$or": [{"mean__gt": 10}, {"category": "book"}]},
+                "order_by": ["-mean"],
+                "limit": 5,
+            }
+        )
+
+        assert spec.ordering == (("mean", True),)
+        assert spec.limit == 5
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"table": "orders", "metrics": []},
+            {"table": "orders; --", "metrics": [{"func": "count"}]},
+            {"table": "orders", "metrics": [{"func": "median", "field": "x"}]},
+            {"table": "orders", "metrics": [{"func": "sum"}]},
+            {"table": "orders", "metrics": [{"func": "max", "field": "a) FROM x --"}]},
+            {"table": "orders", "metrics": [{"func": "count", "alias": "n m"}]},
+            {"table": "orders", "group_by": ["count"], "metrics": [{"func": "count"}]},
+            {"table": "orders", "metrics": [{"func": "count"}], "having": {"total__gt": 1}},
+            {"table": "orders", "metrics": [{"func": "count"}], "order_by": ["-total"]},
+            {"table": "orders", "metrics": [{"func": "count"}], "limit": 0},
+        ],
+    )
+    def test_rejects_invalid_spec(self, params):
+        """测试非法参数"""
+        with pytest.raises(QueryError):
+            parse_aggregate(params)
+
+
+class TestHashAggregator:
+    """测试流式哈希聚合"""
+
+    SPEC = {
+        "table": "orders",
+        "group_by": ["category"],
+        "metrics": [
+            {"func": "count"},
+            {"func": "count", "field": "amount"},
+            {"func": "sum", "field": "amount"},
+            {"func": "avg", "field": "amount"},
+            {"func": "min", "field": "amount"},
+            {"func": "max", "field": "amount"},
+            {"func": "count_distinct", "field": "tags"},
+        ],
+    }
+
+    def test_aggregates_across_batches(self):
+        """测试分批累加与空值处理"""
+        aggregator = HashAggregator(parse_aggregate(self.SPEC))
+        aggregator.add(
+            [
+                {"category": "a", "amount": 10, "tags": ["x"]},
+                {"category": "b", "amount": None, "tags": ["y"]},
+            ]
+        )
+        aggregator.add(
+            [
+                {"category": "a", "amount": 30, "tags": ["x"]},
+                {"category": "a", "tags": ["z"]},
+            ]
+        )
+
+        rows = {row["category"]: row for row in aggregator.rows()}
+
+        assert rows["a"] == {
+            "category": "a",
+            "count": 3,
+            "count_amount": 2,
+            "sum_amount": 40,
+            "avg_amount": 20.0,
+            "min_amount": 10,
+            "max_amount": 30,
+            "count_distinct_tags": 2,
+        }
+        assert rows["b"]["sum_amount"] is None
+        assert rows["b"]["avg_amount"] is None
+        assert rows["b"]["count_amount"] == 0
+
+    def test_global_aggregate_without_records(self):
+        """测试无分组字段且没有记录时返回一行"""
+        spec = parse_aggregate({"table": "orders", "metrics": [{"func": "count"}]})
+
+        assert HashAggregator(spec).rows() == [{"count": 0}]
+
+    def test_incompatible_values(self):
+        """测试无法求和的值抛出 QueryError"""
+        spec = parse_aggregate({"table": "orders", "metrics": [{"func": "sum", "field": "v"}]})
+
+        with pytest.raises(QueryError):
+            HashAggregator(spec).add([{"v": 1}, {"v": "x"}])
+
+
+class TestFinalizeRows:
+    """测试内存中的 having、排序和 limit"""
+
+    ROWS = [
+        {"category": "a", "total": 5},
+        {"category": "b", "total": 20},
+        {"category": "c", "total": 12},
+    ]
+
+    def test_having_order_limit(self):
+        """测试 having 过滤后排序并截取"""
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [{"func": "sum", "field": "amount", "alias": "total"}],
+                "having": {"total__gt": 6},
+                "order_by": ["-total"],
+                "limit": 1,
+            }
+        )
+
+        assert finalize_rows(spec, self.ROWS, 100) == [{"category": "b", "total": 20}]
+
+    def test_limit_clamped_to_max_results(self):
+        """测试 limit 超过最大结果数时按最大结果数截取"""
+        spec = parse_aggregate(
+            {
+                "table": "orders",
+                "group_by": ["category"],
+                "metrics": [{"func": "count"}],
+                "limit": 10**9,
+            }
+        )
+
+        assert fetch_limit(spec, 2) == 2
+        assert len(finalize_rows(spec, self.ROWS, 2)) == 2
+
+    def test_max_results(self):
+        """测试未指定 limit 时分组数超出上限"""
+        spec = parse_aggregate(
+            {"table": "orders", "group_by": ["category"], "metrics": [{"func": "count"}]}
+        )
+
+        with pytest.raises(QueryError):
+            finalize_rows(spec, self.ROWS, 2)
+
+
+class TestSortRows:
+    """测试内存排序"""
+
+    RECORDS = [
+        {"name": "a", "age": 2},
+        {"name": "b", "age": None},
+        {"name": "c", "age": 1},
+        {"name": "d"},
+        {"name": "e", "age": 2},
+    ]
+
+    def test_missing_values_sort_last(self):
+        """测试缺少排序字段的记录在升序和降序时都排在最后"""
+        ascending = sort_rows(self.RECORDS, [("age", False)])
+        descending = sort_rows(self.RECORDS, [("age", True)])
+
+        assert [r["name"] for r in ascending] == ["c", "a", "e", "b", "d"]
+        assert [r["name"] for r in descending] == ["a", "e", "c", "b", "d"]
+
+    def test_top_and_mixed_directions(self):
+        """测试堆取前 N 条及混合排序方向"""
+        top = sort_rows(self.RECORDS, [("age", True), ("name", True)], 2)
+        mixed = sort_rows(self.RECORDS, [("age", True), ("name", False)])
+
+        assert [r["name"] for r in top] == ["e", "a"]
+        assert [r["name"] for r in mixed] == ["a", "e", "c", "b", "d"]
+
+    def test_incomparable_values(self):
+        """测试无法比较的值抛出 QueryError"""
+        with pytest.raises(QueryError):
+            sort_rows([{"v": 1}, {"v": "x"}], [("v", False)])
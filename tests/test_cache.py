@@ -0,0 +1,110 @@
+"""测试查询结果缓存"""
+
+from mcp_database.core.models import QueryResult
+from mcp_database.server.cache import QueryCache
+
+
+def make_result(*rows: dict) -> QueryResult:
+    """创建查询结果"""
+    return QueryResult(data=list(rows), count=len(rows))
+
+
+class TestQueryCache:
+    """测试 QueryCache"""
+
+    def test_key_is_canonical(self):
+        """测试过滤条件顺序不影响缓存键"""
+        key1 = QueryCache.make_key("users", {"a": 1, "b": 2}, 10)
+        key2 = QueryCache.make_key("users", {"b": 2, "a": 1}, 10)
+
+        assert key1 == key2
+        assert key1 != QueryCache.make_key("users", {"a": 1, "b": 2}, 20)
+        assert QueryCache.make_key("users", None, None) == QueryCache.make_key("users", {}, None)
+        assert QueryCache.make_key("users", None, 10, {"offset": 10}) != QueryCache.make_key(
+            "users", None, 10
+        )
+
+    def test_hit_and_miss(self):
+        """测试命中与未命中统计"""
+        cache = QueryCache()
+        key = cache.make_key("users", {"id": 1}, None)
+
+        assert cache.get(key) is None
+        cache.put(key, "users", make_result({"id": 1}), cache.version("users"))
+        assert cache.get(key).data == [{"id": 1}]
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_ttl_expiry(self):
+        """测试缓存过期"""
+        cache = QueryCache(ttl=10)
+        key = cache.make_key("users", None, None)
+        cache.put(key, "users", make_result(), cache.version("users"), now=100.0)
+
+        assert cache.get(key, now=105.0) is not None
+        assert cache.get(key, now=111.0) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        """测试超过条目上限时淘汰最久未使用的条目"""
+        cache = QueryCache(max_entries=2)
+        keys = [cache.make_key("users", {"id": i}, None) for i in range(3)]
+
+        cache.put(keys[0], "users", make_result(), cache.version("users"))
+        cache.put(keys[1], "users", make_result(), cache.version("users"))
+        cache.get(keys[0])
+        cache.put(keys[2], "users", make_result(), cache.version("users"))
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_memory_budget(self):
+        """测试内存预算"""
+        cache = QueryCache(max_bytes=100)
+        big = make_result({"payload": "x" * 200})
+        small = make_result({"id": 1})
+
+        assert cache.put("big", "users", big, cache.version("users")) is False
+        assert cache.put("small", "users", small, cache.version("users")) is True
+        assert 0 < cache.stats()["bytes"] <= 100
+
+    def test_per_table_opt_in(self):
+        """测试只缓存启用的表"""
+        cache = QueryCache(tables=["products"])
+
+        assert cache.enabled_for("products") is True
+        assert cache.enabled_for("orders") is False
+        assert QueryCache().enabled_for("orders") is True
+
+    def test_invalidate_table(self):
+        """测试按表失效"""
+        cache = QueryCache()
+        users_key = cache.make_key("users", None, None)
+        orders_key = cache.make_key("orders", None, None)
+        cache.put(users_key, "users", make_result(), cache.version("users"))
+        cache.put(orders_key, "orders", make_result(), cache.version("orders"))
+
+        assert cache.invalidate("users") == 1
+        assert cache.get(users_key) is None
+        assert cache.get(orders_key) is not None
+
+        assert cache.invalidate() == 1
+        assert cache.get(orders_key) is None
+
+    def test_stale_result_not_stored_after_invalidation(self):
+        """测试查询期间发生写操作时不缓存旧结果"""
+        cache = QueryCache()
+        key = cache.make_key("users", None, None)
+
+        version = cache.version("users")
+        cache.invalidate("users")
+        assert cache.put(key, "users", make_result(), version) is False
+
+        version = cache.version("users")
+        cache.invalidate()
+        assert cache.put(key, "users", make_result(), version) is False
@@ -0,0 +1,108 @@
+"""测试相同请求合并"""
+
+import asyncio
+
+import pytest
+
+from mcp_database.core.exceptions import QueryError
+from mcp_database.server.coalescing import RequestCoalescer
+
+
+class TestRequestCoalescer:
+    """测试 RequestCoalescer"""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """测试并发的相同请求只执行一次"""
+        coalescer = RequestCoalescer()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        key = coalescer.make_key("query", "users", {"id": 1})
+        results = await asyncio.gather(*(coalescer.run(key, "users", fetch) for _ in range(50)))
+
+        assert calls == 1
+        assert results == [1] * 50
+        assert coalescer.stats() == {"leaders": 1, "coalesced": 49, "inflight": 0}
+
+    @pytest.mark.asyncio
+    async def test_different_keys_not_coalesced(self):
+        """测试不同请求分别执行"""
+        coalescer = RequestCoalescer()
+
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            coalescer.run(coalescer.make_key("users", 1), "users", lambda: fetch(1)),
+            coalescer.run(coalescer.make_key("users", 2), "users", lambda: fetch(2)),
+        )
+
+        assert results == [1, 2]
+        assert coalescer.leaders == 2
+
+    @pytest.mark.asyncio
+    async def test_key_is_canonical(self):
+        """测试字典参数顺序不影响请求键"""
+        assert RequestCoalescer.make_key({"a": 1, "b": 2}) == RequestCoalescer.make_key(
+            {"b": 2, "a": 1}
+        )
+
+    @pytest.mark.asyncio
+    async def test_error_shared_by_waiters(self):
+        """测试异常传递给所有等待者"""
+        coalescer = RequestCoalescer()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise QueryError("boom")
+
+        results = await asyncio.gather(
+            *(coalescer.run("k", "users", fail) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, QueryError) for r in results)
+        assert coalescer.stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_request(self):
+        """测试单个调用方取消不影响其他等待者"""
+        coalescer = RequestCoalescer()
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "ok"
+
+        first = asyncio.ensure_future(coalescer.run("k", "users", fetch))
+        second = asyncio.ensure_future(coalescer.run("k", "users", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "ok"
+
+    @pytest.mark.asyncio
+    async def test_forget_starts_new_request(self):
+        """测试写操作后的请求不合并到之前的进行中请求"""
+        coalescer = RequestCoalescer()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            value = calls
+            await asyncio.sleep(0.01)
+            return value
+
+        before = asyncio.ensure_future(coalescer.run("k", "users", fetch))
+        await asyncio.sleep(0)
+        coalescer.forget("users")
+        after = await coalescer.run("k", "users", fetch)
+
+        assert await before == 1
+        assert after == 2
@@ -33,7 +33,7 @@ class TestSQLFilterTranslator:
         filters = {"age": 25}
         where_clause, params = translator.translate(filters)
         assert "age" in where_clause
-        assert params["age_eq"] == 25
+        assert params["p0"] == 25
 
     def test_gt_operator(self):
         """测试大于操作符"""
@@ -43,7 +43,7 @@ class TestSQLFilterTranslator:
         filters = {"age__gt": 18}
         where_clause, params = translator.translate(filters)
         assert ">" in where_clause
-        assert params["age_gt"] == 18
+        assert params["p0"] == 18
 
     def test_lt_operator(self):
         """测试小于操作符"""
@@ -53,7 +53,7 @@ class TestSQLFilterTranslator:
         filters = {"age__lt": 60}
         where_clause, params = translator.translate(filters)
         assert "<" in where_clause
-        assert params["age_lt"] == 60
+        assert params["p0"] == 60
 
     def test_gte_operator(self):
         """测试大于等于操作符"""
@@ -63,7 +63,7 @@ class TestSQLFilterTranslator:
         filters = {"age__gte": 18}
         where_clause, params = translator.translate(filters)
         assert ">=" in where_clause
-        assert params["age_gte"] == 18
+        assert params["p0"] == 18
 
     def test_lte_operator(self):
         """测试小于等于操作符"""
@@ -73,7 +73,7 @@ class TestSQLFilterTranslator:
         filters = {"age__lte": 60}
         where_clause, params = translator.translate(filters)
         assert "<=" in where_clause
-        assert params["age_lte"] == 60
+        assert params["p0"] == 60
 
     def test_contains_operator(self):
         """测试包含操作符"""
@@ -83,7 +83,7 @@ class TestSQLFilterTranslator:
         filters = {"name__contains": "John"}
         where_clause, params = translator.translate(filters)
         assert "LIKE" in where_clause
-        assert params["name_contains"] == "%John%"
+        assert params["p0"] == "%John%"
 
     def test_startswith_operator(self):
         """测试开始于操作符"""
@@ -93,7 +93,7 @@ class TestSQLFilterTranslator:
         filters = {"name__startswith": "A"}
         where_clause, params = translator.translate(filters)
         assert "LIKE" in where_clause
-        assert params["name_startswith"] == "A%"
+        assert params["p0"] == "A%"
 
     def test_endswith_operator(self):
         """测试结束于操作符"""
@@ -103,7 +103,7 @@ class TestSQLFilterTranslator:
         filters = {"name__endswith": "son"}
         where_clause, params = translator.translate(filters)
         assert "LIKE" in where_clause
-        assert params["name_endswith"] == "%son"
+        assert params["p0"] == "%son"
 
     def test_in_operator(self):
         """测试 IN 操作符"""
@@ -142,8 +142,104 @@ class TestSQLFilterTranslator:
         filters = {"name": "John Doe"}
         where_clause, params = translator.translate(filters)
         assert "name" in where_clause
-        assert "name_eq" in params
-        assert params["name_eq"] == "John Doe"
+        assert ":p0" in where_clause
+        assert params == {"p0": "John Doe"}
+
+    def test_same_shape_reuses_compiled_sql(self):
+        """测试相同形状的过滤器复用编译结果，只重新绑定参数"""
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        translator = SQLFilterTranslator()
+        first_clause, first_params = translator.translate({"age__gt": 18, "status": "a"})
+        second_clause, second_params = translator.translate({"age__gt": 30, "status": "b"})
+
+        assert second_clause is first_clause
+        assert first_clause == "age > :p0 AND status = :p1"
+        assert first_params == {"p0": 18, "p1": "a"}
+        assert second_params == {"p0": 30, "p1": "b"}
+        assert len(translator._cache) == 1
+
+    def test_same_field_range_uses_positional_params(self):
+        """测试同一字段的多个条件按位置命名参数，不会互相覆盖"""
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        translator = SQLFilterTranslator()
+        where_clause, params = translator.translate({"age__gte": 18, "age__lt": 65, "age": 30})
+        other_clause, _ = translator.translate({"age__gte": 1, "age__lt": 2, "age": 3})
+
+        assert where_clause == "age >= :p0 AND age < :p1 AND age = :p2"
+        assert params == {"p0": 18, "p1": 65, "p2": 30}
+        assert other_clause is where_clause
+
+    def test_value_dependent_shapes(self):
+        """测试 IN 列表长度和 isnull 取值参与形状"""
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        translator = SQLFilterTranslator()
+        two, _ = translator.translate({"id__in": [1, 2]})
+        three, params = translator.translate({"id__in": [1, 2, 3]})
+        empty, _ = translator.translate({"id__in": []})
+        is_null, _ = translator.translate({"email__isnull": True})
+        not_null, _ = translator.translate({"email__isnull": False})
+
+        assert two == "id IN (:p0, :p1)"
+        assert three == "id IN (:p0, :p1, :p2)"
+        assert params == {"p0": 1, "p1": 2, "p2": 3}
+        assert empty == "1=0"
+        assert (is_null, not_null) == ("email IS NULL", "email IS NOT NULL")
+
+    def test_in_none_matches_baseline(self):
+        """测试 IN / NOT IN 取值为 None 时与空列表相同"""
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        translator = SQLFilterTranslator()
+
+        assert translator.translate({"id__in": None}) == ("1=0", {})
+        assert translator.translate({"id__not_in": None}) == ("1=1", {})
+
+    def test_in_non_list_rejected(self):
+        """测试 IN / NOT IN 取值不是列表时抛出 QueryError"""
+        import pytest
+
+        from mcp_database.core.exceptions import QueryError
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        translator = SQLFilterTranslator()
+        for filters in ({"id__in": 5}, {"id__not_in": "abc"}, {"$or": [{"id__in": 5}]}):
+            with pytest.raises(QueryError):
+                translator.translate(filters)
+
+    def test_invalid_values_rejected_with_cached_plan(self):
+        """测试缓存命中时仍校验取值"""
+        import pytest
+
+        from mcp_database.core.exceptions import QueryError
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        translator = SQLFilterTranslator()
+        translator.translate({"name": "a", "email__isnull": True})
+
+        with pytest.raises(QueryError):
+            translator.translate({"name": None, "email__isnull": True})
+        with pytest.raises(QueryError):
+            translator.translate({"name": "a", "email__isnull": "yes"})
+
+
+class TestCompileFilters:
+    """测试过滤器编译计划"""
+
+    def test_plan_cached_by_shape(self):
+        """测试按形状缓存编译计划"""
+        from mcp_database.core.filters import FilterCondition, compile_filters
+
+        plan = compile_filters({"age__gt": 1, "name": "a", "x__unknown": 2})
+
+        assert compile_filters({"age__gt": 5, "name": "b", "x__unknown": 3}) is plan
+        assert plan.conditions == (
+            FilterCondition("age__gt", "age", "gt"),
+            FilterCondition("name", "name", "eq"),
+            FilterCondition("x__unknown", "x", "eq"),
+        )
 
 
 class TestMongoFilterTranslator:
@@ -312,3 +408,134 @@ class TestRedisFilterTranslator:
         test_data3 = {"age": 25, "status": "inactive"}
         result3 = filter_func(test_data3)
         assert result3 is False
+
+    def test_in_operator_with_unhashable_values(self):
+        """测试 IN 条件处理不可哈希的取值和字段值"""
+        from mcp_database.core.filters import RedisFilterTranslator
+
+        translator = RedisFilterTranslator()
+
+        assert translator.translate({"tags__in": [["a"], ["b"]]})({"tags": ["a"]}) is True
+        assert translator.translate({"tags__in": ["a", "b"]})({"tags": ["a"]}) is False
+        assert translator.translate({"tags__not_in": ["a"]})({"tags": ["a"]}) is True
+
+    def test_null_operators(self):
+        """测试 isnull / notnull 条件"""
+        from mcp_database.core.filters import RedisFilterTranslator
+
+        translator = RedisFilterTranslator()
+
+        assert translator.translate({"email__isnull": True})({}) is True
+        assert translator.translate({"email__notnull": True})({"email": "a"}) is True
+        assert translator.translate({"email__isnull": "yes"})({}) is False
+
+    def test_translate_batch(self):
+        """测试按列批量过滤与逐条过滤结果一致"""
+        from mcp_database.core.filters import RedisFilterTranslator
+
+        translator = RedisFilterTranslator()
+        filters = {"age__gte": 18, "status__in": ["active", "pending"], "name__startswith": "A"}
+        records = [
+            {"name": "Alice", "age": 30, "status": "active"},
+            {"name": "Bob", "age": 40, "status": "active"},
+            {"name": "Ann", "age": 10, "status": "pending"},
+            {"name": "Amy", "age": 20, "status": "pending"},
+            {"name": "Abe", "status": "active"},
+        ]
+
+        indices = translator.translate_batch(filters)(records)
+        filter_func = translator.translate(filters)
+
+        assert indices == [0, 3]
+        assert indices == [i for i, record in enumerate(records) if filter_func(record)]
+        assert translator.translate_batch(filters)([]) == []
+
+
+class TestBooleanFilterGroups:
+    """测试 $or / $and / $not 逻辑组合"""
+
+    FILTERS = {
+        "status": "active",
+        "$or": [{"age__lt": 18}, {"age__gt": 65, "vip": True}],
+        "$not": {"name__startswith": "test"},
+    }
+
+    def test_sql_translation(self):
+        """测试转换为带括号的 SQL 子句"""
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        where_clause, params = SQLFilterTranslator().translate(self.FILTERS)
+
+        assert where_clause == (
+            "status = :p0 AND (age < :p1 OR (age > :p2 AND vip = :p3)) AND NOT (name LIKE :p4)"
+        )
+        assert params == {"p0": "active", "p1": 18, "p2": 65, "p3": True, "p4": "test%"}
+
+    def test_sql_duplicate_fields_get_unique_params(self):
+        """测试同一字段在多个分支中使用不同参数名"""
+        from mcp_database.core.filters import SQLFilterTranslator
+
+        where_clause, params = SQLFilterTranslator().translate(
+            {"$or": [{"age__gt": 1}, {"age__gt": 5}]}
+        )
+
+        assert where_clause == "(age > :p0 OR age > :p1)"
+        assert params == {"p0": 1, "p1": 5}
+
+    def test_mongo_translation(self):
+        """测试转换为 MongoDB $or / $nor"""
+        from mcp_database.core.filters import MongoFilterTranslator
+
+        condition = MongoFilterTranslator().translate(self.FILTERS)
+
+        assert condition == {
+            "status": "active",
+            "$or": [{"age": {"$lt": 18}}, {"age": {"$gt": 65}, "vip": True}],
+            "$nor": [{"name": {"$regex": "^test", "$options": "i"}}],
+        }
+
+    def test_redis_predicate(self):
+        """测试 Redis 过滤函数及批量过滤"""
+        from mcp_database.core.filters import RedisFilterTranslator
+
+        translator = RedisFilterTranslator()
+        records = [
+            {"status": "active", "age": 10, "name": "a"},
+            {"status": "active", "age": 70, "vip": True, "name": "b"},
+            {"status": "active", "age": 70, "vip": False, "name": "c"},
+            {"status": "active", "age": 10, "name": "test1"},
+            {"status": "inactive", "age": 10, "name": "d"},
+        ]
+
+        filter_func = translator.translate(self.FILTERS)
+
+        assert [filter_func(record) for record in records] == [True, True, False, False, False]
+        assert translator.translate_batch(self.FILTERS)(records) == [0, 1]
+
+    def test_shape_includes_group_structure(self):
+        """测试逻辑组合的嵌套结构参与形状"""
+        from mcp_database.core.filters import FilterGroup, compile_filters
+
+        plan = compile_filters(self.FILTERS)
+
+        assert compile_filters({**self.FILTERS, "status": "x"}) is plan
+        assert compile_filters({**self.FILTERS, "$or": [{"age__lt": 1}]}) is not plan
+        assert isinstance(plan.conditions[1], FilterGroup)
+        assert plan.conditions[1].operator == "or"
+
+    def test_invalid_groups(self):
+        """测试格式错误的逻辑组合"""
+        import pytest
+
+        from mcp_database.core.exceptions import QueryError
+        from mcp_database.core.filters import compile_filters
+
+        for filters in (
+            {"$or": []},
+            {"$or": {"a": 1}},
+            {"$and": [{"a": 1}, {}]},
+            {"$not": [{"a": 1}]},
+            {"$xor": [{"a": 1}]},
+        ):
+            with pytest.raises(QueryError):
+                compile_filters(filters)
@@ -0,0 +1,158 @@
+"""测试操作耗时与计数指标"""
+
+import urllib.request
+
+import pytest
+
+from mcp_database.adapters.sql.base import SQLAdapter
+from mcp_database.core.exceptions import DatabaseError
+from mcp_database.core.models import DatabaseConfig
+from mcp_database.utils.metrics import (
+    Histogram,
+    MetricsRegistry,
+    _labels,
+    get_metrics,
+    start_http_exporter,
+)
+from tests.utils import DatabaseTestUtils
+
+
+class TestHistogram:
+    """测试 Histogram"""
+
+    def test_percentiles_within_relative_error(self):
+        """测试分位数相对误差"""
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.07)
+        assert histogram.percentile(0.99) == pytest.approx(0.99, rel=0.07)
+        assert histogram.percentile(1.0) == pytest.approx(1.0)
+
+    def test_bounded_memory(self):
+        """测试桶数量与记录次数无关"""
+        histogram = Histogram()
+        for _ in range(10):
+            for i in range(1, 10001):
+                histogram.record(i / 1_000_000)
+
+        assert len(histogram._buckets) < 200
+
+    def test_empty_snapshot(self):
+        """测试无记录时的摘要"""
+        snapshot = Histogram().snapshot()
+
+        assert snapshot["count"] == 0
+        assert snapshot["p99"] == 0.0
+        assert snapshot["min"] == 0.0
+
+
+class TestMetricsRegistry:
+    """测试 MetricsRegistry"""
+
+    def test_observe_and_errors(self):
+        """测试按 (数据库类型, 操作, 表) 记录耗时、行数和错误"""
+        registry = MetricsRegistry()
+        registry.observe("sqlite", "query", "users", 0.002, rows=5)
+        registry.observe("sqlite", "query", "users", 0.004, rows=3)
+        registry.record_error("sqlite", "query", "users", "QueryError", 0.001)
+        registry.observe_pool_wait("sqlite", 0.0001)
+
+        snapshot = registry.snapshot()
+        item = snapshot["operations"][0]
+        assert (item["db_type"], item["operation"], item["table"]) == ("sqlite", "query", "users")
+        assert item["latency"]["count"] == 3
+        assert item["rows"] == 8
+        assert item["errors"] == {"QueryError": 1}
+        assert snapshot["pool_wait"]["sqlite"]["count"] == 1
+
+    def test_render_prometheus(self):
+        """测试 Prometheus 文本格式"""
+        registry = MetricsRegistry()
+        registry.observe("postgresql", "insert", "users", 0.01, rows=1)
+        registry.record_error("postgresql", "insert", "users", "IntegrityError", 0.01)
+
+        text = registry.render_prometheus()
+
+        assert "# TYPE mcp_database_operation_duration_seconds summary" in text
+        assert (
+            'mcp_database_operation_duration_seconds_count{db_type="postgresql",'
+            'operation="insert",table="users"} 2' in text
+        )
+        assert 'error="IntegrityError"} 1' in text
+        assert text.endswith("\n")
+        assert _labels(table='we"ird') == 'table="we\\"ird"'
+
+    def test_table_labels_bounded(self):
+        """测试非法表名记为 <invalid>，超出上限的表归入 other"""
+        registry = MetricsRegistry(max_table_labels=2)
+        registry.record_error("sqlite", "query", "users; DROP TABLE x", "QueryError", 0.001)
+        registry.record_error("sqlite", "query", 'we"ird', "QueryError", 0.001)
+        for table in ("users", "orders", "items", "logs", "users"):
+            registry.observe("sqlite", "query", table, 0.001)
+        registry.observe("redis", "query", "sessions", 0.001)
+
+        tables = {
+            (item["db_type"], item["table"]): item["latency"]["count"]
+            for item in registry.snapshot()["operations"]
+        }
+        assert tables == {
+            ("sqlite", "<invalid>"): 2,
+            ("sqlite", "users"): 2,
+            ("sqlite", "orders"): 1,
+            ("sqlite", "other"): 2,
+            ("redis", "sessions"): 1,
+        }
+
+    def test_http_exporter(self):
+        """测试 Prometheus HTTP 导出"""
+        registry = MetricsRegistry()
+        registry.observe("redis", "query", "sessions", 0.001, rows=1)
+        server = start_http_exporter(0, registry=registry)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+                body = response.read().decode("utf-8")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert (
+            'mcp_database_rows_total{db_type="redis",operation="query",table="sessions"} 1' in body
+        )
+
+
+class TestAdapterInstrumentation:
+    """测试适配器方法自动计时"""
+
+    @pytest.fixture
+    async def adapter(self):
+        """创建 SQLite 适配器实例"""
+        get_metrics().reset()
+        adapter = SQLAdapter(DatabaseConfig(url=DatabaseTestUtils.SQLITE_URL))
+        await adapter.connect()
+        yield adapter
+        await adapter.disconnect()
+        get_metrics().reset()
+
+    @pytest.mark.asyncio
+    async def test_adapter_operations_recorded(self, adapter):
+        """测试适配器操作记录耗时、行数、错误和连接池等待"""
+        await DatabaseTestUtils.create_test_table(
+            adapter, "users", DatabaseTestUtils.get_test_schema()
+        )
+        await adapter.insert("users", [{"name": "a", "age": 1}, {"name": "b", "age": 2}])
+        await adapter.query("users")
+        with pytest.raises(DatabaseError):
+            await adapter.query("users", limit=-1)
+
+        snapshot = get_metrics().snapshot()
+        operations = {(i["db_type"], i["operation"], i["table"]): i for i in snapshot["operations"]}
+
+        assert operations[("sqlite", "insert", "users")]["rows"] == 2
+        assert operations[("sqlite", "query", "users")]["rows"] == 2
+        assert operations[("sqlite", "query", "users")]["latency"]["count"] == 2
+        assert operations[("sqlite", "query", "users")]["errors"] == {"DatabaseError": 1}
+        assert snapshot["pool_wait"]["sqlite"]["count"] >= 3
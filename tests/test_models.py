@@ -180,3 +180,15 @@ class TestDatabaseConfig:
 
         with pytest.raises(ValidationError):
             DatabaseConfig(url="")
+
+    def test_database_config_hosts(self):
+        """测试集群节点列表配置"""
+        from mcp_database.core.models import DatabaseConfig
+
+        config = DatabaseConfig(url="http://node1:9200")
+        assert config.hosts == []
+
+        config = DatabaseConfig(
+            url="http://node1:9200", hosts=["http://node1:9200", "http://node2:9200"]
+        )
+        assert len(config.hosts) == 2
@@ -0,0 +1,321 @@
+"""测试多数据库适配器注册表"""
+
+import asyncio
+import builtins
+import json
+import time
+
+import pytest
+
+from mcp_database.core.exceptions import ConnectionError, QueryError
+from mcp_database.core.models import DatabaseConfig
+from mcp_database.server.registry import AdapterRegistry
+
+SQLITE_URL = "sqlite+aiosqlite:///:memory:"
+
+
+class FakeAdapter:
+    """记录连接次数的模拟适配器"""
+
+    def __init__(self, failures: int = 0, error: Exception | None = None):
+        self.is_connected = False
+        self.connect_calls = 0
+        self.disconnect_calls = 0
+        self._failures = failures
+        self._error = error
+
+    async def connect(self):
+        self.connect_calls += 1
+        await asyncio.sleep(0.01)
+        if self._failures > 0:
+            self._failures -= 1
+            raise self._error or ConnectionError("connection refused")
+        self.is_connected = True
+
+    async def disconnect(self):
+        self.disconnect_calls += 1
+        self.is_connected = False
+
+
+class TestAdapterRegistry:
+    """测试 AdapterRegistry"""
+
+    def test_register_and_resolve_default(self):
+        """测试第一个注册的数据库成为默认数据库"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        registry.register("other", DatabaseConfig(url=SQLITE_URL))
+
+        assert registry.default == "main"
+        assert registry.resolve().name == "main"
+        assert registry.resolve("other").name == "other"
+        assert registry.names == ["main", "other"]
+
+    def test_resolve_unknown_database(self):
+        """测试未注册的数据库"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+
+        with pytest.raises(QueryError, match="Unknown database"):
+            registry.resolve("missing")
+
+    def test_adapter_created_lazily(self):
+        """测试适配器在首次使用时创建"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+
+        assert registry.resolve("main").adapter is None
+        adapter = registry.get_adapter("main")
+        assert registry.get_adapter("main") is adapter
+        assert adapter.is_connected is False
+
+    @pytest.mark.asyncio
+    async def test_ensure_connected(self):
+        """测试按需连接"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+
+        adapter = await registry.ensure_connected("main")
+        assert adapter.is_connected is True
+
+        await registry.close_all()
+        assert registry.resolve("main").adapter is None
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """测试每个数据库的并发限制"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL), max_concurrency=2)
+
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            async with registry.limit("main"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(work() for _ in range(10)))
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_no_concurrency_limit_by_default(self):
+        """测试未配置 max_concurrency 和准入控制时不限制并发"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL, pool_size=1, max_overflow=0))
+
+        active = 0
+        peak = 0
+
+        async def work():
+            nonlocal active, peak
+            async with registry.limit("main"):
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(work() for _ in range(200)))
+        assert peak == 200
+        assert registry.resolve("main").admission.rejected == 0
+
+    @pytest.mark.asyncio
+    async def test_evict_idle(self):
+        """测试空闲连接回收"""
+        registry = AdapterRegistry(idle_timeout=60)
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        registry.register("busy", DatabaseConfig(url=SQLITE_URL))
+
+        await registry.ensure_connected("main")
+        async with registry.limit("main"):
+            pass
+        last_used = registry.resolve("main").last_used
+
+        await registry.ensure_connected("busy")
+        async with registry.limit("busy"):
+            evicted = await registry.evict_idle(now=last_used + 120)
+
+        assert evicted == ["main"]
+        assert registry.resolve("main").adapter is None
+        assert registry.resolve("busy").adapter is not None
+        await registry.close_all()
+
+    def test_from_dict(self):
+        """测试从配置字典创建"""
+        registry = AdapterRegistry.from_dict(
+            {
+                "default": "b",
+                "idle_timeout": 300,
+                "databases": {
+                    "a": {"url": SQLITE_URL},
+                    "b": {"url": SQLITE_URL, "pool_size": 3, "max_concurrency": 4},
+                },
+            }
+        )
+
+        assert registry.default == "b"
+        assert registry.resolve("b").config.pool_size == 3
+        assert registry.resolve("b").max_concurrency == 4
+        assert registry.resolve("b").admission.max_concurrent == 4
+        assert registry.resolve("a").admission.max_concurrent is None
+        assert registry.resolve("a").cache is None
+
+    def test_from_dict_with_admission(self):
+        """测试从配置字典创建准入控制"""
+        registry = AdapterRegistry.from_dict(
+            {
+                "databases": {
+                    "a": {
+                        "url": SQLITE_URL,
+                        "pool_size": 2,
+                        "max_overflow": 0,
+                        "admission": {"max_queue": 5, "tool_limits": {"execute": 1}},
+                    }
+                }
+            }
+        )
+
+        admission = registry.resolve("a").admission
+        assert admission.max_concurrent == 2
+        assert admission._tool_limits == {"execute": 1}
+
+    def test_from_dict_with_cache(self):
+        """测试从配置字典创建查询缓存"""
+        registry = AdapterRegistry.from_dict(
+            {"databases": {"a": {"url": SQLITE_URL, "cache": {"tables": ["users"], "ttl": 5}}}}
+        )
+
+        cache = registry.resolve("a").cache
+        assert cache.enabled_for("users") is True
+        assert cache.enabled_for("orders") is False
+
+    def test_from_dict_invalid(self):
+        """测试无效配置"""
+        with pytest.raises(QueryError):
+            AdapterRegistry.from_dict({"databases": {}})
+        with pytest.raises(QueryError):
+            AdapterRegistry.from_dict({"default": "x", "databases": {"a": {"url": SQLITE_URL}}})
+
+    def test_from_env(self, tmp_path, monkeypatch):
+        """测试从环境变量创建"""
+        monkeypatch.delenv("MCP_DATABASES_FILE", raising=False)
+        monkeypatch.delenv("MCP_DATABASES", raising=False)
+        assert AdapterRegistry.from_env() is None
+
+        monkeypatch.setenv("MCP_DATABASES", json.dumps({"databases": {"a": {"url": SQLITE_URL}}}))
+        assert AdapterRegistry.from_env().names == ["a"]
+
+        path = tmp_path / "databases.json"
+        path.write_text(json.dumps({"databases": {"f": {"url": SQLITE_URL}}}))
+        monkeypatch.setenv("MCP_DATABASES_FILE", str(path))
+        assert AdapterRegistry.from_env().names == ["f"]
+
+
+class TestAdapterRegistryConnect:
+    """测试 AdapterRegistry 连接建立"""
+
+    @pytest.mark.asyncio
+    async def test_single_flight_connect(self):
+        """测试并发请求只触发一次连接"""
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        adapter = FakeAdapter()
+        registry.resolve("main").adapter = adapter
+
+        await asyncio.gather(*(registry.ensure_connected("main") for _ in range(50)))
+
+        assert adapter.connect_calls == 1
+        assert adapter.is_connected is True
+
+    @pytest.mark.asyncio
+    async def test_reconnect_with_backoff(self):
+        """测试连接失败后退避重试并释放失败的连接"""
+        registry = AdapterRegistry(connect_retries=3, retry_backoff=0.001)
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        adapter = FakeAdapter(failures=2)
+        registry.resolve("main").adapter = adapter
+
+        await registry.ensure_connected("main")
+
+        assert adapter.connect_calls == 3
+        assert adapter.disconnect_calls == 2
+        assert adapter.is_connected is True
+
+    @pytest.mark.asyncio
+    async def test_connect_retries_exhausted(self):
+        """测试重试次数耗尽后抛出连接错误"""
+        registry = AdapterRegistry(connect_retries=1, retry_backoff=0.001)
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        adapter = FakeAdapter(failures=5)
+        registry.resolve("main").adapter = adapter
+
+        with pytest.raises(ConnectionError):
+            await registry.ensure_connected("main")
+        assert adapter.connect_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_connect_retries_wrapped_network_error(self):
+        """测试适配器包装的网络错误按瞬时错误重试"""
+        registry = AdapterRegistry(connect_retries=2, retry_backoff=0.001)
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        error = ConnectionError("Failed to connect to database")
+        error.__context__ = ConnectionRefusedError("connection refused")
+        adapter = FakeAdapter(failures=1, error=error)
+        registry.resolve("main").adapter = adapter
+
+        await registry.ensure_connected("main")
+
+        assert adapter.connect_calls == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "cause",
+        [
+            type("AuthenticationError", (builtins.ConnectionError,), {})("invalid password"),
+            ValueError("invalid database url"),
+        ],
+    )
+    async def test_connect_permanent_error_not_retried(self, cause):
+        """测试认证失败和配置错误不重试，直接抛出"""
+        registry = AdapterRegistry(connect_retries=3, retry_backoff=0.001)
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        error = ConnectionError(f"Failed to connect to database: {cause}")
+        error.__context__ = cause
+        adapter = FakeAdapter(failures=5, error=error)
+        registry.resolve("main").adapter = adapter
+
+        with pytest.raises(ConnectionError):
+            await registry.ensure_connected("main")
+        assert adapter.connect_calls == 1
+        assert adapter.disconnect_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_warmup(self):
+        """测试预热连接所有数据库，失败不影响其他数据库"""
+        registry = AdapterRegistry(connect_retries=0)
+        registry.register("ok", DatabaseConfig(url=SQLITE_URL))
+        registry.register("down", DatabaseConfig(url=SQLITE_URL))
+        registry.resolve("ok").adapter = FakeAdapter()
+        registry.resolve("down").adapter = FakeAdapter(failures=1)
+
+        status = await registry.warmup()
+
+        assert status == {"ok": True, "down": False}
+
+    @pytest.mark.asyncio
+    async def test_warmup_not_evicted_within_idle_timeout(self):
+        """测试预热后未使用的连接在空闲超时前不会被回收"""
+        registry = AdapterRegistry(idle_timeout=60)
+        registry.register("main", DatabaseConfig(url=SQLITE_URL))
+        adapter = FakeAdapter()
+        registry.resolve("main").adapter = adapter
+
+        assert await registry.warmup() == {"main": True}
+        evicted = await registry.evict_idle(now=time.monotonic() + 40)
+
+        assert evicted == []
+        assert registry.resolve("main").adapter is adapter
+        assert adapter.is_connected is True
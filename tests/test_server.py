@@ -16,6 +16,8 @@ class TestMCPServerTools:
         adapter.insert = AsyncMock()
         adapter.query = AsyncMock()
         adapter.update = AsyncMock()
+        adapter.upsert = AsyncMock()
+        adapter.bulk_update = AsyncMock()
         adapter.delete = AsyncMock()
         adapter.advanced_query = AsyncMock()
         adapter.execute = AsyncMock()
@@ -28,12 +30,14 @@ class TestMCPServerTools:
             with patch("mcp_database.server.ensure_connected", new_callable=AsyncMock):
                 from mcp_database.server import (
                     advanced,
+                    bulk_update,
                     delete,
                     execute,
                     insert,
                     query,
                     set_database_url,
                     update,
+                    upsert,
                 )
 
                 set_database_url("postgresql://test@localhost/test")
@@ -41,6 +45,8 @@ class TestMCPServerTools:
                     "insert": insert,
                     "query": query,
                     "update": update,
+                    "upsert": upsert,
+                    "bulk_update": bulk_update,
                     "delete": delete,
                     "advanced": advanced,
                     "execute": execute,
@@ -122,6 +128,24 @@ class TestMCPServerTools:
             "users", {"status": "active", "age__gte": 18}, 10
         )
 
+    @pytest.mark.asyncio
+    async def test_query_with_order_offset_and_fields(self, setup_server):
+        """测试排序、分页和字段投影参数传递给适配器"""
+        from mcp_database.core.models import QueryResult
+
+        setup_server["adapter"].query.return_value = QueryResult(
+            data=[{"name": "张三"}], count=5, has_more=True, success=True
+        )
+
+        result = await setup_server["query"](
+            table="users", limit=1, offset=2, order_by=["-age"], fields=["name"]
+        )
+
+        assert result["data"] == [{"name": "张三"}]
+        setup_server["adapter"].query.assert_called_once_with(
+            "users", None, 1, offset=2, order_by=["-age"], fields=["name"]
+        )
+
     @pytest.mark.asyncio
     async def test_update_records(self, setup_server):
         """测试更新记录"""
@@ -137,6 +161,32 @@ class TestMCPServerTools:
         assert result["updated_count"] == 3
         setup_server["adapter"].update.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_upsert_records(self, setup_server):
+        """测试插入或更新记录"""
+        from mcp_database.core.models import UpsertResult
+
+        setup_server["adapter"].upsert.return_value = UpsertResult(upserted_count=2)
+        rows = [{"id": 1, "name": "张三"}, {"id": 2, "name": "李四"}]
+
+        result = await setup_server["upsert"](table="users", rows=rows, key_fields=["id"])
+
+        assert result == {"success": True, "upserted_count": 2}
+        setup_server["adapter"].upsert.assert_called_once_with("users", rows, ["id"])
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_records(self, setup_server):
+        """测试批量更新记录"""
+        from mcp_database.core.models import UpdateResult
+
+        setup_server["adapter"].bulk_update.return_value = UpdateResult(updated_count=2)
+        rows = [{"id": 1, "status": "active"}, {"id": 2, "status": "inactive"}]
+
+        result = await setup_server["bulk_update"](table="users", rows=rows, key_field="id")
+
+        assert result == {"success": True, "updated_count": 2}
+        setup_server["adapter"].bulk_update.assert_called_once_with("users", rows, "id")
+
     @pytest.mark.asyncio
     async def test_delete_records(self, setup_server):
         """测试删除记录"""
@@ -229,11 +279,459 @@ class TestMCPServerTools:
         assert result["error"]["type"] == "query_error"
 
 
+class TestMCPServerMultiDatabase:
+    """测试 MCP Server 多数据库路由"""
+
+    @pytest.fixture
+    def registry(self):
+        """创建包含两个模拟适配器的注册表"""
+        from mcp_database.core.models import DatabaseConfig, QueryResult
+        from mcp_database.server import get_registry, set_registry
+        from mcp_database.server.registry import AdapterRegistry
+
+        registry = AdapterRegistry()
+        for name in ("main", "analytics"):
+            registry.register(name, DatabaseConfig(url="sqlite+aiosqlite:///:memory:"))
+            adapter = MagicMock()
+            adapter.is_connected = True
+            adapter.query = AsyncMock(
+                return_value=QueryResult(data=[{"db": name}], count=1, success=True)
+            )
+            registry.resolve(name).adapter = adapter
+
+        previous = get_registry()
+        set_registry(registry)
+        yield registry
+        set_registry(previous)
+
+    @pytest.mark.asyncio
+    async def test_query_routes_by_database(self, registry):
+        """测试 database 参数选择数据库"""
+        from mcp_database.server import query
+
+        default_result = await query(table="users")
+        named_result = await query(table="users", database="analytics")
+
+        assert default_result["data"] == [{"db": "main"}]
+        assert named_result["data"] == [{"db": "analytics"}]
+
+    @pytest.mark.asyncio
+    async def test_create_server_warmup(self, registry):
+        """测试 create_server 在后台预热连接"""
+        from mcp_database import server
+
+        for name in registry.names:
+            registry.resolve(name).adapter.is_connected = False
+            registry.resolve(name).adapter.connect = AsyncMock()
+
+        server.create_server(registry=registry, warmup=True)
+        await server._warmup_task
+
+        for name in registry.names:
+            registry.resolve(name).adapter.connect.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unknown_database_returns_error(self, registry):
+        """测试未注册的数据库返回错误"""
+        from mcp_database.server import query
+
+        result = await query(table="users", database="missing")
+
+        assert result["success"] is False
+        assert "Unknown database" in result["error"]["message"]
+
+
+class TestMCPServerBatch:
+    """测试 MCP Server 批量操作工具"""
+
+    @pytest.fixture
+    def adapter(self):
+        """创建注册了模拟适配器的默认数据库"""
+        from mcp_database.core.models import DatabaseConfig
+        from mcp_database.server import get_registry, set_registry
+        from mcp_database.server.registry import AdapterRegistry
+
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url="sqlite+aiosqlite:///:memory:", pool_size=2))
+        adapter = MagicMock()
+        adapter.is_connected = True
+        registry.resolve("main").adapter = adapter
+
+        previous = get_registry()
+        set_registry(registry)
+        yield adapter
+        set_registry(previous)
+
+    @pytest.mark.asyncio
+    async def test_batch_returns_per_operation_results(self, adapter):
+        """测试批量操作返回每个操作的结果，单个失败不影响其他操作"""
+        from mcp_database.core.exceptions import QueryError
+        from mcp_database.core.models import InsertResult, QueryResult
+        from mcp_database.server import batch
+
+        adapter.insert = AsyncMock(return_value=InsertResult(inserted_count=1, inserted_ids=[1]))
+        adapter.query = AsyncMock(return_value=QueryResult(data=[{"id": 1}], count=1))
+        adapter.delete = AsyncMock(side_effect=QueryError("no such table"))
+
+        result = await batch(
+            operations=[
+                {"type": "insert", "table": "users", "data": {"name": "Alice"}},
+                {"type": "query", "table": "users", "filters": {"id": 1}, "limit": 5},
+                {"type": "delete", "table": "missing", "filters": {"id": 1}},
+                {"type": "drop", "table": "users"},
+            ]
+        )
+
+        assert result["success"] is False
+        assert result["failed"] == 2
+        assert result["results"][0]["inserted_count"] == 1
+        assert result["results"][1]["data"] == [{"id": 1}]
+        assert "no such table" in result["results"][2]["error"]["message"]
+        assert "Unsupported batch operation" in result["results"][3]["error"]["message"]
+        adapter.query.assert_called_once_with("users", {"id": 1}, 5)
+
+    @pytest.mark.asyncio
+    async def test_batch_malformed_operations_reported_per_operation(self, adapter):
+        """测试格式错误、缺少过滤条件或意外异常的操作只影响自身结果"""
+        from mcp_database.core.models import QueryResult
+        from mcp_database.server import batch
+
+        adapter.query = AsyncMock(return_value=QueryResult(data=[], count=0))
+        adapter.insert = AsyncMock(side_effect=TypeError("unexpected"))
+        adapter.delete = AsyncMock()
+
+        result = await batch(
+            operations=[
+                "not an operation",
+                {"type": "delete", "table": "users"},
+                {"type": "update", "table": "users", "data": {"a": 1}, "filters": {}},
+                {"type": "insert", "table": "users", "data": {"a": 1}},
+                {"type": "query", "table": "users"},
+            ]
+        )
+
+        assert result["failed"] == 4
+        messages = [item.get("error", {}).get("message", "") for item in result["results"]]
+        assert "must be an object" in messages[0]
+        assert "requires filters" in messages[1]
+        assert "requires filters" in messages[2]
+        assert "unexpected" in messages[3]
+        assert result["results"][4]["success"] is True
+        adapter.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_concurrency_bounded_by_pool_size(self, adapter):
+        """测试非原子批量操作的并发数不超过连接池大小"""
+        import asyncio
+
+        from mcp_database.core.models import QueryResult
+        from mcp_database.server import batch
+
+        active = 0
+        peak = 0
+
+        async def slow_query(*args):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return QueryResult(data=[], count=0)
+
+        adapter.query = AsyncMock(side_effect=slow_query)
+
+        result = await batch(operations=[{"type": "query", "table": "users"}] * 10)
+
+        assert result["success"] is True
+        assert len(result["results"]) == 10
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_operations_admitted_per_table(self, adapter):
+        """测试非原子批量操作的每个操作单独经过准入控制并遵守按表限制"""
+        import asyncio
+
+        from mcp_database.core.models import QueryResult
+        from mcp_database.server import batch, get_registry
+        from mcp_database.server.admission import AdmissionController
+
+        entry = get_registry().resolve("main")
+        entry.admission = AdmissionController(table_limits={"users": 1})
+        active = 0
+        peak = 0
+
+        async def slow_query(*args):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return QueryResult(data=[], count=0)
+
+        adapter.query = AsyncMock(side_effect=slow_query)
+
+        result = await batch(operations=[{"type": "query", "table": "users"}] * 4)
+
+        assert result["success"] is True
+        assert peak == 1
+        assert entry.admission.stats()["admitted"] == 4
+
+    @pytest.mark.asyncio
+    async def test_batch_same_table_writes_keep_order(self, adapter):
+        """测试同一张表有写操作时按提交顺序执行，不同表的操作并发执行"""
+        import asyncio
+
+        from mcp_database.core.models import InsertResult, QueryResult
+        from mcp_database.server import batch
+
+        events = []
+
+        async def slow_insert(table, data):
+            events.append(("insert start", table))
+            await asyncio.sleep(0.02)
+            events.append(("insert end", table))
+            return InsertResult(inserted_count=1, inserted_ids=[1])
+
+        async def query(table, *args, **kwargs):
+            events.append(("query", table))
+            return QueryResult(data=[], count=0)
+
+        adapter.insert = AsyncMock(side_effect=slow_insert)
+        adapter.query = AsyncMock(side_effect=query)
+
+        result = await batch(
+            operations=[
+                {"type": "insert", "table": "users", "data": {"name": "a"}},
+                {"type": "query", "table": "users"},
+                {"type": "query", "table": "orders"},
+            ]
+        )
+
+        assert result["success"] is True
+        assert events.index(("query", "users")) > events.index(("insert end", "users"))
+        assert events.index(("query", "orders")) < events.index(("insert end", "users"))
+
+    @pytest.mark.asyncio
+    async def test_batch_atomic_uses_transaction(self, adapter):
+        """测试原子批量操作交给适配器在事务中执行"""
+        from mcp_database.core.models import AdvancedResult
+        from mcp_database.server import batch
+
+        operations = [
+            {"type": "update", "table": "users", "data": {"age": 1}, "filters": {"active": True}}
+        ]
+        adapter.advanced_query = AsyncMock(
+            return_value=AdvancedResult(
+                operation="batch",
+                data={"results": [{"updated_count": 3, "success": True}], "committed": True},
+            )
+        )
+
+        result = await batch(operations=operations, atomic=True)
+
+        assert result["success"] is True
+        assert result["results"][0]["updated_count"] == 3
+        adapter.advanced_query.assert_called_once_with("batch", {"operations": operations})
+
+
+class TestMCPServerQueryCache:
+    """测试 MCP Server 查询缓存"""
+
+    @pytest.fixture
+    def adapter(self):
+        """创建启用查询缓存的默认数据库"""
+        from mcp_database.core.models import DatabaseConfig, InsertResult, QueryResult
+        from mcp_database.server import get_registry, set_registry
+        from mcp_database.server.cache import QueryCache
+        from mcp_database.server.registry import AdapterRegistry
+
+        registry = AdapterRegistry()
+        registry.register(
+            "main",
+            DatabaseConfig(url="sqlite+aiosqlite:///:memory:"),
+            cache=QueryCache(tables=["users"]),
+        )
+        adapter = MagicMock()
+        adapter.is_connected = True
+        adapter.query = AsyncMock(return_value=QueryResult(data=[{"id": 1}], count=1))
+        adapter.insert = AsyncMock(return_value=InsertResult(inserted_count=1, inserted_ids=[2]))
+        registry.resolve("main").adapter = adapter
+
+        previous = get_registry()
+        set_registry(registry)
+        yield adapter
+        set_registry(previous)
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_served_from_cache(self, adapter):
+        """测试重复查询命中缓存"""
+        from mcp_database.server import get_registry, query
+
+        first = await query(table="users", filters={"id": 1})
+        second = await query(table="users", filters={"id": 1})
+
+        assert first == second
+        adapter.query.assert_called_once()
+        assert get_registry().resolve().cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_table(self, adapter):
+        """测试写操作使同表缓存失效"""
+        from mcp_database.server import insert, query
+
+        await query(table="users")
+        await insert(table="users", data={"name": "Bob"})
+        await query(table="users")
+
+        assert adapter.query.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_table_without_opt_in_not_cached(self, adapter):
+        """测试未启用缓存的表不缓存"""
+        from mcp_database.server import query
+
+        await query(table="orders")
+        await query(table="orders")
+
+        assert adapter.query.call_count == 2
+
+
+class TestMCPServerCoalescing:
+    """测试 MCP Server 相同请求合并"""
+
+    @pytest.fixture
+    def adapter(self):
+        """创建返回慢查询的默认数据库"""
+        import asyncio
+
+        from mcp_database.core.models import AdvancedResult, DatabaseConfig, QueryResult
+        from mcp_database.server import get_registry, set_registry
+        from mcp_database.server.registry import AdapterRegistry
+
+        async def slow_query(*args):
+            await asyncio.sleep(0.01)
+            return QueryResult(data=[{"id": 1}], count=1)
+
+        async def slow_advanced(operation, params):
+            await asyncio.sleep(0.01)
+            return AdvancedResult(operation=operation, data={"rows": 1})
+
+        registry = AdapterRegistry()
+        registry.register("main", DatabaseConfig(url="sqlite+aiosqlite:///:memory:"))
+        adapter = MagicMock()
+        adapter.is_connected = True
+        adapter.query = AsyncMock(side_effect=slow_query)
+        adapter.advanced_query = AsyncMock(side_effect=slow_advanced)
+        registry.resolve("main").adapter = adapter
+
+        previous = get_registry()
+        set_registry(registry)
+        yield adapter
+        set_registry(previous)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_coalesced(self, adapter):
+        """测试并发的相同查询共享一次数据库访问"""
+        import asyncio
+
+        from mcp_database.server import query
+
+        results = await asyncio.gather(
+            *(query(table="users", filters={"id": 1}, limit=10) for _ in range(20))
+        )
+
+        assert all(r["data"] == [{"id": 1}] for r in results)
+        adapter.query.assert_called_once_with("users", {"id": 1}, 10)
+
+    @pytest.mark.asyncio
+    async def test_only_read_only_advanced_coalesced(self, adapter):
+        """测试只合并只读的高级操作"""
+        import asyncio
+
+        from mcp_database.server import advanced
+
+        await asyncio.gather(*(advanced("orders", "aggregate", {"pipeline": []}) for _ in range(5)))
+        assert adapter.advanced_query.call_count == 1
+
+        await asyncio.gather(
+            *(advanced("orders", "transaction", {"queries": []}) for _ in range(5))
+        )
+        assert adapter.advanced_query.call_count == 6
+
+
+class TestMCPServerAdmission:
+    """测试 MCP Server 准入控制"""
+
+    @pytest.mark.asyncio
+    async def test_overloaded_error_response(self):
+        """测试过载时返回 overloaded 错误"""
+        import asyncio
+
+        from mcp_database.core.models import DatabaseConfig, QueryResult
+        from mcp_database.server import get_registry, query, set_registry
+        from mcp_database.server.admission import AdmissionController
+        from mcp_database.server.registry import AdapterRegistry
+
+        release = asyncio.Event()
+
+        async def blocked_query(*args):
+            await release.wait()
+            return QueryResult(data=[], count=0)
+
+        registry = AdapterRegistry()
+        registry.register(
+            "main",
+            DatabaseConfig(url="sqlite+aiosqlite:///:memory:"),
+            coalesce=False,
+            admission=AdmissionController(max_concurrent=1, max_queue=0),
+        )
+        adapter = MagicMock()
+        adapter.is_connected = True
+        adapter.query = AsyncMock(side_effect=blocked_query)
+        registry.resolve("main").adapter = adapter
+
+        previous = get_registry()
+        set_registry(registry)
+        try:
+            first = asyncio.ensure_future(query(table="users"))
+            await asyncio.sleep(0)
+            second = await query(table="users")
+            release.set()
+            await first
+        finally:
+            set_registry(previous)
+
+        assert second["success"] is False
+        assert second["error"]["type"] == "overloaded"
+
+
+class TestMCPServerMetrics:
+    """测试 MCP Server 指标工具"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_tool(self):
+        """测试 metrics 工具返回适配器指标和数据库统计"""
+        from mcp_database.server import metrics, set_database_url
+        from mcp_database.utils.metrics import get_metrics
+
+        set_database_url("sqlite+aiosqlite:///:memory:")
+        get_metrics().reset()
+        get_metrics().observe("sqlite", "query", "users", 0.001, rows=1)
+
+        result = await metrics()
+        get_metrics().reset()
+
+        assert result["success"] is True
+        assert result["operations"][0]["table"] == "users"
+        assert result["databases"]["default"]["connected"] is False
+        assert result["databases"]["default"]["admission"]["active"] == 0
+
+
 class TestMCPServerRegistration:
     """测试 MCP Server 工具注册"""
 
     def test_all_tools_registered(self):
-        """验证所有 6 个工具已注册"""
+        """验证所有 10 个工具已注册"""
         from mcp_database.server import mcp
 
         tools = mcp._tool_manager.list_tools()
@@ -242,10 +740,14 @@ class TestMCPServerRegistration:
         assert "insert" in tool_names
         assert "query" in tool_names
         assert "update" in tool_names
+        assert "upsert" in tool_names
+        assert "bulk_update" in tool_names
         assert "delete" in tool_names
         assert "advanced" in tool_names
         assert "execute" in tool_names
-        assert len(tools) == 6
+        assert "batch" in tool_names
+        assert "metrics" in tool_names
+        assert len(tools) == 10
 
     def test_create_server_function(self):
         """验证 create_server 函数存在"""
@@ -0,0 +1,161 @@
+"""测试追踪钩子"""
+
+import importlib.util
+
+import pytest
+
+from mcp_database.adapters.sql.base import SQLAdapter
+from mcp_database.core.models import DatabaseConfig
+from mcp_database.core.tracing import (
+    OpenTelemetryHook,
+    SpanContext,
+    TracingHook,
+    register_hook,
+    unregister_hook,
+)
+from tests.utils import DatabaseTestUtils
+
+
+class RecordingHook(TracingHook):
+    """记录回调顺序的钩子"""
+
+    def __init__(self):
+        self.events: list[tuple[str, str]] = []
+        self.spans: list[SpanContext] = []
+
+    def before(self, span):
+        self.events.append(("before", span.name))
+
+    def after(self, span):
+        self.events.append(("after", span.name))
+        self.spans.append(span)
+
+    def error(self, span, exc):
+        self.events.append(("error", span.name))
+        self.spans.append(span)
+
+
+class FailingHook(TracingHook):
+    """总是抛出异常的钩子"""
+
+    def before(self, span):
+        raise RuntimeError("hook failure")
+
+
+class TestTracingHooks:
+    """测试适配器追踪钩子"""
+
+    @pytest.fixture
+    async def adapter(self):
+        """创建带测试表的 SQLite 适配器"""
+        adapter = SQLAdapter(DatabaseConfig(url=DatabaseTestUtils.SQLITE_URL))
+        await adapter.connect()
+        await DatabaseTestUtils.create_test_table(
+            adapter, "users", DatabaseTestUtils.get_test_schema()
+        )
+        yield adapter
+        await adapter.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_query_phases(self, adapter):
+        """测试 query 的阶段区间及父子关系"""
+        await adapter.insert("users", {"name": "a", "age": 1})
+        hook = RecordingHook()
+        adapter.add_hook(hook)
+
+        await adapter.query("users", {"age__gt": 0})
+
+        names = [name for event, name in hook.events if event == "before"]
+        assert names == [
+            "query",
+            "pool_checkout",
+            "translate_filters",
+            "build_sql",
+            "execute",
+            "execute",
+            "decode_rows",
+        ]
+        root = hook.spans[-1]
+        assert root.name == "query"
+        assert root.table == "users"
+        assert root.db_type == "sqlite"
+        assert all(span.parent is root for span in hook.spans[:-1])
+        assert all(span.operation == "query" for span in hook.spans)
+        decode = next(span for span in hook.spans if span.name == "decode_rows")
+        assert decode.attributes["row_count"] == 1
+        assert root.duration >= decode.duration
+
+    @pytest.mark.asyncio
+    async def test_error_callback(self, adapter):
+        """测试操作失败时调用 error"""
+        hook = RecordingHook()
+        adapter.add_hook(hook)
+
+        with pytest.raises(Exception):
+            await adapter.query("missing_table")
+
+        assert ("error", "execute") in hook.events
+        assert ("error", "query") in hook.events
+        assert hook.spans[-1].error is not None
+
+    @pytest.mark.asyncio
+    async def test_failing_hook_does_not_break_operation(self, adapter):
+        """测试钩子异常不影响数据库操作"""
+        adapter.add_hook(FailingHook())
+
+        result = await adapter.insert("users", {"name": "b", "age": 2})
+
+        assert result.inserted_count == 1
+
+    @pytest.mark.asyncio
+    async def test_remove_and_global_hooks(self, adapter):
+        """测试移除实例钩子及全局钩子"""
+        hook = RecordingHook()
+        adapter.add_hook(hook)
+        adapter.remove_hook(hook)
+        await adapter.query("users")
+        assert hook.events == []
+
+        register_hook(hook)
+        try:
+            await adapter.query("users")
+        finally:
+            unregister_hook(hook)
+        assert ("after", "query") in hook.events
+
+    def test_no_hooks_returns_null_span(self, adapter):
+        """测试未注册钩子时区间为空"""
+        with adapter._span("build_sql") as span:
+            assert span is None
+
+
+class TestOpenTelemetryHook:
+    """测试 OpenTelemetry 桥接"""
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("opentelemetry") is not None,
+        reason="opentelemetry is installed",
+    )
+    def test_missing_dependency(self):
+        """测试未安装 opentelemetry 时给出提示"""
+        with pytest.raises(ImportError, match="opentelemetry-api"):
+            OpenTelemetryHook()
+
+    def test_forwards_spans(self):
+        """测试区间转发到 OpenTelemetry"""
+        pytest.importorskip("opentelemetry")
+        from unittest.mock import MagicMock
+
+        tracer = MagicMock()
+        hook = OpenTelemetryHook(tracer=tracer)
+        parent = SpanContext(name="query", db_type="sqlite", operation="query", table="users")
+        child = SpanContext(name="execute", db_type="sqlite", operation="query", parent=parent)
+
+        hook.before(parent)
+        hook.before(child)
+        hook.after(child)
+        hook.error(parent, RuntimeError("boom"))
+
+        assert tracer.start_span.call_count == 2
+        assert tracer.start_span.call_args_list[0].args[0] == "db.query"
+        assert tracer.start_span.call_args_list[1].kwargs["context"] is not None